@@ -1,185 +1,75 @@
-import numpy as np
-import nidaqmx
-import nidaqmx.errors
-from nidaqmx.stream_readers import AnalogMultiChannelReader
-from nidaqmx import constants
-from nidaqmx.constants import AcquisitionType, TemperatureUnits, ThermocoupleType, TerminalConfiguration
+from .channels import RawThermocoupleChannels, ThermocoupleChannels, VoltageChannels
+from .core import NIDAQModule
 
-import os
-from datetime import datetime
 
-class NIDAQVoltage:
-    def __init__(self, position, sampling_freq_in=500, buffer_in_size=5000):
+class NIDAQVoltage(NIDAQModule):
+    def __init__(self, position, sampling_freq_in=500, buffer_in_size=5000, samples_per_read=500, backend=None, error_policy=None,
+                 terminal_config='NRSE', acquisition_type='CONTINUOUS', device=None, channel_map=None):
+        super().__init__(position, VoltageChannels(terminal_config=terminal_config), device=device,
+                         sampling_freq_in=sampling_freq_in, buffer_in_size=buffer_in_size, samples_per_read=samples_per_read,
+                         backend=backend, error_policy=error_policy, acquisition_type=acquisition_type, channel_map=channel_map)
 
-        # Check for valid position in the NI DAQ cage
-        if position not in [1, 2, 3, 4]:
-            raise ValueError("Invalid position value. Must be 1, 2, 3, or 4.")
-        
-        self.position = position
-        self.chans_in = 32
-        self.channel_names = [f"Voltage Channel {i+1}" for i in range(self.chans_in)]
-        self.sampling_freq_in = sampling_freq_in
-        self.buffer_in_size = buffer_in_size
-        self.buffer_in_size_cfg = round(self.buffer_in_size * 1)
-        self.bufsize_callback = self.buffer_in_size
-        self.task_in = nidaqmx.Task()
-        self.configure_task()
-        self.stream_in = AnalogMultiChannelReader(self.task_in.in_stream)
-        self.buffer_in = np.zeros((self.chans_in, self.buffer_in_size))
-        
-    def configure_task(self):
-        channel_string = f"cDAQ1Mod{self.position}/ai0:31"
-        self.task_in.ai_channels.add_ai_voltage_chan(channel_string, terminal_config=TerminalConfiguration.NRSE)
-        self.task_in.timing.cfg_samp_clk_timing(rate=self.sampling_freq_in, sample_mode=constants.AcquisitionType.CONTINUOUS, samps_per_chan=self.buffer_in_size_cfg)
-        self.task_in.in_stream.input_buf_size = self.bufsize_callback
-        
-    def read_samples(self):
-        buffer_in = np.zeros((self.chans_in, 500))
+    @property
+    def terminal_config(self):
+        return self.channel_type.settings['terminal_config']
 
-        try:
-            self.stream_in.read_many_sample(buffer_in, 500, timeout=constants.WAIT_INFINITELY)
-        except nidaqmx.errors.DaqError as e:
-            # Get the current timestamp
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            error_message = f"Error occurred: {e}"
-            log_message = f"{timestamp} - {error_message}"
-            
-            print(log_message)
-            
-            # Get the current script's directory
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Get the parent directory
-            parent_dir = os.path.dirname(current_dir)
-            
-            # Create a path for the error log file in the parent directory
-            error_file_path = os.path.join(parent_dir, 'error_log.txt')
-            
-            # Write the log message (timestamp + error) to the file
-            with open(error_file_path, 'a') as file:
-                file.write(f"{log_message}\n")
-
-        # Calculate the RMS for each channel.
-        rms_values = np.sqrt(np.mean(buffer_in**2, axis=1))
-        rounded_rms_values = np.round(rms_values, 5)
-        return rounded_rms_values
-    
-
-    
-    def get_channel_names(self):
-        return self.channel_names
-    
-    def set_channel_name(self, position, name):
+    def set_terminal_config(self, terminal_config):
         """
-        Set the name of a specific channel based on its position.
-
-        Args:
-            position (int): Position of the channel (0-based index).
-            name (str): New name for the channel.
+        Change the terminal configuration of every channel on the existing task, e.g. 'RSE' or 'DIFF'.
         """
-        if position < 0 or position >= self.chans_in:
-            raise ValueError(f"Invalid position value. Must be between 0 and {self.chans_in-1}.")
-        self.channel_names[position] = name
+        self.set_channel_settings(terminal_config=terminal_config)
 
-    
-    def start(self):
-        self.task_in.start()
-        
-    def stop(self):
-        self.task_in.stop()
-        
-    def close(self):
-        self.task_in.close()
 
+class NIDAQThermo(NIDAQModule):
+    def __init__(self, position, thermocouple_type='J', sampling_freq_in=500, buffer_in_size=5000, samples_per_read=500, backend=None,
+                 error_policy=None, acquisition_type='CONTINUOUS', device=None, raw_voltage=False, cjc_temperature=25.0,
+                 channel_map=None, cjc_source='CONSTANT_USER_VALUE'):
+        """
+        With raw_voltage=True the module is read in volts and linearized on the
+        host (see RawThermocoupleChannels). `thermocouple_type` may then be a
+        list with one type per channel, and `cjc_temperature` is the
+        cold-junction temperature in degC. A list of types follows the order of
+        `channel_map` when one is given.
 
-class NIDAQThermo:
-    def __init__(self, position, thermocouple_type='J', sampling_freq_in=500, buffer_in_size=5000):
+        cjc_source='BUILT_IN' compensates with the module's own cold-junction
+        sensor instead. In raw-voltage mode the sensor is read as an extra
+        last channel, 'CJC'.
+        """
+        if raw_voltage:
+            channel_type = RawThermocoupleChannels(thermocouple_types=thermocouple_type, cjc_temperature=cjc_temperature,
+                                                   cjc_source=cjc_source)
+        else:
+            channel_type = ThermocoupleChannels(thermocouple_type=thermocouple_type, cjc_source=cjc_source)
+        super().__init__(position, channel_type, device=device,
+                         sampling_freq_in=sampling_freq_in, buffer_in_size=buffer_in_size, samples_per_read=samples_per_read,
+                         backend=backend, error_policy=error_policy, acquisition_type=acquisition_type, channel_map=channel_map)
 
-        # Check for valid position in the NI DAQ cage
-        if position not in [1, 2, 3, 4]:
-            raise ValueError("Invalid position value. Must be 1, 2, 3, or 4.")
-        
-         # Check for valid thermocouple type
-        allowed_thermocouple_types = ['B', 'E', 'J', 'K', 'N', 'R', 'S', 'T']
-        if thermocouple_type not in allowed_thermocouple_types:
-            raise ValueError(f"Invalid thermocouple type. Must be one of {allowed_thermocouple_types}.")
-        
-        self.thermocouple_type = getattr(ThermocoupleType, thermocouple_type)
-        self.position = position
+    @property
+    def raw_voltage(self):
+        return isinstance(self.channel_type, RawThermocoupleChannels)
 
-        self.chans_in = 8
-        self.channel_names = [f"Thermo Channel {i+1}" for i in range(self.chans_in)]
-        self.sampling_freq_in = sampling_freq_in
-        self.buffer_in_size = buffer_in_size
-        self.buffer_in_size_cfg = round(self.buffer_in_size * 1)
-        self.bufsize_callback = self.buffer_in_size
-        self.task_in = nidaqmx.Task()
-        self.configure_task()
-        self.stream_in = AnalogMultiChannelReader(self.task_in.in_stream)
-        self.buffer_in = np.zeros((self.chans_in, self.buffer_in_size))
-        
-    def configure_task(self):
-        channel_string = f"cDAQ1Mod{self.position}/ai0:7"
-        self.task_in.ai_channels.add_ai_thrmcpl_chan(channel_string, units=TemperatureUnits.DEG_C, thermocouple_type=self.thermocouple_type)
-        self.task_in.timing.cfg_samp_clk_timing(rate=self.sampling_freq_in, sample_mode=constants.AcquisitionType.CONTINUOUS, samps_per_chan=self.buffer_in_size_cfg)
-        self.task_in.in_stream.input_buf_size = self.bufsize_callback
-        
-    def read_samples(self):
-        buffer_in = np.zeros((self.chans_in, 500))
-        try:
-            self.stream_in.read_many_sample(buffer_in, 500, timeout=constants.WAIT_INFINITELY)
-        except nidaqmx.errors.DaqError as e:
-            # Get the current timestamp
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            error_message = f"Error occurred: {e}"
-            log_message = f"{timestamp} - {error_message}"
-            
-            print(log_message)
-            
-            # Get the current script's directory
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Get the parent directory
-            parent_dir = os.path.dirname(current_dir)
-            
-            # Create a path for the error log file in the parent directory
-            error_file_path = os.path.join(parent_dir, 'error_log.txt')
-            
-            # Write the log message (timestamp + error) to the file
-            with open(error_file_path, 'a') as file:
-                file.write(f"{log_message}\n")
-   
-        
-        # average and round the values for each channel
-        rms_values = np.mean(buffer_in, axis=1)  #this is not actually RMS'd. just trust me bro
-        rounded_values = np.round(rms_values, 2)
-        return rounded_values
-    
+    @property
+    def thermocouple_type(self):
+        if self.raw_voltage:
+            types = self.channel_type.thermocouple_types
+            return types[0] if len(types) == 1 else types
+        return self.channel_type.settings['thermocouple_type']
 
-    
-    def get_channel_names(self):
-        return self.channel_names
-    
-    def set_channel_name(self, position, name):
+    def set_thermocouple_type(self, thermocouple_type):
         """
-        Set the name of a specific channel based on its position.
+        Change the thermocouple type of every channel on the existing task.
 
-        Args:
-            position (int): Position of the channel (0-based index).
-            name (str): New name for the channel.
+        In raw-voltage mode only the linearization changes, and a list sets one type per channel.
         """
-        if position < 0 or position >= self.chans_in:
-            raise ValueError(f"Invalid position value. Must be between 0 and {self.chans_in-1}.")
-        self.channel_names[position] = name
+        if self.raw_voltage:
+            self.channel_type.set_thermocouple_types(thermocouple_type)
+        else:
+            self.set_channel_settings(thermocouple_type=thermocouple_type)
 
-    
-    def start(self):
-        self.task_in.start()
-        
-    def stop(self):
-        self.task_in.stop()
-        
-    def close(self):
-        self.task_in.close()
\ No newline at end of file
+    def set_cjc_temperature(self, cjc_temperature):
+        """
+        Set the cold-junction temperature in degC used to linearize raw voltages.
+        """
+        if not self.raw_voltage:
+            raise RuntimeError("The driver compensates the cold junction unless the module reads raw voltages.")
+        self.channel_type.set_cjc_temperature(cjc_temperature)
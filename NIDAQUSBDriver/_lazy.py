@@ -0,0 +1,39 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    Submodules resolve the same way, so `nidaqmx.errors.DaqError` works on the
+    proxy exactly as on the real package. A module that cannot be imported
+    raises AttributeError chained from the ImportError, so hasattr() and
+    getattr() with a default behave as on any object.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        if self._module is None:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError as e:
+                raise AttributeError(f"{attr} is not available: {e}") from e
+        try:
+            return getattr(self._module, attr)
+        except AttributeError:
+            pass
+        try:
+            return importlib.import_module(f"{self._name}.{attr}")
+        except ImportError as e:
+            raise AttributeError(f"module '{self._name}' has no attribute '{attr}'") from e
+
+
+# Importing nidaqmx loads the whole driver binding, which takes longer than
+# everything else in this package together. Modules use this proxy so that cost
+# is only paid once a task is created or a driver name is actually needed.
+nidaqmx = LazyModule('nidaqmx')
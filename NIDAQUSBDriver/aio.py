@@ -0,0 +1,163 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from ._lazy import nidaqmx
+from .faults import read_with_policy
+
+
+class AsyncReader:
+    """
+    asyncio front end for one NIDAQVoltage/NIDAQThermo module.
+
+    When the task supports the every-N-samples event, the driver callback wakes
+    the event loop and the block is read on the loop once it is already in the
+    DAQ buffer, so no thread hop is needed per read. Otherwise reads run on a
+    single worker thread owned by this module. So do reads under a 'retry' or
+    'reinitialize' error policy, whose backoff sleeps and task rebuilds would
+    otherwise block the loop.
+    """
+
+    def __init__(self, daq):
+        self.daq = daq
+        self.mode = None
+        self.skipped_blocks = 0
+        self._loop = None
+        self._wakeup = None
+        self._executor = None
+
+    def _attach(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            raise RuntimeError("AsyncReader is already bound to another event loop.")
+        if self.daq.background is not None:
+            raise RuntimeError("Stop background acquisition before reading asynchronously.")
+
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self.daq.stop()
+        try:
+            self.daq.register_samples_event(
+                self.daq.samples_per_read, self._on_samples)
+            self.mode = 'event'
+        except (AttributeError, NotImplementedError, nidaqmx.errors.DaqError):
+            self.mode = 'executor'
+        self.daq.start()
+
+    def _run_in_executor(self, function):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"nidaq-mod{self.daq.position}")
+        return self._loop.run_in_executor(self._executor, function)
+
+    def _on_samples(self, task_handle, every_n_samples_event_type, number_of_samples, callback_data):
+        # Runs on a driver thread; hand the wakeup to the loop. Events can still
+        # arrive after the loop has closed or close() detached it, until the task stops.
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return 0
+        try:
+            loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # The loop closed between the check and the call.
+            pass
+        return 0
+
+    def _available(self):
+        return self.daq.task_in.in_stream.avail_samp_per_chan
+
+    def _skip_backlog(self):
+        n = self.daq.samples_per_read
+        stale_blocks = self._available() // n - 1
+        for _ in range(max(stale_blocks, 0)):
+            read_with_policy(self.daq, self.daq.buffer_in, timeout=0)
+            self.skipped_blocks += 1
+
+    async def read(self, skip_backlog=False, close_on_cancel=True):
+        """
+        Wait for the next block without blocking the event loop and return its reduction.
+
+        Args:
+            skip_backlog (bool): Discard whole blocks that queued up while the
+                consumer was busy and return the newest one.
+            close_on_cancel (bool): Stop and close the task if the read is cancelled.
+
+        Returns:
+            np.ndarray: Same result as daq.read_samples().
+        """
+        self._attach()
+        try:
+            if self.mode == 'executor':
+                return await self._run_in_executor(self.daq.read_samples)
+
+            n = self.daq.samples_per_read
+            while True:
+                # Clear first, so an event raised by the restart below is not lost.
+                self._wakeup.clear()
+                self.daq._restart_finished_acquisition(n)
+                if self._available() >= n:
+                    break
+                await self._wakeup.wait()
+            # The samples are buffered, but a failed read would sleep and rebuild the task on the loop.
+            blocking_policy = self.daq.error_policy.action in ('retry', 'reinitialize')
+            if skip_backlog:
+                if blocking_policy:
+                    await self._run_in_executor(self._skip_backlog)
+                else:
+                    self._skip_backlog()
+            if blocking_policy:
+                return await self._run_in_executor(self.daq.read_samples)
+            return self.daq.read_samples()
+        except asyncio.CancelledError:
+            if close_on_cancel:
+                self.close()
+            raise
+
+    async def stream(self, skip_backlog=False, close_on_exit=True):
+        """
+        Yield one reduced block per hardware block for as long as the consumer iterates.
+
+        Blocks are only read when the consumer asks for the next one; in the
+        meantime samples queue up in the DAQ input buffer, which is the
+        backpressure. Set skip_backlog to always receive the newest block.
+
+        Args:
+            skip_backlog (bool): Discard blocks the consumer fell behind on.
+            close_on_exit (bool): Stop and close the task when iteration ends or is cancelled.
+        """
+        try:
+            while True:
+                yield await self.read(skip_backlog=skip_backlog, close_on_cancel=False)
+        finally:
+            if close_on_exit:
+                self.close()
+
+    def close(self):
+        """
+        Stop and close the task and release the event registration or worker thread.
+        """
+        if self._loop is None:
+            return
+        try:
+            self.release()
+        finally:
+            self.daq.close()
+
+    def release(self):
+        """
+        Stop the task and release the event registration and worker thread, leaving the task open.
+
+        NIDAQModule.close() calls this, so closing the module also ends its asynchronous reads.
+        """
+        if self._loop is None:
+            return
+        try:
+            self.daq.stop()
+            if self.mode == 'event':
+                self.daq.register_samples_event(self.daq.samples_per_read, None)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._loop = None
+            self.mode = None
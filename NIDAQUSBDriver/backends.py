@@ -0,0 +1,16 @@
+from ._lazy import nidaqmx
+
+
+class NidaqmxBackend:
+    """
+    Creates real NI-DAQmx tasks. This is the default backend of the client classes.
+
+    A backend provides create_task() and create_reader(task). See
+    simulated.SimulatedBackend for a backend that needs no hardware.
+    """
+
+    def create_task(self):
+        return nidaqmx.Task()
+
+    def create_reader(self, task):
+        return nidaqmx.stream_readers.AnalogMultiChannelReader(task.in_stream)
@@ -0,0 +1,245 @@
+import threading
+import time
+
+import numpy as np
+
+from ._lazy import nidaqmx
+from .faults import read_with_policy
+
+
+# Seconds a reader thread waits beyond one block's duration before its read times out.
+TIMEOUT_MARGIN = 1.0
+
+class RingBuffer:
+    """
+    Fixed-size (channels x capacity) sample ring for one writer and any number of readers.
+
+    The writer never blocks on readers. Readers copy out of the ring and retry
+    if the writer overwrote the samples they were copying, so neither side takes
+    a lock.
+    """
+
+    def __init__(self, chans, capacity):
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1 sample.")
+        self.chans = chans
+        self.capacity = capacity
+        self.data = np.zeros((chans, capacity))
+        # Total samples published so far, and the end of the write in progress.
+        self.count = 0
+        self._write_end = 0
+
+    def write(self, block):
+        """
+        Append a (chans, n) block of samples, overwriting the oldest ones.
+
+        Args:
+            block (np.ndarray): Samples grouped by channel.
+        """
+        n = block.shape[1]
+        end = self.count + n
+        if n > self.capacity:
+            block = block[:, -self.capacity:]
+            n = self.capacity
+        start = (end - n) % self.capacity
+        first = min(n, self.capacity - start)
+        self._write_end = end
+        self.data[:, start:start + first] = block[:, :first]
+        self.data[:, :n - first] = block[:, first:]
+        self.count = end
+
+    def window(self, n, out=None):
+        """
+        Copy the most recent n samples of every channel, oldest first.
+
+        Args:
+            n (int): Number of samples per channel.
+            out (np.ndarray, optional): (chans, n) array that receives the samples.
+
+        Returns:
+            np.ndarray: The (chans, n) window.
+        """
+        if n > self.capacity:
+            raise ValueError(f"Window of {n} samples exceeds ring capacity of {self.capacity}.")
+        if out is None:
+            out = np.empty((self.chans, n))
+        while True:
+            end = self.count
+            if end < n:
+                raise ValueError(f"Only {end} samples have been acquired so far.")
+            start = (end - n) % self.capacity
+            first = min(n, self.capacity - start)
+            out[:, :first] = self.data[:, start:start + first]
+            out[:, first:] = self.data[:, :n - first]
+            # If the writer reached past our oldest sample while we copied, the
+            # window is torn and has to be taken again.
+            if self._write_end - self.capacity <= end - n:
+                return out
+
+    def latest(self):
+        """
+        Return the most recent sample of every channel.
+        """
+        return self.window(1)[:, 0]
+
+
+class BackgroundAcquisition:
+    """
+    Drains a running NIDAQVoltage/NIDAQThermo task into a RingBuffer off the caller's thread.
+
+    Uses the driver's every-N-samples event when the task supports it and falls
+    back to a dedicated reader thread otherwise. Consumers read from the ring
+    and never wait on the hardware. Failed reads follow the module's error
+    policy. After a masked block the reader pauses, starting at the policy's
+    backoff and doubling up to max_backoff. If the policy raises, draining
+    stops and the error is kept in `last_error`.
+
+    The reader thread waits up to one block's duration plus TIMEOUT_MARGIN for
+    each read. stop() stops the task, which aborts a read that is waiting.
+    """
+
+    def __init__(self, daq, capacity=None, use_events=True):
+        self.daq = daq
+        self.samples_per_block = daq.samples_per_read
+        self.read_timeout = self.samples_per_block / daq.sampling_freq_in + TIMEOUT_MARGIN
+        if capacity is None:
+            capacity = max(daq.buffer_in_size, self.samples_per_block)
+        self.ring = RingBuffer(daq.chans_in, capacity)
+        self.use_events = use_events
+        self.mode = None
+        self.error_count = 0
+        self.last_error = None
+        # Pause after a failed read; grows like the error policy's backoff until a read succeeds.
+        self._delay = daq.error_policy.backoff
+        self._block = np.zeros((daq.chans_in, self.samples_per_block))
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the task and begin draining it in the background.
+        """
+        if self._running.is_set():
+            return
+        if self.mode is not None:
+            # Draining stopped after an error the policy raised; release the old registration first.
+            self.stop()
+        self.daq.stop()
+        self._running.set()
+        self.mode = 'thread'
+        # A finite acquisition raises no more events once it has ended, so it
+        # is drained by the thread, which restarts it.
+        if self.use_events and self.daq.acquisition_type != nidaqmx.constants.AcquisitionType.FINITE:
+            try:
+                self.daq.register_samples_event(
+                    self.samples_per_block, self._on_samples)
+                self.mode = 'event'
+            except (AttributeError, NotImplementedError, nidaqmx.errors.DaqError):
+                pass
+        self.daq.start()
+        if self.mode == 'thread':
+            self._thread = threading.Thread(target=self._run, name=f"nidaq-mod{self.daq.position}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop draining and stop the task. Samples already in the ring stay readable.
+        """
+        if self.mode is None:
+            return
+        self._running.clear()
+        if self._thread is not None:
+            # Stopping the task aborts the reader's waiting read; stop again in
+            # case the reader began another read, which restarts the task, in between.
+            self.daq.stop()
+            self._thread.join()
+            self._thread = None
+        self.daq.stop()
+        if self.mode == 'event':
+            self.daq.register_samples_event(self.samples_per_block, None)
+        self.mode = None
+
+    @property
+    def running(self):
+        return self._running.is_set()
+
+    @property
+    def samples_acquired(self):
+        return self.ring.count
+
+    def latest(self):
+        """
+        Return the most recent sample of every channel.
+        """
+        return self.ring.latest()
+
+    def window(self, n, out=None):
+        """
+        Return a (chans_in, n) copy of the most recent n samples, oldest first.
+        """
+        return self.ring.window(n, out=out)
+
+    def reduce(self, func=np.mean, n=None):
+        """
+        Apply a per-channel reduction over the most recent n samples.
+
+        Args:
+            func (callable): NumPy-style reduction accepting `axis`. Defaults to np.mean.
+            n (int, optional): Window length. Defaults to one read block.
+
+        Returns:
+            np.ndarray: One value per channel.
+        """
+        if n is None:
+            n = self.samples_per_block
+        return func(self.ring.window(n), axis=1)
+
+    def _drain(self, timeout):
+        metrics = self.daq.metrics
+        if metrics is not None:
+            backlog = metrics.read_backlog()
+            started = time.perf_counter()
+        policy = self.daq.error_policy
+        self.daq._restart_finished_acquisition(self.samples_per_block)
+        try:
+            # Retries, reinitialization and logging follow the module's error policy.
+            valid = read_with_policy(self.daq, self._block, timeout=timeout, stopped=self._stopping)
+        except nidaqmx.errors.DaqError as e:
+            if self._stopping():
+                # stop() aborted the read.
+                return
+            # The policy gave up with 'raise'. Nobody can catch it on this thread, so stop draining.
+            self.error_count += 1
+            self.last_error = e
+            self._running.clear()
+            return
+        if not valid:
+            # Masked: drop the block and back off, so a persistent fault does not spin the reader.
+            if metrics is not None:
+                metrics.record(self.samples_per_block, backlog, time.perf_counter() - started, 0.0, valid=False)
+            self.error_count += 1
+            self.last_error = self.daq.error_stats.last_error
+            time.sleep(self._delay)
+            self._delay = min(self._delay * 2, policy.max_backoff)
+            return
+        self._delay = policy.backoff
+        if metrics is not None:
+            read_done = time.perf_counter()
+        self.daq.last_block_time = self.daq._timestamp_block(self.samples_per_block)
+        self.daq._convert_block(self._block)
+        self.ring.write(self._block)
+        self.daq._notify_block_listeners(self._block)
+        if metrics is not None:
+            metrics.record(self.samples_per_block, backlog, read_done - started, time.perf_counter() - read_done)
+
+    def _stopping(self):
+        return not self._running.is_set()
+
+    def _on_samples(self, task_handle, every_n_samples_event_type, number_of_samples, callback_data):
+        if self._running.is_set():
+            self._drain(timeout=0)
+        return 0
+
+    def _run(self):
+        while self._running.is_set():
+            self._drain(timeout=self.read_timeout)
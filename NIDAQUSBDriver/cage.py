@@ -0,0 +1,134 @@
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from ._lazy import nidaqmx
+
+
+# One aligned read across every module in the cage. `data` maps cage position to
+# that module's read_samples result; `timestamp` is the time.time() of the first
+# sample of the master's block, or of the start of the read if the master's read failed.
+CageFrame = namedtuple('CageFrame', ['timestamp', 'data'])
+
+
+class NIDAQCage:
+    """
+    Runs the NIDAQVoltage/NIDAQThermo modules of one cDAQ chassis as a group.
+
+    The lowest-positioned module is the master. Where the hardware allows it the
+    other modules take the master's start trigger (and its sample clock when the
+    rates match), so all modules begin acquiring on the same edge. Reads are
+    issued to every module concurrently, so a pass takes as long as the slowest
+    module rather than the sum of all of them. Every module must sample at the
+    same rate and read the same number of samples, so the blocks of one frame
+    cover the same stretch of time.
+    """
+
+    def __init__(self, modules, chassis='cDAQ1', synchronize=True):
+        """
+        Args:
+            modules (list): NIDAQVoltage/NIDAQThermo instances, one per cage position.
+            chassis (str, optional): Name of the cDAQ chassis the modules sit in. Every module's
+                device must be named '<chassis>Mod<n>', as DAQmx names them by default, so a
+                module of another chassis is caught here rather than by the shared trigger.
+                None skips the check, e.g. for modules renamed in NI MAX.
+            synchronize (bool): Share the master's start trigger and sample clock.
+        """
+        positions = [module.position for module in modules]
+        if not modules:
+            raise ValueError("A cage needs at least one module.")
+        if len(set(positions)) != len(positions):
+            raise ValueError(f"Duplicate cage positions: {positions}.")
+        if chassis is not None:
+            foreign = [module.device for module in modules if not module.device.startswith(f"{chassis}Mod")]
+            if foreign:
+                raise ValueError(f"Devices {foreign} are not modules of chassis {chassis}.")
+        timings = {(module.sampling_freq_in, module.samples_per_read) for module in modules}
+        if len(timings) > 1:
+            raise ValueError(f"Modules must share one sampling rate and read size; got (Hz, samples) {sorted(timings)}.")
+
+        self.chassis = chassis
+        self.modules = sorted(modules, key=lambda module: module.position)
+        self.master = self.modules[0]
+        self.synchronized = {module.position: False for module in self.modules}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.modules), thread_name_prefix='nidaq-cage')
+        if synchronize:
+            self.synchronize()
+
+    def synchronize(self):
+        """
+        Route the master's start trigger, and its sample clock where the rates match, to the other modules.
+
+        Modules whose hardware refuses a shared signal keep their own timing.
+
+        Returns:
+            dict: Cage position -> whether that module now starts on the master's trigger.
+        """
+        self.synchronized[self.master.position] = True
+        master_timing = self.master.task_in.timing
+        start_trigger_term = self.master.task_in.triggers.start_trigger.term
+        for module in self.modules[1:]:
+            if module.sampling_freq_in == self.master.sampling_freq_in:
+                try:
+                    self._configure_clock(module, master_timing.samp_clk_term)
+                except nidaqmx.errors.DaqError:
+                    self._configure_clock(module, '')
+            try:
+                module.task_in.triggers.start_trigger.cfg_dig_edge_start_trig(start_trigger_term)
+                module.start_trigger_source = start_trigger_term
+                self.synchronized[module.position] = True
+            except nidaqmx.errors.DaqError:
+                self.synchronized[module.position] = False
+        return dict(self.synchronized)
+
+    @staticmethod
+    def _configure_clock(module, source):
+        # An empty source selects the module's own onboard clock. The module keeps
+        # the source, so reconfiguring or rebuilding its task stays on the shared clock.
+        module.clock_source = source
+        try:
+            module.configure_timing()
+        except nidaqmx.errors.DaqError:
+            module.clock_source = ''
+            raise
+
+    def start(self):
+        # Arm the triggered modules first so none of them misses the master's start edge.
+        for module in self.modules[1:]:
+            module.start()
+        self.master.start()
+
+    def stop(self):
+        for module in self.modules:
+            module.stop()
+
+    def close(self):
+        """
+        Close every module, even if closing an earlier one fails, then raise the first failure.
+        """
+        error = None
+        for module in self.modules:
+            try:
+                module.close()
+            except Exception as exc:
+                if error is None:
+                    error = exc
+        self._executor.shutdown()
+        if error is not None:
+            raise error
+
+    def read(self):
+        """
+        Read one block from every module concurrently.
+
+        Returns:
+            CageFrame: Timestamp and per-position readings.
+        """
+        started = time.time()
+        futures = [(module.position, self._executor.submit(module.read_samples)) for module in self.modules]
+        data = {position: future.result() for position, future in futures}
+        block_time = self.master.last_block_time
+        return CageFrame(block_time.start_time if block_time is not None else started, data)
+
+    def get_channel_names(self):
+        return {module.position: module.get_channel_names() for module in self.modules}
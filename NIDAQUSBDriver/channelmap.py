@@ -0,0 +1,174 @@
+from collections import namedtuple
+
+import numpy as np
+
+
+# One wired input. `index` is the physical channel number (ai<index>). `scale`
+# holds polynomial coefficients in ascending powers, applied to the value the
+# driver returns: (offset, gain) is a linear scale. `min_val` and `max_val`
+# override the channel type's input range for this channel. Anything left as
+# None falls back to the module's defaults.
+MappedChannel = namedtuple('MappedChannel', ['index', 'name', 'units', 'scale', 'min_val', 'max_val'],
+                           defaults=(None, None, None, None, None))
+
+# Block widths ChannelMap keeps scratch arrays for, e.g. a full read and the last partial block of a FINITE acquisition.
+SCRATCH_WIDTHS = 4
+
+
+def linear_scale(gain, offset=0.0):
+    """
+    Coefficients of the scale gain * x + offset, for MappedChannel.scale.
+    """
+    return (offset, gain)
+
+
+class ChannelMap:
+    """
+    Which physical channels of a module are acquired, and what they are.
+
+    Only the mapped channels are added to the task, in the order given, so
+    unused inputs cost no bandwidth, buffer space or reduction time. Channels
+    with a scale are converted on the host, in place, with one vectorized
+    Horner pass per run of adjacent scaled channels.
+
+        ChannelMap([
+            MappedChannel(0, 'Inlet pressure', 'bar', scale=linear_scale(2.5), min_val=0.0, max_val=4.0),
+            MappedChannel(1, 'Outlet pressure', 'bar', scale=linear_scale(2.5), min_val=0.0, max_val=4.0),
+            MappedChannel(5, 'Flow', 'l/min', scale=(0.12, 3.9, -0.04)),
+        ])
+
+    A dict of {index: name} or {index: dict of MappedChannel fields} is also accepted.
+    """
+
+    def __init__(self, channels):
+        if isinstance(channels, dict):
+            channels = [MappedChannel(index, **spec) if isinstance(spec, dict) else MappedChannel(index, spec)
+                        for index, spec in channels.items()]
+        self.channels = [channel if isinstance(channel, MappedChannel) else MappedChannel(channel) for channel in channels]
+        if not self.channels:
+            raise ValueError("A channel map needs at least one channel.")
+        indices = [channel.index for channel in self.channels]
+        if min(indices) < 0:
+            raise ValueError("Invalid channel index. Must be 0 or greater.")
+        if len(set(indices)) != len(indices):
+            raise ValueError(f"Channels {sorted({i for i in indices if indices.count(i) > 1})} are mapped more than once.")
+
+        if any(channel.scale is not None and len(channel.scale) == 0 for channel in self.channels):
+            raise ValueError("A channel scale needs at least one coefficient.")
+
+        # Rows with a scale and their coefficients, padded with zeros to a common degree.
+        self._scaled_rows = np.array([row for row, channel in enumerate(self.channels) if channel.scale is not None], dtype=np.intp)
+        degree = max((len(self.channels[row].scale) for row in self._scaled_rows), default=0)
+        self._coefficients = np.zeros((len(self._scaled_rows), degree))
+        for i, row in enumerate(self._scaled_rows):
+            scale = self.channels[row].scale
+            self._coefficients[i, :len(scale)] = scale
+        # (first scaled row, stop, offset into _scaled_rows) of every run of adjacent scaled rows.
+        self._runs = []
+        for i, row in enumerate(self._scaled_rows.tolist()):
+            if self._runs and self._runs[-1][1] == row:
+                first, _, offset = self._runs[-1]
+                self._runs[-1] = (first, row + 1, offset)
+            else:
+                self._runs.append((row, row + 1, i))
+        # Scratch arrays for the last few block widths, so converting allocates nothing once warm. See _scratch_for.
+        self._scratch = {}
+
+    def __len__(self):
+        return len(self.channels)
+
+    @property
+    def indices(self):
+        return [channel.index for channel in self.channels]
+
+    @property
+    def units(self):
+        return [channel.units for channel in self.channels]
+
+    @property
+    def scaled(self):
+        return len(self._scaled_rows) > 0
+
+    def names(self, prefix):
+        """
+        Channel names, with unnamed channels called '<prefix> <index + 1>' like unmapped modules.
+        """
+        return [channel.name if channel.name is not None else f"{prefix} {channel.index + 1}" for channel in self.channels]
+
+    def groups(self, device):
+        """
+        Split the map into physical channel strings that can each be added to a task in one call.
+
+        Consecutive channels with consecutive indices and the same range are
+        joined into one 'ai<first>:<last>' span.
+
+        Returns:
+            list: (physical_channel, overrides) pairs, where overrides holds min_val/max_val when set.
+        """
+        groups = []
+        first = last = None
+        span_range = None
+        for channel in self.channels:
+            channel_range = (channel.min_val, channel.max_val)
+            if first is not None and channel.index == last + 1 and channel_range == span_range:
+                last = channel.index
+                continue
+            if first is not None:
+                groups.append(self._group(device, first, last, span_range))
+            first = last = channel.index
+            span_range = channel_range
+        groups.append(self._group(device, first, last, span_range))
+        return groups
+
+    @staticmethod
+    def _group(device, first, last, channel_range):
+        physical_channel = f"{device}/ai{first}" if first == last else f"{device}/ai{first}:{last}"
+        overrides = {name: value for name, value in zip(('min_val', 'max_val'), channel_range) if value is not None}
+        return physical_channel, overrides
+
+    def physical_channels(self, device):
+        """
+        The mapped channels as one comma-separated physical channel string.
+        """
+        return ','.join(physical_channel for physical_channel, _ in self.groups(device))
+
+    def convert(self, block, out=None):
+        """
+        Apply the channel scales to a (chans, n) block. Unscaled rows are copied unchanged.
+
+        Args:
+            block (np.ndarray): One row per mapped channel, in map order.
+            out (np.ndarray, optional): Receives the result. May be `block` itself.
+        """
+        if out is None:
+            out = np.array(block, dtype=np.float64)
+        elif out is not block:
+            out[...] = block
+        if not self.scaled:
+            return out
+        x, terms = self._scratch_for(out.shape[1])
+        # Runs are slices, so each step works on views of `out` rather than gathered copies of its rows.
+        for first, stop, offset in self._runs:
+            end = offset + stop - first
+            rows = out[first:stop]
+            run_x = x[offset:end]
+            np.copyto(run_x, rows)
+            np.copyto(rows, terms[-1, offset:end])
+            for k in range(len(terms) - 2, -1, -1):
+                rows *= run_x
+                rows += terms[k, offset:end]
+        return out
+
+    def _scratch_for(self, n):
+        # The raw scaled rows and every coefficient tiled to (rows, n). NumPy buffers a
+        # broadcast operand on each call, so full-size terms keep Horner's steps free of temporaries.
+        scratch = self._scratch.get(n)
+        if scratch is None:
+            if len(self._scratch) >= SCRATCH_WIDTHS:
+                # Widths are dropped oldest first, so callers that vary n do not grow this without bound.
+                del self._scratch[next(iter(self._scratch))]
+            shape = (len(self._scaled_rows), n)
+            terms = np.empty((self._coefficients.shape[1],) + shape)
+            terms[...] = self._coefficients.T[:, :, None]
+            scratch = self._scratch[n] = (np.empty(shape), terms)
+        return scratch
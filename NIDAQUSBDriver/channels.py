@@ -0,0 +1,268 @@
+import numpy as np
+
+from ._lazy import nidaqmx
+from .thermocouples import Linearizer
+
+
+def lookup(enum_name, name, what):
+    """
+    Resolve `name` to a member of the nidaqmx.constants enum `enum_name`, or raise ValueError.
+    """
+    enum = getattr(nidaqmx.constants, enum_name)
+    if isinstance(name, enum):
+        return name
+    if name not in enum.__members__:
+        raise ValueError(f"Invalid {what}. Must be one of {list(enum.__members__)}.")
+    return enum[name]
+
+
+class ChannelType:
+    """
+    How one kind of analog input channel is added to a task, named and reduced.
+
+    Subclasses set the AIChannelCollection method used to add the channels and
+    the defaults of the module type. Settings are the keyword arguments of that
+    method. Enum settings can be given by member name (e.g. 'NRSE', 'K').
+    """
+
+    add_method = None
+    name_prefix = 'Channel'
+    default_channel_count = 8
+    default_statistics = ('mean',)
+    default_decimals = None
+    # Setting name -> (nidaqmx.constants enum, description used in errors).
+    enum_settings = {}
+    # Setting name -> AIChannel property that changes it on an existing task.
+    channel_properties = {'min_val': 'ai_min', 'max_val': 'ai_max'}
+    # Object with convert(block, out=block) applied to every block in place, e.g. a Linearizer.
+    converter = None
+    # (name, units) of channels acquired after the module's own, e.g. a cold-junction sensor.
+    auxiliary_channels = ()
+
+    def __init__(self, **settings):
+        self.settings = {}
+        self.update(**settings)
+
+    def update(self, **settings):
+        """
+        Validate and store settings, resolving enum names.
+
+        Returns:
+            dict: The resolved settings that were passed in.
+        """
+        resolved = {}
+        for name, value in settings.items():
+            if name in self.enum_settings:
+                enum_name, what = self.enum_settings[name]
+                value = lookup(enum_name, value, what)
+            resolved[name] = value
+        self.settings.update(resolved)
+        return resolved
+
+    def validate(self, chans):
+        """
+        Check the settings against the module's channel count, before any task is built. Raises ValueError.
+        """
+
+    def add_channels(self, task, physical_channel, **overrides):
+        """
+        Add the channels with the stored settings. `overrides` replace settings for these channels only, e.g. min_val.
+        """
+        getattr(task.ai_channels, self.add_method)(physical_channel, **dict(self.settings, **overrides))
+
+    def add_auxiliary_channels(self, task, device):
+        """
+        Add the auxiliary_channels of module `device` to `task`, after the module's own channels.
+        """
+
+    def apply(self, task, **settings):
+        """
+        Change settings on the channels of an existing (stopped) task.
+        """
+        unsupported = [name for name in settings if name not in self.channel_properties]
+        if unsupported:
+            raise ValueError(f"Settings {unsupported} cannot be changed on an existing task. "
+                             f"Must be from {list(self.channel_properties)}.")
+        resolved = self.update(**settings)
+        for name, value in resolved.items():
+            setattr(task.ai_channels.all, self.channel_properties[name], value)
+
+
+class VoltageChannels(ChannelType):
+    add_method = 'add_ai_voltage_chan'
+    name_prefix = 'Voltage Channel'
+    default_channel_count = 32
+    default_statistics = ('rms',)
+    default_decimals = 5
+    enum_settings = {'terminal_config': ('TerminalConfiguration', "terminal configuration")}
+    channel_properties = dict(ChannelType.channel_properties, terminal_config='ai_term_cfg')
+
+    def __init__(self, terminal_config='NRSE', **settings):
+        super().__init__(terminal_config=terminal_config, **settings)
+
+
+class ThermocoupleChannels(ChannelType):
+    add_method = 'add_ai_thrmcpl_chan'
+    name_prefix = 'Thermo Channel'
+    default_channel_count = 8
+    default_statistics = ('mean',)
+    default_decimals = 2
+    enum_settings = {
+        'thermocouple_type': ('ThermocoupleType', "thermocouple type"),
+        'units': ('TemperatureUnits', "temperature unit"),
+        'cjc_source': ('CJCSource', "CJC source"),
+    }
+    channel_properties = dict(ChannelType.channel_properties, thermocouple_type='ai_thrmcpl_type')
+    allowed_thermocouple_types = ['B', 'E', 'J', 'K', 'N', 'R', 'S', 'T']
+
+    def __init__(self, thermocouple_type='J', units='DEG_C', **settings):
+        super().__init__(thermocouple_type=thermocouple_type, units=units, **settings)
+
+    def update(self, **settings):
+        # Check for valid thermocouple type
+        thermocouple_type = getattr(settings.get('thermocouple_type'), 'name', settings.get('thermocouple_type'))
+        if 'thermocouple_type' in settings and thermocouple_type not in self.allowed_thermocouple_types:
+            raise ValueError(f"Invalid thermocouple type. Must be one of {self.allowed_thermocouple_types}.")
+        return super().update(**settings)
+
+
+class RawThermocoupleChannels(ChannelType):
+    """
+    Thermocouples read as raw voltages and linearized on the host.
+
+    Each block is converted to degC in one vectorized table lookup per
+    thermocouple type, so channels can mix types. The cold-junction
+    temperature is supplied by the caller, or with cjc_source='BUILT_IN'
+    measured by the module's own sensor (<device>/_cjtemp). The sensor is
+    then acquired as an extra last channel, 'CJC' in degC, and every sample is
+    compensated with the temperature measured with it. With linearize=False
+    blocks stay in volts, e.g. to record raw captures and convert them
+    offline with thermocouples.convert_recording.
+    """
+
+    add_method = 'add_ai_voltage_chan'
+    name_prefix = 'Thermo Channel'
+    default_channel_count = 8
+    default_statistics = ('mean',)
+    default_decimals = 2
+    cjc_sources = ['CONSTANT_USER_VALUE', 'BUILT_IN']
+
+    def __init__(self, thermocouple_types='J', cjc_temperature=25.0, linearize=True, min_val=-0.08, max_val=0.08,
+                 cjc_source='CONSTANT_USER_VALUE', **settings):
+        """
+        Args:
+            thermocouple_types (str or list): One type for every channel, or one per channel.
+            cjc_temperature (float or list): Cold-junction temperature in degC, for all channels or one per channel.
+            linearize (bool): Convert blocks to degC. Blocks stay in volts otherwise.
+            min_val, max_val (float): Input range in volts.
+            cjc_source (str): 'CONSTANT_USER_VALUE' uses cjc_temperature, 'BUILT_IN' the module's sensor.
+        """
+        cjc_source = getattr(cjc_source, 'name', cjc_source)
+        if cjc_source not in self.cjc_sources:
+            raise ValueError(f"Invalid CJC source. Must be one of {self.cjc_sources}.")
+        super().__init__(min_val=min_val, max_val=max_val, **settings)
+        self.cjc_source = cjc_source
+        if cjc_source == 'BUILT_IN':
+            self.auxiliary_channels = (('CJC', 'degC'),)
+        # Thermocouple channels of the module; known once a module validates its channels.
+        self.chans = None
+        self.linearize = linearize
+        if not linearize:
+            self.default_decimals = None
+        self._set_linearizer(Linearizer(thermocouple_types, cjc_temperature))
+
+    def _set_linearizer(self, linearizer):
+        if self.chans is not None:
+            linearizer.check(self.chans)
+        self.linearizer = linearizer
+        if not self.linearize:
+            self.converter = None
+        elif self.cjc_source == 'BUILT_IN':
+            self.converter = self
+        else:
+            self.converter = linearizer
+
+    @property
+    def thermocouple_types(self):
+        return self.linearizer.thermocouple_types
+
+    def validate(self, chans):
+        self.linearizer.check(chans)
+        self.chans = chans
+
+    def add_auxiliary_channels(self, task, device):
+        if self.cjc_source == 'BUILT_IN':
+            task.ai_channels.add_ai_temp_built_in_sensor_chan(f"{device}/_cjtemp",
+                                                              units=nidaqmx.constants.TemperatureUnits.DEG_C)
+
+    def convert(self, block, out=None):
+        """
+        Linearize a (chans + 1, n) block whose last row is the built-in cold-junction sensor, in degC.
+        """
+        if out is None:
+            out = np.array(block, dtype=np.float64)
+        elif out is not block:
+            out[...] = block
+        self.linearizer.convert(out[:-1], cjc_temperature=out[-1:], out=out[:-1])
+        return out
+
+    def set_thermocouple_types(self, thermocouple_types):
+        """
+        Change the types used for linearization. The task itself is unaffected.
+        """
+        self._set_linearizer(Linearizer(thermocouple_types, self.linearizer.cjc_temperature))
+
+    def set_cjc_temperature(self, cjc_temperature):
+        """
+        Set the cold-junction temperature in degC used from the next block on.
+        """
+        if self.cjc_source == 'BUILT_IN':
+            raise RuntimeError("The cold junction is measured by the module's built-in sensor.")
+        self._set_linearizer(Linearizer(self.linearizer.thermocouple_types, cjc_temperature))
+
+
+class CurrentChannels(ChannelType):
+    add_method = 'add_ai_current_chan'
+    name_prefix = 'Current Channel'
+    default_channel_count = 8
+    enum_settings = {
+        'terminal_config': ('TerminalConfiguration', "terminal configuration"),
+        'shunt_resistor_loc': ('CurrentShuntResistorLocation', "shunt resistor location"),
+    }
+    channel_properties = dict(ChannelType.channel_properties, terminal_config='ai_term_cfg')
+
+    def __init__(self, min_val=-0.02, max_val=0.02, **settings):
+        super().__init__(min_val=min_val, max_val=max_val, **settings)
+
+
+class RTDChannels(ChannelType):
+    add_method = 'add_ai_rtd_chan'
+    name_prefix = 'RTD Channel'
+    default_channel_count = 4
+    default_decimals = 2
+    enum_settings = {
+        'units': ('TemperatureUnits', "temperature unit"),
+        'rtd_type': ('RTDType', "RTD type"),
+        'resistance_config': ('ResistanceConfiguration', "resistance configuration"),
+        'current_excit_source': ('ExcitationSource', "excitation source"),
+    }
+    channel_properties = dict(ChannelType.channel_properties, rtd_type='ai_rtd_type', r_0='ai_rtd_r0')
+
+    def __init__(self, rtd_type='PT_3851', resistance_config='THREE_WIRE', current_excit_source='INTERNAL', current_excit_val=0.001, r_0=100.0, **settings):
+        super().__init__(rtd_type=rtd_type, resistance_config=resistance_config, current_excit_source=current_excit_source,
+                         current_excit_val=current_excit_val, r_0=r_0, **settings)
+
+
+class StrainChannels(ChannelType):
+    add_method = 'add_ai_strain_gage_chan'
+    name_prefix = 'Strain Channel'
+    default_channel_count = 4
+    enum_settings = {
+        'strain_config': ('StrainGageBridgeType', "strain gage bridge type"),
+        'voltage_excit_source': ('ExcitationSource', "excitation source"),
+    }
+    channel_properties = dict(ChannelType.channel_properties, gage_factor='ai_strain_gage_gage_factor')
+
+    def __init__(self, strain_config='FULL_BRIDGE_I', voltage_excit_val=2.5, gage_factor=2.0, nominal_gage_resistance=350.0, **settings):
+        super().__init__(strain_config=strain_config, voltage_excit_val=voltage_excit_val, gage_factor=gage_factor,
+                         nominal_gage_resistance=nominal_gage_resistance, **settings)
@@ -0,0 +1,625 @@
+import time
+
+import numpy as np
+
+from ._lazy import nidaqmx
+from .backends import NidaqmxBackend
+from .channelmap import ChannelMap
+from .channels import lookup
+from .faults import ErrorPolicy, ErrorStats, read_with_policy
+from .policy import apply_buffer_sizes, derive_buffer_sizes
+from .reconfigure import commit, rebuild, reconfigure, warm_restart
+from .reductions import Reducer
+from .timestamps import SampleClock
+
+# Feature modules (asyncio reads, background acquisition, recording, shared
+# memory, trends, rolling statistics, metrics) are imported by the methods that
+# start them, so a plain read_samples client does not pay for loading them.
+
+
+class NIDAQModule:
+    """
+    Acquisition from one module in a cDAQ cage, whatever its channel type.
+
+    The channel type is a channels.ChannelType strategy. It decides how the
+    channels are added to the task, what they are called and how a block is
+    reduced by default. NIDAQVoltage and NIDAQThermo are this class with
+    VoltageChannels and ThermocoupleChannels. Other types (CurrentChannels,
+    RTDChannels, StrainChannels, ...) can be used directly:
+
+        daq = NIDAQModule(position=3, channel_type=RTDChannels(rtd_type='PT_3851'))
+    """
+
+    def __init__(self, position, channel_type, chans_in=None, device=None, sampling_freq_in=500, buffer_in_size=5000,
+                 samples_per_read=500, backend=None, error_policy=None, acquisition_type='CONTINUOUS', channel_map=None):
+        """
+        Args:
+            position (int): Position of the module in the cage, 1 to 4.
+            channel_type (ChannelType): Strategy for the module's channels.
+            chans_in (int, optional): Number of channels, from ai0. Defaults to the channel type's module size.
+            device (str, optional): DAQmx device name. Defaults to cDAQ1Mod<position>.
+            sampling_freq_in (float): Sample rate in Hz.
+            buffer_in_size (int): DAQ input buffer in samples per channel.
+            samples_per_read (int): Samples per channel in one read_samples call.
+            backend (optional): Task factory; see backends.NidaqmxBackend and simulated.SimulatedBackend.
+            error_policy (ErrorPolicy, optional): What to do when a read fails. Defaults to masking with NaN.
+            acquisition_type (str): 'CONTINUOUS' or 'FINITE'.
+            channel_map (ChannelMap or dict, optional): Acquire only these channels, with their
+                names, units, scales and ranges. Replaces chans_in.
+        """
+        # Check for valid position in the NI DAQ cage
+        if position not in [1, 2, 3, 4]:
+            raise ValueError("Invalid position value. Must be 1, 2, 3, or 4.")
+
+        self.position = position
+        self.device = device if device is not None else f"cDAQ1Mod{position}"
+        self.channel_type = channel_type
+        self.acquisition_type = lookup('AcquisitionType', acquisition_type, "acquisition type")
+        if channel_map is not None and chans_in is not None:
+            raise ValueError("Pass either chans_in or channel_map, not both.")
+        # Channel count without a channel map, from ai0.
+        self.unmapped_chans = chans_in if chans_in is not None else channel_type.default_channel_count
+        self._set_channel_map(channel_map)
+        self.reducer = Reducer(channel_type.default_statistics, decimals=channel_type.default_decimals)
+        self.sampling_freq_in = sampling_freq_in
+        self.buffer_sizes = derive_buffer_sizes(sampling_freq_in, samples_per_read=samples_per_read, input_buf_size=buffer_in_size,
+                                                continuous=self.continuous)
+        self.samples_per_read = self.buffer_sizes.samples_per_read
+        self.buffer_in_size = self.buffer_sizes.input_buf_size
+        self.buffer_in_size_cfg = self.buffer_in_size
+        self.bufsize_callback = self.buffer_in_size
+        self.running = False
+        # Sample clock and start trigger terminals to take timing from, e.g. a cage master's.
+        # '' and None mean the module's own clock and a software start.
+        self.clock_source = ''
+        self.start_trigger_source = None
+        # (sample_interval, callback) registered with register_samples_event, kept across rebuilds.
+        self.samples_event = None
+        self.error_policy = error_policy if error_policy is not None else ErrorPolicy()
+        self.error_stats = ErrorStats()
+        self.last_read_valid = True
+        # Timestamps every block read; see last_block_time.
+        self.clock = SampleClock(sampling_freq_in)
+        self.last_block_time = None
+        # The backend creates the task and reader; pass simulated.SimulatedBackend() to run without hardware.
+        self.backend = backend if backend is not None else NidaqmxBackend()
+        self.task_in = self.backend.create_task()
+        self.configure_task()
+        self.stream_in = self.backend.create_reader(self.task_in)
+        commit(self)
+        self.last_reconfigure_latency = None
+        self.last_reconfigure_kind = None
+        # Reused by every read_samples call that does not pass its own buffer.
+        self.buffer_in = np.zeros((self.chans_in, self.samples_per_read))
+        self.background = None
+        self.async_reader = None
+        self.recorder = None
+        self.publisher = None
+        self.trends = None
+        self.rolling = None
+        self.metrics = None
+        self.block_listeners = []
+
+    @property
+    def continuous(self):
+        # FINITE tasks acquire buffer_in_size samples and stop; everything else streams through a ring.
+        return self.acquisition_type != nidaqmx.constants.AcquisitionType.FINITE
+
+    @property
+    def physical_channel(self):
+        if self.channel_map is not None:
+            return self.channel_map.physical_channels(self.device)
+        return f"{self.device}/ai0:{self.unmapped_chans - 1}"
+
+    def _set_channel_map(self, channel_map):
+        if channel_map is not None and not isinstance(channel_map, ChannelMap):
+            channel_map = ChannelMap(channel_map)
+        if channel_map is not None:
+            outside = [index for index in channel_map.indices if index >= self.unmapped_chans]
+            if outside:
+                raise ValueError(f"Invalid channel indices {outside}. Must be between 0 and {self.unmapped_chans - 1}.")
+        chans = self.unmapped_chans if channel_map is None else len(channel_map)
+        # Before anything changes, so a channel type that does not fit the channels leaves the module as it was.
+        self.channel_type.validate(chans)
+        self.channel_map = channel_map
+        if channel_map is None:
+            names = [f"{self.channel_type.name_prefix} {i+1}" for i in range(chans)]
+            units = [None] * chans
+        else:
+            names = channel_map.names(self.channel_type.name_prefix)
+            units = channel_map.units
+        # Auxiliary channels, e.g. a cold-junction sensor, are acquired as the last rows.
+        auxiliary = self.channel_type.auxiliary_channels
+        self.chans_in = chans + len(auxiliary)
+        self.channel_names = names + [name for name, _ in auxiliary]
+        self.channel_units = units + [unit for _, unit in auxiliary]
+
+    def configure_task(self, task=None):
+        """
+        Add the module's channels and timing to `task`, by default the module's own task.
+        """
+        if task is None:
+            task = self.task_in
+        if self.channel_map is None:
+            self.channel_type.add_channels(task, self.physical_channel)
+        else:
+            for physical_channel, overrides in self.channel_map.groups(self.device):
+                self.channel_type.add_channels(task, physical_channel, **overrides)
+        self.channel_type.add_auxiliary_channels(task, self.device)
+        self.configure_timing(task)
+        task.in_stream.input_buf_size = self.bufsize_callback
+        if self.start_trigger_source is not None:
+            task.triggers.start_trigger.cfg_dig_edge_start_trig(self.start_trigger_source)
+        if self.samples_event is not None:
+            task.register_every_n_samples_acquired_into_buffer_event(*self.samples_event)
+
+    def configure_timing(self, task=None, sampling_freq_in=None, acquisition_type=None):
+        """
+        Configure the sample clock of `task`, by default the module's own, from `clock_source`.
+
+        Args:
+            sampling_freq_in (float, optional): Rate to configure. Defaults to the module's.
+            acquisition_type (AcquisitionType, optional): Defaults to the module's.
+        """
+        if task is None:
+            task = self.task_in
+        task.timing.cfg_samp_clk_timing(
+            rate=sampling_freq_in if sampling_freq_in is not None else self.sampling_freq_in,
+            source=self.clock_source,
+            sample_mode=acquisition_type if acquisition_type is not None else self.acquisition_type,
+            samps_per_chan=self.buffer_in_size_cfg)
+
+    def register_samples_event(self, sample_interval, callback):
+        """
+        Register `callback` for the task's every-N-samples event, or unregister it with None.
+
+        The registration is kept on the module, so a task rebuilt by
+        reinitialize() or set_channel_map() raises the event too. The task
+        must be stopped.
+        """
+        self.task_in.register_every_n_samples_acquired_into_buffer_event(sample_interval, callback)
+        self.samples_event = None if callback is None else (sample_interval, callback)
+
+    def read_samples(self, buffer=None, out=None):
+        """
+        Read one block of samples and reduce it with `self.reducer`.
+
+        The block is read into `buffer` (or the preallocated `self.buffer_in`)
+        and reduced in place. Passing `out` as well makes the read path
+        allocation free.
+
+        Args:
+            buffer (np.ndarray, optional): C-contiguous float64 array of shape
+                (chans_in, n) to read n samples per channel into.
+            out (np.ndarray or dict, optional): Preallocated result storage,
+                see Reducer.__call__.
+
+        Returns:
+            np.ndarray or dict: The reducer's output. By default the RMS
+                (voltage) or mean (thermocouple) of each channel. NaN if the
+                read failed and the error policy masked it; see `last_read_valid`.
+                When and how densely the block was sampled is in `last_block_time`.
+        """
+        if buffer is None:
+            buffer = self.buffer_in
+
+        self._restart_finished_acquisition(buffer.shape[1])
+
+        metrics = self.metrics
+        if metrics is not None:
+            backlog = metrics.read_backlog()
+            started = time.perf_counter()
+
+        # On failure the error policy retries, reinitializes, raises, or masks the block with NaN.
+        self.last_read_valid = read_with_policy(self, buffer)
+        if metrics is not None:
+            read_done = time.perf_counter()
+        if self.last_read_valid:
+            self.last_block_time = self._timestamp_block(buffer.shape[1])
+            self._convert_block(buffer)
+            self._notify_block_listeners(buffer)
+        else:
+            self.last_block_time = None
+
+        if metrics is None:
+            return self.reducer(buffer, out=out)
+        processed = time.perf_counter()
+        result = self.reducer(buffer, out=out)
+        metrics.record(buffer.shape[1], backlog, read_done - started, processed - read_done,
+                       time.perf_counter() - processed, self.last_read_valid)
+        return result
+
+    def _restart_finished_acquisition(self, samples):
+        """
+        Warm restart a FINITE acquisition that cannot supply `samples` more samples per channel.
+
+        Readers call this before waiting for a block. A finite task stops
+        acquiring, and raising every-N-samples events, once its samples are
+        taken, so a reader that waited first would wait forever.
+
+        Returns:
+            bool: True if the task was restarted.
+        """
+        if self.acquisition_type != nidaqmx.constants.AcquisitionType.FINITE or not self.running:
+            return False
+        in_stream = self.task_in.in_stream
+        if in_stream.avail_samp_per_chan >= samples:
+            return False
+        try:
+            remaining = self.buffer_in_size_cfg - in_stream.curr_read_pos
+        except (AttributeError, nidaqmx.errors.DaqError):
+            remaining = samples
+        if remaining >= samples and not self.task_in.is_task_done():
+            return False
+        # The acquisition has ended, or ends before another full block; start the next one on the same task.
+        self.warm_restart()
+        return True
+
+    def _convert_block(self, block):
+        # Host-side conversions, in place: the channel type's (e.g. thermocouple linearization), then the channel map's scales.
+        if self.channel_type.converter is not None:
+            self.channel_type.converter.convert(block, out=block)
+        if self.channel_map is not None and self.channel_map.scaled:
+            mapped = block[:len(self.channel_map)]
+            self.channel_map.convert(mapped, out=mapped)
+
+    def _timestamp_block(self, samples):
+        host_time = time.perf_counter()
+        in_stream = self.task_in.in_stream
+        try:
+            read_position = in_stream.curr_read_pos
+            acquired = in_stream.total_samp_per_chan_acquired
+        except (AttributeError, nidaqmx.errors.DaqError):
+            read_position = acquired = None
+        return self.clock.stamp(samples, host_time, read_position, acquired)
+
+    def add_block_listener(self, callback):
+        """
+        Call `callback(block)` with every raw (chans_in, n) block that is read.
+
+        The block is the reused read buffer, so listeners must copy anything
+        they keep beyond the call.
+        """
+        self.block_listeners.append(callback)
+
+    def remove_block_listener(self, callback):
+        self.block_listeners.remove(callback)
+
+    def _notify_block_listeners(self, block):
+        for listener in self.block_listeners:
+            listener(block)
+
+    def start_recording(self, path, **kwargs):
+        """
+        Stream every raw block that is read to `path`. See recorder.Recorder for the options.
+
+        Returns:
+            Recorder: The attached recorder.
+        """
+        from .recorder import Recorder
+
+        self.stop_recording()
+        kwargs['metadata'] = dict(kwargs.get('metadata') or {}, channel_units=self.channel_units)
+        self.recorder = Recorder(path, self.channel_names, self.sampling_freq_in, **kwargs)
+        self.add_block_listener(self.recorder.write)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.remove_block_listener(self.recorder.write)
+            self.recorder.close()
+            self.recorder = None
+
+    def start_publishing(self, name=None, slots=64, metadata=None):
+        """
+        Publish every raw block that is read to shared memory for other local processes.
+
+        Subscribers attach with sharedmem.SharedMemorySubscriber(publisher.name)
+        and can come and go while acquisition runs.
+
+        Args:
+            name (str, optional): Name of the shared memory segment. A unique name is chosen when omitted.
+            slots (int): Number of blocks kept in the ring.
+            metadata (dict, optional): Extra JSON-serialisable fields for subscribers.
+
+        Returns:
+            SharedMemoryPublisher: The attached publisher.
+        """
+        from .sharedmem import SharedMemoryPublisher
+
+        self.stop_publishing()
+        metadata = dict(metadata or {}, device=self.device, channel_units=self.channel_units)
+        self.publisher = SharedMemoryPublisher(self.channel_names, self.samples_per_read, self.sampling_freq_in,
+                                               slots=slots, name=name, metadata=metadata)
+        self.add_block_listener(self.publisher.write)
+        return self.publisher
+
+    def stop_publishing(self):
+        if self.publisher is not None:
+            self.remove_block_listener(self.publisher.write)
+            self.publisher.close()
+            self.publisher = None
+
+    def start_trends(self, periods=None, statistics=('mean', 'min', 'max'), capacity=3600, prefilter=None, decimation=None):
+        """
+        Keep downsampled views of the stream, such as 1 s and 1 min aggregates, for long captures.
+
+        See filters.MultiResolution for the options. The outputs are fixed-size
+        rings, so memory does not grow with the length of the capture.
+
+        Returns:
+            MultiResolution: The attached stage; read it with window(name, statistic).
+        """
+        from .filters import MultiResolution
+
+        self.stop_trends()
+        self.trends = MultiResolution(self.chans_in, self.sampling_freq_in, periods=periods, statistics=statistics,
+                                      capacity=capacity, prefilter=prefilter, decimation=decimation)
+        self.add_block_listener(self.trends.write)
+        return self.trends
+
+    def stop_trends(self):
+        if self.trends is not None:
+            self.remove_block_listener(self.trends.write)
+            self.trends = None
+
+    def start_rolling_stats(self, window_seconds=60.0, time_constant=None):
+        """
+        Keep running, sliding-window and exponentially weighted statistics of every channel.
+
+        The statistics are updated with every block read and can be queried at
+        any time, e.g. `daq.rolling.window.mean` or `daq.rolling.snapshot()`.
+
+        Args:
+            window_seconds (float, optional): Length of the sliding window, rounded up to whole
+                read blocks. None disables the window.
+            time_constant (float, optional): EWMA time constant in seconds. None disables the EWMA.
+
+        Returns:
+            RollingStats: The attached statistics.
+        """
+        from .rolling import RollingStats
+
+        self.stop_rolling_stats()
+        window_blocks = None
+        if window_seconds is not None:
+            window_blocks = max(int(np.ceil(window_seconds * self.sampling_freq_in / self.samples_per_read)), 1)
+        self.rolling = RollingStats(self.chans_in, window_blocks=window_blocks, time_constant=time_constant,
+                                    sampling_freq=self.sampling_freq_in)
+        self.add_block_listener(self.rolling.write)
+        return self.rolling
+
+    def stop_rolling_stats(self):
+        if self.rolling is not None:
+            self.remove_block_listener(self.rolling.write)
+            self.rolling = None
+
+    def start_metrics(self, buckets=None):
+        """
+        Instrument every read: phase timings, DAQ buffer backlog, read rate, errors and lost samples.
+
+        Read them with metrics.snapshot(), or export them with
+        metrics.prometheus_text(daq.metrics) or a metrics.MetricsServer.
+
+        Args:
+            buckets (iterable, optional): Histogram bucket upper bounds in seconds. Defaults to metrics.DEFAULT_BUCKETS.
+
+        Returns:
+            ReadMetrics: The attached metrics.
+        """
+        from .metrics import DEFAULT_BUCKETS, ReadMetrics
+
+        self.metrics = ReadMetrics(self, buckets=buckets if buckets is not None else DEFAULT_BUCKETS)
+        return self.metrics
+
+    def stop_metrics(self):
+        self.metrics = None
+
+    def set_read_policy(self, read_period=None, latency_budget=None, samples_per_read=None, input_buf_size=None, buffer_periods=10):
+        """
+        Resize reads and buffers from a latency/throughput target. See policy.derive_buffer_sizes.
+
+        Can be called on a running task; it is stopped and restarted around the change.
+
+        Returns:
+            BufferSizes: The sizes now in effect, also kept in `self.buffer_sizes`.
+        """
+        sizes = derive_buffer_sizes(self.sampling_freq_in, read_period=read_period, latency_budget=latency_budget,
+                                    samples_per_read=samples_per_read, input_buf_size=input_buf_size,
+                                    buffer_periods=buffer_periods, continuous=self.continuous)
+        apply_buffer_sizes(self, sizes)
+        return sizes
+
+    def set_reduction(self, statistics, decimals=None, percentiles=(5, 50, 95)):
+        """
+        Choose which statistics read_samples returns.
+
+        Args:
+            statistics (iterable): Names from reductions.STATISTICS, e.g. ('mean', 'rms', 'peak_to_peak').
+            decimals (int, optional): Round the statistics to this many decimals.
+            percentiles (iterable): Percentiles returned for the 'percentile' statistic.
+        """
+        self.reducer = Reducer(statistics, decimals=decimals, percentiles=percentiles)
+
+    def get_channel_names(self):
+        return self.channel_names
+
+    def set_channel_name(self, position, name):
+        """
+        Set the name of a specific channel based on its position.
+
+        Args:
+            position (int): Position of the channel (0-based index).
+            name (str): New name for the channel.
+        """
+        if position < 0 or position >= self.chans_in:
+            raise ValueError(f"Invalid position value. Must be between 0 and {self.chans_in-1}.")
+        self.channel_names[position] = name
+
+    def start(self):
+        self.task_in.start()
+        self.running = True
+        self.clock.restart()
+
+    def stop(self):
+        self.task_in.stop()
+        self.running = False
+
+    def close(self):
+        """
+        Stop background acquisition, asynchronous reads, recording and publishing, then close the task.
+
+        A recording is written out to its end and a published shared memory segment is removed.
+        """
+        self.stop_background()
+        if self.async_reader is not None:
+            self.async_reader.release()
+        self.stop_recording()
+        self.stop_publishing()
+        self.task_in.close()
+
+    def warm_restart(self):
+        """
+        Restart the existing task without rebuilding it. Takes milliseconds, unlike reinitialize's fallback.
+        """
+        warm_restart(self)
+
+    def reinitialize(self):
+        """
+        Recover the task: warm restart it, and only if that fails build a new one with the same configuration.
+        """
+        try:
+            self.warm_restart()
+        except nidaqmx.errors.DaqError:
+            rebuild(self)
+
+    def _require_stopped(self, features, change):
+        """
+        Raise RuntimeError naming those of `features` that are active, before making `change`.
+        """
+        states = {
+            'background acquisition': self.background is not None,
+            'asynchronous reads': self.async_reader is not None and self.async_reader.mode is not None,
+            'recording': self.recorder is not None,
+            'publishing': self.publisher is not None,
+            'trends': self.trends is not None,
+            'rolling statistics': self.rolling is not None,
+        }
+        active = [name for name in features if states[name]]
+        if active:
+            raise RuntimeError(f"Stop {', '.join(active)} before {change}.")
+
+    def set_sampling_rate(self, sampling_freq_in):
+        """
+        Change the sample clock rate on the existing task.
+        """
+        # These take the rate when they start: reader timeouts and block sizes, file and shared memory
+        # headers, trend periods, EWMA weights.
+        self._require_stopped(('background acquisition', 'asynchronous reads', 'recording', 'publishing', 'trends',
+                               'rolling statistics'), "changing the sampling rate")
+        sizes = derive_buffer_sizes(sampling_freq_in, samples_per_read=self.samples_per_read, input_buf_size=self.buffer_in_size,
+                                    continuous=self.continuous)
+        reconfigure(self, 'sampling_rate', lambda: self.configure_timing(sampling_freq_in=sampling_freq_in))
+        self.sampling_freq_in = sampling_freq_in
+        self.buffer_sizes = sizes
+        self.clock.set_rate(sampling_freq_in)
+
+    def set_acquisition_type(self, acquisition_type):
+        """
+        Switch the existing task between 'CONTINUOUS' and 'FINITE' acquisition.
+        """
+        # The reader threads would be reading the task while it is stopped and changed.
+        self._require_stopped(('background acquisition', 'asynchronous reads'), "changing the acquisition type")
+        mode = lookup('AcquisitionType', acquisition_type, "acquisition type")
+        # buffer_in_size becomes a ring to check, or an acquisition length not to.
+        sizes = derive_buffer_sizes(self.sampling_freq_in, samples_per_read=self.samples_per_read, input_buf_size=self.buffer_in_size,
+                                    continuous=mode != nidaqmx.constants.AcquisitionType.FINITE)
+        reconfigure(self, 'acquisition_type', lambda: self.configure_timing(acquisition_type=mode))
+        self.acquisition_type = mode
+        self.buffer_sizes = sizes
+
+    def set_channel_settings(self, **settings):
+        """
+        Change channel settings on the existing task, e.g. terminal_config='DIFF'.
+
+        Which settings can change depends on the channel type; see its channel_properties.
+        """
+        self._require_stopped(('background acquisition', 'asynchronous reads'), "changing channel settings")
+        reconfigure(self, 'channel_settings', lambda: self.channel_type.apply(self.task_in, **settings))
+
+    def set_channel_map(self, channel_map):
+        """
+        Acquire a different set of channels. Pass None to go back to all chans_in channels from ai0.
+
+        Channels cannot be removed from a DAQmx task, so the task is rebuilt,
+        and restarted if it was running. Features that hold per-channel state
+        must be stopped first.
+
+        Args:
+            channel_map (ChannelMap or dict): See ChannelMap.
+        """
+        self._require_stopped(('background acquisition', 'asynchronous reads', 'recording', 'publishing', 'trends',
+                               'rolling statistics'), "changing the channel map")
+        was_running = self.running
+        old_map, old_task = self.channel_map, self.task_in
+        self._set_channel_map(channel_map)
+        try:
+            rebuild(self, start=was_running)
+        finally:
+            if self.task_in is old_task:
+                # The new task was never swapped in, so the old channels are still the ones acquired.
+                self._set_channel_map(old_map)
+                if was_running and not self.running:
+                    try:
+                        self.start()
+                    except nidaqmx.errors.DaqError:
+                        pass
+            else:
+                self.buffer_in = np.zeros((self.chans_in, self.buffer_in.shape[1]))
+        self.last_reconfigure_kind = 'channel_map'
+
+    def start_background(self, capacity=None, use_events=True):
+        """
+        Start the task and drain it into a ring buffer on a background thread.
+
+        Args:
+            capacity (int, optional): Ring size in samples per channel. Defaults to buffer_in_size.
+            use_events (bool): Use the driver's every-N-samples event when available.
+
+        Returns:
+            BackgroundAcquisition: Engine exposing latest(), window(n) and reduce().
+        """
+        from .background import BackgroundAcquisition
+
+        self.stop_background()
+        self.background = BackgroundAcquisition(self, capacity=capacity, use_events=use_events)
+        self.background.start()
+        return self.background
+
+    def stop_background(self):
+        if self.background is not None:
+            self.background.stop()
+            self.background = None
+
+    def _get_async_reader(self):
+        if self.async_reader is None:
+            from .aio import AsyncReader
+
+            self.async_reader = AsyncReader(self)
+        return self.async_reader
+
+    async def aread_samples(self, skip_backlog=False):
+        """
+        Awaitable read_samples that does not block the event loop.
+
+        The task is started on first use; cancelling the read stops and closes it.
+        """
+        return await self._get_async_reader().read(skip_backlog=skip_backlog)
+
+    def stream(self, skip_backlog=False, close_on_exit=True):
+        """
+        Async iterator of read_samples results, e.g. `async for data in daq.stream(): ...`.
+
+        See AsyncReader.stream for the backpressure and shutdown behaviour.
+        """
+        return self._get_async_reader().stream(skip_backlog=skip_backlog, close_on_exit=close_on_exit)
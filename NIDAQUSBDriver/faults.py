@@ -0,0 +1,212 @@
+import atexit
+import logging
+import os
+import time
+
+from ._lazy import nidaqmx
+
+
+# No handler of its own: records propagate to the application's logging configuration,
+# and without one Python's last-resort handler prints warnings and errors to stderr.
+logger = logging.getLogger('NIDAQUSBDriver')
+
+# Same place the driver has always appended its errors to: next to the package directory.
+DEFAULT_ERROR_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'error_log.txt')
+
+ACTIONS = ('retry', 'reinitialize', 'raise', 'mask')
+FALLBACKS = ('raise', 'mask')
+
+_listener = None
+
+
+def configure_error_log(path=DEFAULT_ERROR_LOG, console=True, level=logging.WARNING):
+    """
+    Route driver log records through a queue to a background thread that writes them out.
+
+    The read path only enqueues records, so a burst of errors never waits on the
+    disk or the console. Nothing is installed until this is called; without it,
+    records propagate to the application's own logging configuration, or are
+    printed to stderr if there is none. Calling it again replaces the previous
+    destination.
+
+    Args:
+        path (str, optional): Log file to append to. None disables file logging.
+        console (bool): Also write records to stderr.
+        level (int): Minimum level that is logged.
+    """
+    # Imported here so the read path does not load the queue handlers and their sockets unless they are used.
+    import logging.handlers
+    import queue
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in list(logger.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                logger.removeHandler(handler)
+
+    handlers = []
+    formatter = logging.Formatter('%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    if path is not None:
+        handlers.append(logging.FileHandler(path, delay=True))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.setLevel(level)
+    logger.propagate = False
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def log_read_error(daq, error, action=None):
+    """
+    Log a driver error with the device, error code and the policy's response as `extra` fields.
+    """
+    code = getattr(error, 'error_code', None)
+    logger.error("Error occurred on %s: %s", daq.device, error,
+                 extra={'device': daq.device, 'error_code': code, 'action': action})
+
+
+class ErrorPolicy:
+    """
+    What read_samples does when the driver raises DaqError.
+
+    'retry' reads again after an exponentially growing pause. 'reinitialize'
+    rebuilds the task before each retry. Both give up after `retries` attempts
+    and then apply `fallback`. 'raise' propagates the error immediately.
+    'mask' returns NaN for the block straight away. In both the 'mask' and
+    fallback-'mask' cases the client's last_read_valid flag is cleared.
+    """
+
+    def __init__(self, action='mask', retries=3, backoff=0.01, max_backoff=1.0, fallback='mask', timeout=None):
+        """
+        Args:
+            action (str): One of ACTIONS.
+            retries (int): Attempts made by 'retry' and 'reinitialize' before the fallback applies.
+            backoff (float): First pause between attempts, in seconds. Doubles on every attempt.
+            max_backoff (float): Longest pause between attempts, in seconds.
+            fallback (str): One of FALLBACKS, applied when the attempts run out.
+            timeout (float, optional): Read timeout passed to the driver, in seconds. None waits indefinitely.
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Invalid error action. Must be one of {list(ACTIONS)}.")
+        if fallback not in FALLBACKS:
+            raise ValueError(f"Invalid error fallback. Must be one of {list(FALLBACKS)}.")
+        self.action = action
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.fallback = fallback
+        self.timeout = timeout
+
+
+class ErrorStats:
+    """
+    Running counts of read failures and recoveries for one module.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.errors = 0
+        self.errors_by_code = {}
+        self.retries = 0
+        self.reinitializations = 0
+        self.masked_reads = 0
+        self.raised = 0
+        self.consecutive_errors = 0
+        self.recoveries = 0
+        self.last_error = None
+        self.last_error_time = None
+        self.last_recovery_seconds = None
+
+    def record_error(self, error):
+        self.errors += 1
+        self.consecutive_errors += 1
+        code = getattr(error, 'error_code', None)
+        self.errors_by_code[code] = self.errors_by_code.get(code, 0) + 1
+        self.last_error = error
+        self.last_error_time = time.time()
+
+    def as_dict(self):
+        return {name: value for name, value in vars(self).items() if name != 'last_error'}
+
+
+def read_with_policy(daq, buffer, timeout=None, stopped=None):
+    """
+    Fill `buffer` from the module's reader, applying its error policy.
+
+    Args:
+        daq: The module to read from.
+        buffer (np.ndarray): (chans_in, n) array to read into.
+        timeout (float, optional): Read timeout in seconds. Defaults to the policy's.
+        stopped (callable, optional): Returns True once the reader is being shut down. An error
+            raised then, e.g. because the task was stopped under a waiting read, is re-raised
+            without applying the policy, and no further attempts are made.
+
+    Returns:
+        bool: True if the buffer holds real samples, False if it was masked with NaN.
+    """
+    policy = daq.error_policy
+    stats = daq.error_stats
+    attempt = 0
+    delay = policy.backoff
+    failed_at = None
+    if timeout is None:
+        timeout = policy.timeout if policy.timeout is not None else nidaqmx.constants.WAIT_INFINITELY
+    while True:
+        try:
+            daq.stream_in.read_many_sample(buffer, buffer.shape[1], timeout=timeout)
+        except nidaqmx.errors.DaqError as e:
+            if stopped is not None and stopped():
+                raise
+            stats.record_error(e)
+            if failed_at is None:
+                failed_at = time.perf_counter()
+
+            action = policy.action
+            if action in ('retry', 'reinitialize') and attempt >= policy.retries:
+                action = policy.fallback
+            log_read_error(daq, e, action)
+
+            if action in ('retry', 'reinitialize'):
+                attempt += 1
+                stats.retries += 1
+                time.sleep(delay)
+                delay = min(delay * 2, policy.max_backoff)
+                if stopped is not None and stopped():
+                    # Another attempt would implicitly start the task again.
+                    raise
+                if action == 'reinitialize':
+                    stats.reinitializations += 1
+                    try:
+                        daq.reinitialize()
+                    except nidaqmx.errors.DaqError as reinit_error:
+                        # A failed recovery counts as a failed attempt; the next one may succeed.
+                        stats.record_error(reinit_error)
+                        log_read_error(daq, reinit_error, 'reinitialize')
+                continue
+
+            if action == 'raise':
+                stats.raised += 1
+                raise
+            stats.masked_reads += 1
+            buffer.fill(float('nan'))
+            return False
+
+        if failed_at is not None:
+            stats.recoveries += 1
+            stats.last_recovery_seconds = time.perf_counter() - failed_at
+        stats.consecutive_errors = 0
+        return True
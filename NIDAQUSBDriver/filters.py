@@ -0,0 +1,378 @@
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .background import RingBuffer
+from .reductions import MOMENT_STATISTICS, from_moments
+
+
+# Statistics kept per interval: those the reductions can take from Moments.
+AGGREGATES = MOMENT_STATISTICS
+
+# Mergeable summary of consecutive samples, one column per interval. `count`
+# is the number of samples per interval; the other fields are (chans, k).
+Moments = namedtuple('Moments', ['count', 'sum', 'sumsq', 'min', 'max'])
+
+
+def design_lowpass(cutoff, numtaps=63):
+    """
+    Windowed-sinc (Hamming) low-pass FIR taps with unity gain at DC.
+
+    Args:
+        cutoff (float): Cut-off frequency as a fraction of the sample rate (0 to 0.5).
+        numtaps (int): Number of taps. Odd counts give a symmetric filter with integer delay.
+    """
+    if not 0 < cutoff < 0.5:
+        raise ValueError("Cut-off must be between 0 and 0.5 of the sample rate.")
+    n = np.arange(numtaps) - (numtaps - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(numtaps)
+    return taps / taps.sum()
+
+
+def biquad(kind, cutoff, sampling_freq, q=np.sqrt(0.5)):
+    """
+    One second-order section (b0, b1, b2, 1, a1, a2) for IIRFilter, from the RBJ audio EQ cookbook.
+
+    Args:
+        kind (str): 'lowpass' or 'highpass'.
+        cutoff (float): Cut-off frequency in Hz.
+        sampling_freq (float): Sample rate in Hz.
+        q (float): Quality factor. The default gives a Butterworth response.
+    """
+    w0 = 2 * np.pi * cutoff / sampling_freq
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    if kind == 'lowpass':
+        b = np.array([(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2])
+    elif kind == 'highpass':
+        b = np.array([(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2])
+    else:
+        raise ValueError("Invalid biquad kind. Must be 'lowpass' or 'highpass'.")
+    a = np.array([1 + alpha, -2 * cos_w0, 1 - alpha])
+    return np.concatenate([b / a[0], a / a[0]])
+
+
+class FIRFilter:
+    """
+    Streaming FIR filter over (chans, n) blocks.
+
+    The last len(taps) - 1 samples of every channel are carried over, so
+    filtering block by block gives the same result as filtering the whole
+    stream at once. All channels are filtered in one vectorized step.
+    """
+
+    def __init__(self, taps):
+        self.taps = np.asarray(taps, dtype=np.float64)
+        self._reversed = np.ascontiguousarray(self.taps[::-1])
+        self._history = None
+
+    def reset(self):
+        self._history = None
+
+    def _extend(self, block):
+        # History followed by the block, so every output sees its full tap span.
+        chans = block.shape[0]
+        if self._history is None or self._history.shape[0] != chans:
+            self._history = np.zeros((chans, len(self.taps) - 1))
+        extended = np.concatenate((self._history, block), axis=1)
+        self._history[...] = extended[:, extended.shape[1] - self._history.shape[1]:]
+        return extended
+
+    def process(self, block):
+        if block.shape[1] == 0:
+            # E.g. a decimator upstream produced no output for a short block.
+            return np.empty(block.shape)
+        windows = sliding_window_view(self._extend(block), len(self.taps), axis=1)
+        return np.einsum('cnt,t->cn', windows, self._reversed)
+
+
+class Decimator(FIRFilter):
+    """
+    Anti-aliased decimation by an integer factor, keeping its state across blocks.
+
+    Only the retained samples are computed, so the work is proportional to the
+    output rate times the filter length. The default low-pass passes 80% of
+    the output band. For large factors chain several decimators, e.g.
+    Chain(Decimator(10), Decimator(10)) instead of Decimator(100).
+    """
+
+    def __init__(self, factor, taps=None, numtaps=None):
+        """
+        Args:
+            factor (int): Keep one sample in `factor`.
+            taps (array_like, optional): Anti-aliasing FIR taps. Designed with design_lowpass when omitted.
+            numtaps (int, optional): Length of the designed filter. Defaults to 8 * factor + 1.
+        """
+        if factor < 1:
+            raise ValueError("Decimation factor must be at least 1.")
+        self.factor = int(factor)
+        if taps is None:
+            taps = design_lowpass(0.4 / self.factor, numtaps or 8 * self.factor + 1) if self.factor > 1 else [1.0]
+        super().__init__(taps)
+        self._phase = 0
+
+    def reset(self):
+        super().reset()
+        self._phase = 0
+
+    def process(self, block):
+        n = block.shape[1]
+        if n == 0:
+            return np.empty(block.shape)
+        first = -self._phase % self.factor
+        self._phase = (self._phase + n) % self.factor
+        windows = sliding_window_view(self._extend(block), len(self.taps), axis=1)[:, first::self.factor]
+        return np.einsum('cnt,t->cn', windows, self._reversed)
+
+
+class IIRFilter:
+    """
+    Streaming IIR filter made of second-order sections, with per-channel state across blocks.
+
+    `sos` is an (n_sections, 6) array of (b0, b1, b2, a0, a1, a2) rows, e.g.
+    [biquad('lowpass', 5.0, 1000.0)] or the output of scipy.signal.butter(...,
+    output='sos'). scipy.signal.sosfilt is used when SciPy is installed;
+    otherwise the sections run in a per-sample loop that is vectorized over
+    channels only, so prefer filtering after decimation at high rates.
+    """
+
+    def __init__(self, sos):
+        sos = np.atleast_2d(np.asarray(sos, dtype=np.float64))
+        if sos.shape[1] != 6:
+            raise ValueError("Second-order sections must have 6 coefficients each.")
+        # Normalise so a0 == 1.
+        self.sos = sos / sos[:, 3:4]
+        self._state = None
+        try:
+            from scipy.signal import sosfilt
+        except ImportError:
+            sosfilt = None
+        self._sosfilt = sosfilt
+
+    def reset(self):
+        self._state = None
+
+    def process(self, block):
+        chans = block.shape[0]
+        if self._state is None or self._state.shape[1] != chans:
+            # Direct form II transposed: two delay values per section and channel.
+            self._state = np.zeros((len(self.sos), chans, 2))
+        if self._sosfilt is not None:
+            out, self._state = self._sosfilt(self.sos, block, axis=1, zi=self._state)
+            return out
+
+        out = np.array(block, dtype=np.float64)
+        for section, (b0, b1, b2, _, a1, a2) in enumerate(self.sos):
+            z1 = self._state[section, :, 0]
+            z2 = self._state[section, :, 1]
+            column = out.T
+            for x in column:
+                y = b0 * x + z1
+                z1 = b1 * x - a1 * y + z2
+                z2 = b2 * x - a2 * y
+                x[:] = y
+            self._state[section, :, 0] = z1
+            self._state[section, :, 1] = z2
+        return out
+
+
+class Chain:
+    """
+    Runs blocks through several filters and decimators in turn.
+    """
+
+    def __init__(self, *stages):
+        self.stages = stages
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def process(self, block):
+        for stage in self.stages:
+            block = stage.process(block)
+        return block
+
+
+class Aggregator:
+    """
+    Summarises a stream in fixed-length intervals, carrying partial intervals across blocks.
+
+    Takes raw (chans, n) sample blocks via process(), or the Moments of a finer
+    Aggregator via merge(), which is how coarse resolutions are built from
+    fine ones without revisiting the samples.
+    """
+
+    def __init__(self, interval):
+        """
+        Args:
+            interval (int): Inputs per interval: samples for process(), finer intervals for merge().
+        """
+        if interval < 1:
+            raise ValueError("Aggregation interval must be at least 1.")
+        self.interval = int(interval)
+        self._filled = 0
+        self._partial = None
+
+    def reset(self):
+        self._filled = 0
+        self._partial = None
+
+    def process(self, block):
+        """
+        Add a (chans, n) block of samples.
+
+        Returns:
+            Moments or None: The intervals completed by this block, if any.
+        """
+        return self._aggregate(1, block, block * block, block, block)
+
+    def merge(self, moments):
+        """
+        Add intervals summarised by a finer Aggregator.
+
+        Returns:
+            Moments or None: The coarse intervals completed, if any.
+        """
+        return self._aggregate(moments.count, moments.sum, moments.sumsq, moments.min, moments.max)
+
+    def _aggregate(self, count, total, sumsq, low, high):
+        k = total.shape[1]
+        if k == 0:
+            return None
+        # Ends of the intervals completed inside this input, then the starts of every segment.
+        ends = np.arange(self.interval - self._filled, k + 1, self.interval)
+        starts = np.concatenate(([0], ends[ends < k]))
+        segments = [np.add.reduceat(total, starts, axis=1), np.add.reduceat(sumsq, starts, axis=1),
+                    np.minimum.reduceat(low, starts, axis=1), np.maximum.reduceat(high, starts, axis=1)]
+        if self._partial is not None:
+            for segment, partial, combine in zip(segments, self._partial, (np.add, np.add, np.minimum, np.maximum)):
+                combine(segment[:, 0], partial, out=segment[:, 0])
+        self._filled = (self._filled + k) % self.interval
+        self._partial = [segment[:, -1].copy() for segment in segments] if self._filled else None
+        if len(ends) == 0:
+            return None
+        return Moments(count * self.interval, *(segment[:, :len(ends)] for segment in segments))
+
+
+def summarise(moments, statistic):
+    """
+    Compute one of AGGREGATES per channel and interval from Moments.
+    """
+    return from_moments(statistic, moments.count, moments.sum, moments.sumsq, moments.min, moments.max)
+
+
+class MultiResolution:
+    """
+    Keeps several downsampled views of one stream, e.g. 1 s and 1 min aggregates.
+
+    Use write() as a block listener. Blocks optionally pass through a
+    `prefilter` stage first. An interval that is a whole multiple of a finer
+    one is built from the finer interval's Moments, so only the finest
+    resolution touches every sample. With `decimation` an anti-aliased,
+    decimated copy of the stream is kept as well. Each output goes into a
+    RingBuffer of `capacity` values per channel, so memory is fixed however
+    long the capture runs.
+    """
+
+    def __init__(self, chans, sampling_freq, periods=None, statistics=('mean', 'min', 'max'), capacity=3600,
+                 prefilter=None, decimation=None):
+        """
+        Args:
+            chans (int): Number of channels in the stream.
+            sampling_freq (float): Sample rate of the stream in Hz.
+            periods (dict, optional): Output name -> interval in seconds. Defaults to {'1s': 1.0, '1min': 60.0}.
+            statistics (iterable): Names from AGGREGATES kept for every period.
+            capacity (int): Values kept per channel for each output.
+            prefilter (optional): Stage with process(block), e.g. an IIRFilter or Chain, applied first.
+            decimation (int or iterable, optional): Factor, or factors of chained Decimators, for
+                the 'decimated' output.
+        """
+        if periods is None:
+            periods = {'1s': 1.0, '1min': 60.0}
+        unknown = [name for name in statistics if name not in AGGREGATES]
+        if unknown:
+            raise ValueError(f"Unknown aggregates {unknown}. Must be from {list(AGGREGATES)}.")
+        self.sampling_freq = sampling_freq
+        self.statistics = tuple(statistics)
+        self.prefilter = prefilter
+        self.periods = {}
+        self.series = {}
+
+        # Finest first, so every period can merge the coarsest finer period that divides it,
+        # which leaves it the fewest intervals to combine.
+        samples = sorted((max(int(round(seconds * sampling_freq)), 1), name) for name, seconds in periods.items())
+        # (name, index of the finer output it merges, or None to read samples, Aggregator) per period.
+        self._aggregators = []
+        sizes = []
+        for size, name in samples:
+            source = None
+            for index, finer_size in enumerate(sizes):
+                if size % finer_size == 0:
+                    source = index
+            interval = size if source is None else size // sizes[source]
+            self._aggregators.append((name, source, Aggregator(interval)))
+            sizes.append(size)
+            self.periods[name] = size / sampling_freq
+            for statistic in self.statistics:
+                self.series[(name, statistic)] = RingBuffer(chans, capacity)
+
+        self.decimator = None
+        if decimation is not None:
+            factors = (decimation,) if np.isscalar(decimation) else tuple(decimation)
+            self.decimator = Chain(*(Decimator(factor) for factor in factors))
+            self.decimated = RingBuffer(chans, capacity)
+            self.periods['decimated'] = float(np.prod(factors)) / sampling_freq
+
+    def reset(self):
+        for _, _, aggregator in self._aggregators:
+            aggregator.reset()
+        if self.prefilter is not None:
+            self.prefilter.reset()
+        if self.decimator is not None:
+            self.decimator.reset()
+
+    def write(self, block):
+        """
+        Add a (chans, n) block. Safe to use as a block listener.
+        """
+        if self.prefilter is not None:
+            block = self.prefilter.process(block)
+        if self.decimator is not None:
+            decimated = self.decimator.process(block)
+            if decimated.shape[1]:
+                self.decimated.write(decimated)
+
+        completed = []
+        for name, source, aggregator in self._aggregators:
+            if source is None:
+                moments = aggregator.process(block)
+            else:
+                finer = completed[source]
+                moments = aggregator.merge(finer) if finer is not None else None
+            completed.append(moments)
+            if moments is not None:
+                for statistic in self.statistics:
+                    self.series[(name, statistic)].write(summarise(moments, statistic))
+
+    def window(self, name, statistic=None, n=None):
+        """
+        Return the most recent n values of an output as a (chans, n) copy, oldest first.
+
+        Args:
+            name (str): A period name, or 'decimated'.
+            statistic (str, optional): One of the statistics; not used for 'decimated'.
+            n (int, optional): Number of values. Defaults to all that are available.
+        """
+        ring = self.decimated if name == 'decimated' else self.series[(name, statistic)]
+        if n is None:
+            n = min(ring.count, ring.capacity)
+        return ring.window(n)
+
+    def count(self, name, statistic=None):
+        """
+        Number of values produced so far for an output.
+        """
+        ring = self.decimated if name == 'decimated' else self.series[(name, statistic)]
+        return ring.count
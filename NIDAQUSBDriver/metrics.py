@@ -0,0 +1,315 @@
+import bisect
+import threading
+import time
+
+from ._lazy import nidaqmx
+
+
+# Histogram bucket upper bounds in seconds, 10 us to 10 s.
+DEFAULT_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+# Phases of one read: waiting for the samples to be acquired, copying them
+# out of the driver, host-side conversion and block listeners, and the reduction.
+PHASES = ('wait', 'transfer', 'process', 'reduce')
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """
+    Counts of observations in fixed buckets, with their sum and maximum.
+
+    observe() is a bisect and a few additions, cheap enough to run on every read.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.reset()
+
+    def reset(self):
+        # One count per bucket, plus one for values above the last bound.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self):
+        """
+        Return (upper bound, observations <= bound) pairs, ending with (inf, count).
+        """
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q):
+        """
+        Estimate the q-quantile (0 to 1) by interpolating within its bucket.
+        """
+        if self.count == 0:
+            return float('nan')
+        rank = q * self.count
+        lower = 0.0
+        below = 0
+        for bound, count in zip(self.buckets, self.counts):
+            if below + count >= rank and count:
+                return lower + (bound - lower) * (rank - below) / count
+            below += count
+            lower = bound
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else float('nan'),
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': self.cumulative(),
+        }
+
+
+class ReadMetrics:
+    """
+    Timing, backlog and loss metrics of one module's reads.
+
+    Created by NIDAQModule.start_metrics(). Each read records how long it
+    spent in each of PHASES and how many samples were waiting in the DAQ input
+    buffer before it (avail_samp_per_chan). The driver does not report waiting
+    and copying separately, so the wait is estimated from the backlog: a read
+    that finds its samples already buffered only transfers, otherwise it waits
+    for the missing samples at the sample rate first. Counters that the module
+    already keeps (errors, lost samples) are read when a snapshot is taken.
+    When metrics are off, reads pay only for one attribute check.
+    """
+
+    def __init__(self, daq, buckets=DEFAULT_BUCKETS, rate_smoothing=0.1):
+        """
+        Args:
+            daq (NIDAQModule): The instrumented module.
+            buckets (iterable): Histogram bucket upper bounds in seconds.
+            rate_smoothing (float): Weight of the newest interval in the smoothed reads/s.
+        """
+        self.daq = daq
+        self.buckets = tuple(buckets)
+        self.rate_smoothing = rate_smoothing
+        self.phases = {phase: Histogram(self.buckets) for phase in PHASES}
+        self.reset()
+
+    def reset(self):
+        for histogram in self.phases.values():
+            histogram.reset()
+        self.reads = 0
+        self.masked_reads = 0
+        self.samples_read = 0
+        self.backlog = None
+        self.max_backlog = 0
+        self.started = time.perf_counter()
+        self._last_read = None
+        self._interval = None
+
+    def read_backlog(self):
+        """
+        Samples per channel waiting in the DAQ input buffer, or None if the driver cannot tell.
+        """
+        try:
+            return self.daq.task_in.in_stream.avail_samp_per_chan
+        except (AttributeError, nidaqmx.errors.DaqError):
+            return None
+
+    def record(self, samples, backlog, read_seconds, process_seconds, reduce_seconds=None, valid=True):
+        """
+        Record one read.
+
+        Args:
+            samples (int): Samples per channel read.
+            backlog (int, optional): Samples per channel available before the read, from read_backlog().
+            read_seconds (float): Time spent in the driver read, including retries.
+            process_seconds (float): Time spent on conversions and block listeners.
+            reduce_seconds (float, optional): Time spent in the reduction, if there was one.
+            valid (bool): False if the block was masked after a failed read.
+        """
+        wait = 0.0
+        if backlog is not None:
+            self.backlog = backlog
+            if backlog > self.max_backlog:
+                self.max_backlog = backlog
+            if backlog < samples:
+                wait = min(read_seconds, (samples - backlog) / self.daq.sampling_freq_in)
+        self.phases['wait'].observe(wait)
+        self.phases['transfer'].observe(read_seconds - wait)
+        self.phases['process'].observe(process_seconds)
+        if reduce_seconds is not None:
+            self.phases['reduce'].observe(reduce_seconds)
+
+        self.reads += 1
+        self.samples_read += samples
+        if not valid:
+            self.masked_reads += 1
+        now = time.perf_counter()
+        if self._last_read is not None:
+            interval = now - self._last_read
+            self._interval = interval if self._interval is None else \
+                self._interval + self.rate_smoothing * (interval - self._interval)
+        self._last_read = now
+
+    @property
+    def reads_per_second(self):
+        """
+        Smoothed read rate.
+        """
+        return 1.0 / self._interval if self._interval else 0.0
+
+    @property
+    def backlog_fraction(self):
+        """
+        Last backlog as a fraction of the DAQ input buffer. Near 1 the buffer is about to overrun.
+        """
+        if self.backlog is None or not self.daq.buffer_in_size:
+            return None
+        return self.backlog / self.daq.buffer_in_size
+
+    def snapshot(self):
+        """
+        Return every metric as a dict, for dashboards and logs.
+        """
+        stats = self.daq.error_stats
+        return {
+            'device': self.daq.device,
+            'reads': self.reads,
+            'masked_reads': self.masked_reads,
+            'samples_read': self.samples_read,
+            'reads_per_second': self.reads_per_second,
+            'uptime': time.perf_counter() - self.started,
+            'backlog': self.backlog,
+            'max_backlog': self.max_backlog,
+            'backlog_fraction': self.backlog_fraction,
+            'input_buf_size': self.daq.buffer_in_size,
+            'samples_lost': self.daq.clock.samples_lost,
+            'errors': stats.errors,
+            'errors_by_code': dict(stats.errors_by_code),
+            'retries': stats.retries,
+            'reinitializations': stats.reinitializations,
+            'phases': {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+        }
+
+
+def _format(value):
+    if isinstance(value, int):
+        return str(value)
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def _escape(value):
+    # Label values escape backslash, double quote and line feed, as the text format requires.
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def prometheus_text(*metrics):
+    """
+    Render ReadMetrics of one or more modules in the Prometheus text exposition format.
+
+    Every series is labelled with the module's device name.
+    """
+    families = {}
+
+    def add(name, kind, help_text, labels, value):
+        family = families.setdefault(name, (kind, help_text, []))
+        family[2].append(f"{name}{{{_labels(labels)}}} {_format(value)}")
+
+    for module in metrics:
+        snapshot = module.snapshot()
+        device = {'device': snapshot['device']}
+        add('nidaq_reads_total', 'counter', "Blocks read.", device, snapshot['reads'])
+        add('nidaq_masked_reads_total', 'counter', "Blocks masked with NaN after a failed read.", device, snapshot['masked_reads'])
+        add('nidaq_samples_read_total', 'counter', "Samples per channel read.", device, snapshot['samples_read'])
+        add('nidaq_samples_lost_total', 'counter', "Samples per channel lost between blocks.", device, snapshot['samples_lost'])
+        add('nidaq_read_errors_total', 'counter', "Driver errors raised by reads.", device, snapshot['errors'])
+        add('nidaq_read_retries_total', 'counter', "Reads retried by the error policy.", device, snapshot['retries'])
+        add('nidaq_reinitializations_total', 'counter', "Task recoveries by the error policy.", device, snapshot['reinitializations'])
+        add('nidaq_reads_per_second', 'gauge', "Smoothed read rate.", device, snapshot['reads_per_second'])
+        add('nidaq_input_buffer_samples', 'gauge', "DAQ input buffer size in samples per channel.", device, snapshot['input_buf_size'])
+        if snapshot['backlog'] is not None:
+            add('nidaq_backlog_samples', 'gauge', "Samples per channel waiting in the DAQ input buffer before the last read.",
+                device, snapshot['backlog'])
+        add('nidaq_backlog_max_samples', 'gauge', "Largest backlog seen, in samples per channel.", device, snapshot['max_backlog'])
+        for phase, histogram in module.phases.items():
+            labels = dict(device, phase=phase)
+            name = 'nidaq_read_phase_seconds'
+            family = families.setdefault(name, ('histogram', "Time per read spent in each phase.", []))
+            for bound, count in histogram.cumulative():
+                family[2].append(f"{name}_bucket{{{_labels(dict(labels, le=_format(bound)))}}} {count}")
+            family[2].append(f"{name}_sum{{{_labels(labels)}}} {_format(histogram.sum)}")
+            family[2].append(f"{name}_count{{{_labels(labels)}}} {histogram.count}")
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """
+    Serves prometheus_text() of some modules over HTTP, on a daemon thread.
+
+        server = MetricsServer([volt.metrics, thermo.metrics], port=9464)
+        ...
+        server.close()
+    """
+
+    def __init__(self, metrics, port=9464, host='127.0.0.1'):
+        """
+        Args:
+            metrics (list): ReadMetrics to export, e.g. [daq.metrics for daq in modules].
+            port (int): TCP port. 0 picks a free one; see `port` afterwards.
+            host (str): Interface to listen on. '0.0.0.0' exposes the metrics to the network.
+        """
+        # Imported here so the package does not load http.server unless metrics are served.
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.metrics = list(metrics)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = prometheus_text(*server.metrics).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='nidaq-metrics', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
@@ -0,0 +1,94 @@
+import math
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+from .reconfigure import reconfigure
+
+
+# samples_per_read: samples per channel returned by one read_samples call.
+# input_buf_size: DAQ input buffer, in samples per channel.
+# host_buffer_size: columns of the preallocated host read buffer.
+# read_period: seconds of signal in one read, i.e. how long a read blocks at steady state.
+# stall_tolerance: seconds the reader can stall before the DAQ buffer overruns.
+BufferSizes = namedtuple('BufferSizes', ['samples_per_read', 'input_buf_size', 'host_buffer_size', 'read_period', 'stall_tolerance'])
+
+# Below this much slack a stalled consumer is likely to overrun the DAQ buffer.
+MIN_STALL_TOLERANCE = 0.1
+
+
+def derive_buffer_sizes(sampling_freq, read_period=None, latency_budget=None, samples_per_read=None,
+                        input_buf_size=None, buffer_periods=10, min_buffer_seconds=1.0, continuous=True):
+    """
+    Work out read and buffer sizes from the sample rate and a latency/throughput target.
+
+    Exactly one of read_period, latency_budget or samples_per_read is normally
+    given. read_period sets how much signal each read returns. latency_budget
+    caps how long a read may block, i.e. how old the first sample of a block
+    may be. If both are given the smaller block wins.
+
+    Args:
+        sampling_freq (float): Sample rate in Hz.
+        read_period (float, optional): Target seconds between reads.
+        latency_budget (float, optional): Longest acceptable blocking time per read, in seconds.
+        samples_per_read (int, optional): Explicit samples per read; overrides the two above.
+        input_buf_size (int, optional): Explicit DAQ buffer size in samples per channel.
+        buffer_periods (int): DAQ buffer size in reads, if not given explicitly.
+        min_buffer_seconds (float): Lower bound on the derived DAQ buffer, in seconds of signal.
+        continuous (bool): The buffer is a CONTINUOUS acquisition's ring, which must hold
+            two reads and is checked for overrun slack. With False it is a FINITE
+            acquisition's length and an explicit input_buf_size is taken as it is.
+
+    Returns:
+        BufferSizes: The derived sizes.
+    """
+    if sampling_freq <= 0:
+        raise ValueError("Sampling frequency must be positive.")
+
+    if samples_per_read is None:
+        candidates = []
+        if read_period is not None:
+            candidates.append(math.ceil(sampling_freq * read_period))
+        if latency_budget is not None:
+            candidates.append(math.floor(sampling_freq * latency_budget))
+        if not candidates:
+            raise ValueError("One of read_period, latency_budget or samples_per_read is required.")
+        samples_per_read = min(candidates)
+    samples_per_read = int(samples_per_read)
+    if samples_per_read < 1:
+        raise ValueError(f"A read must return at least one sample; {sampling_freq} Hz cannot meet that target.")
+
+    if input_buf_size is None:
+        input_buf_size = max(samples_per_read * buffer_periods, math.ceil(sampling_freq * min_buffer_seconds))
+    input_buf_size = int(input_buf_size)
+    if continuous and input_buf_size < 2 * samples_per_read:
+        raise ValueError(f"DAQ buffer of {input_buf_size} samples must hold at least two reads of {samples_per_read} samples.")
+
+    stall_tolerance = (input_buf_size - samples_per_read) / sampling_freq
+    if continuous and stall_tolerance < MIN_STALL_TOLERANCE:
+        warnings.warn(f"DAQ buffer of {input_buf_size} samples at {sampling_freq} Hz overruns after a "
+                      f"{stall_tolerance * 1000:.0f} ms stall.", RuntimeWarning, stacklevel=2)
+
+    return BufferSizes(samples_per_read, input_buf_size, samples_per_read, samples_per_read / sampling_freq, stall_tolerance)
+
+
+def apply_buffer_sizes(daq, sizes):
+    """
+    Resize a NIDAQVoltage/NIDAQThermo in place. A running task is stopped and restarted around the change.
+    """
+    # These size their buffers, frames or windows in read blocks when they start.
+    daq._require_stopped(('background acquisition', 'asynchronous reads', 'publishing', 'rolling statistics'),
+                         "changing the read size")
+
+    def apply():
+        daq.buffer_in_size_cfg = sizes.input_buf_size
+        daq.bufsize_callback = sizes.input_buf_size
+        daq.configure_timing()
+        daq.task_in.in_stream.input_buf_size = daq.bufsize_callback
+
+    reconfigure(daq, 'buffer_sizes', apply)
+    daq.samples_per_read = sizes.samples_per_read
+    daq.buffer_in_size = sizes.input_buf_size
+    daq.buffer_in = np.zeros((daq.chans_in, sizes.host_buffer_size))
+    daq.buffer_sizes = sizes
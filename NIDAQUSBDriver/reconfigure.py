@@ -0,0 +1,88 @@
+import time
+
+from ._lazy import nidaqmx
+
+
+def commit(daq):
+    """
+    Commit the task so later start/stop cycles skip verification and resource reservation.
+    """
+    control = getattr(daq.task_in, 'control', None)
+    if control is not None:
+        control(nidaqmx.constants.TaskMode.TASK_COMMIT)
+
+
+def reconfigure(daq, kind, apply):
+    """
+    Change settings on the module's existing task instead of rebuilding it.
+
+    A running task is stopped, `apply()` changes it, the task is committed
+    again and restarted. The time taken is stored in
+    `daq.last_reconfigure_latency` (seconds), with `kind` in
+    `daq.last_reconfigure_kind`.
+    """
+    started = time.perf_counter()
+    was_running = daq.running
+    if was_running:
+        daq.task_in.stop()
+    try:
+        apply()
+        commit(daq)
+    finally:
+        if was_running:
+            daq.task_in.start()
+            daq.clock.restart()
+        daq.last_reconfigure_latency = time.perf_counter() - started
+        daq.last_reconfigure_kind = kind
+
+
+def warm_restart(daq):
+    """
+    Stop and restart the existing task. It returns to its committed state, so restarting is cheap.
+    """
+    started = time.perf_counter()
+    daq.task_in.stop()
+    daq.task_in.start()
+    daq.running = True
+    daq.clock.restart()
+    daq.last_reconfigure_latency = time.perf_counter() - started
+    daq.last_reconfigure_kind = 'warm_restart'
+
+
+def rebuild(daq, start=True):
+    """
+    Build a new task with the module's configuration and swap it in for the old one. This is the slow path.
+
+    The old task stays in place until the new one has been configured, so a
+    failed rebuild leaves the module on its old task rather than a closed one.
+    That task is stopped, and `daq.running` says so. The new task is started
+    unless `start` is False.
+    """
+    started = time.perf_counter()
+    old_task = daq.task_in
+    try:
+        old_task.stop()
+    except nidaqmx.errors.DaqError:
+        pass
+    task = daq.backend.create_task()
+    try:
+        daq.configure_task(task)
+        stream = daq.backend.create_reader(task)
+    except Exception:
+        daq.running = False
+        try:
+            task.close()
+        except nidaqmx.errors.DaqError:
+            pass
+        raise
+    try:
+        old_task.close()
+    except nidaqmx.errors.DaqError:
+        pass
+    daq.task_in = task
+    daq.stream_in = stream
+    commit(daq)
+    if start:
+        daq.start()
+    daq.last_reconfigure_latency = time.perf_counter() - started
+    daq.last_reconfigure_kind = 'rebuild'
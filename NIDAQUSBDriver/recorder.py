@@ -0,0 +1,202 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+
+MAGIC = b'NIDAQREC'
+VERSION = 1
+# Samples start on a page boundary so the data section can be memory-mapped directly.
+DATA_ALIGNMENT = 4096
+# One record per block in the <path>.idx side file: first sample number and host time.
+INDEX_DTYPE = np.dtype([('sample', '<u8'), ('time', '<f8')])
+
+
+class Recorder:
+    """
+    Streams raw (chans_in, n) blocks to disk on a writer thread.
+
+    File layout: an 8-byte magic, a little-endian uint32 header length and a
+    JSON header (channel names, sampling rate, dtype, start time), padded to
+    DATA_ALIGNMENT. Then come the little-endian float64 samples stored as
+    (samples, channels) rows in acquisition order. The first sample number and
+    host arrival time of every block go to `<path>.idx`.
+
+    write() only copies the block into a preallocated slot and queues it. If
+    the writer falls behind and every slot is in use, the block is dropped and
+    counted rather than stalling acquisition. The writer gathers blocks into
+    chunk_bytes-sized writes.
+    """
+
+    def __init__(self, path, channel_names, sampling_freq, chunk_bytes=4 * 1024 * 1024, queue_blocks=64, metadata=None):
+        """
+        Args:
+            path (str): Output file. The block index is written next to it as `<path>.idx`.
+            channel_names (list): One name per recorded channel.
+            sampling_freq (float): Sample rate in Hz, stored in the header.
+            chunk_bytes (int): Size of the sequential writes issued by the writer thread.
+            queue_blocks (int): Number of blocks that can wait for the writer.
+            metadata (dict, optional): Extra JSON-serialisable fields for the header.
+        """
+        self.path = path
+        self.channel_names = list(channel_names)
+        self.chans = len(self.channel_names)
+        self.sampling_freq = sampling_freq
+        self.samples_written = 0
+        self.blocks_dropped = 0
+
+        self._file = open(path, 'wb')
+        self._index = open(path + '.idx', 'wb')
+        self._write_header(metadata or {})
+
+        self._chunk = np.empty((max(chunk_bytes // (8 * self.chans), 1), self.chans), dtype='<f8')
+        self._chunk_fill = 0
+        self._queue_blocks = queue_blocks
+        self._slots = None
+        self._free = queue.Queue()
+        self._pending = queue.Queue()
+        self._samples_queued = 0
+        self._writer = threading.Thread(target=self._run, name='nidaq-recorder', daemon=True)
+        self._writer.start()
+
+    def _write_header(self, metadata):
+        header = dict(metadata)
+        header.update({
+            'version': VERSION,
+            'channel_names': self.channel_names,
+            'sampling_freq': self.sampling_freq,
+            'dtype': '<f8',
+            'layout': 'samples x channels',
+            'start_time': time.time(),
+        })
+        encoded = json.dumps(header).encode('utf-8')
+        prefix = len(MAGIC) + 4
+        data_offset = -(-(prefix + len(encoded)) // DATA_ALIGNMENT) * DATA_ALIGNMENT
+        encoded = encoded.ljust(data_offset - prefix, b' ')
+        self._file.write(MAGIC + struct.pack('<I', len(encoded)) + encoded)
+
+    def write(self, block):
+        """
+        Queue a (chans, n) block for writing. Safe to use as a block listener.
+        """
+        if self._slots is None:
+            self._slots = [np.empty(block.shape) for _ in range(self._queue_blocks)]
+            for slot in self._slots:
+                self._free.put(slot)
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.blocks_dropped += 1
+            return
+        if slot.shape != block.shape:
+            slot = np.empty(block.shape)
+        slot[...] = block
+        self._pending.put((slot, self._samples_queued, time.time()))
+        self._samples_queued += block.shape[1]
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            slot, first_sample, timestamp = item
+            self._index.write(np.array((first_sample, timestamp), dtype=INDEX_DTYPE).tobytes())
+            self._append(slot)
+            self._free.put(slot)
+        self._flush()
+
+    def _append(self, block):
+        samples = block.T
+        done = 0
+        while done < samples.shape[0]:
+            count = min(samples.shape[0] - done, self._chunk.shape[0] - self._chunk_fill)
+            self._chunk[self._chunk_fill:self._chunk_fill + count] = samples[done:done + count]
+            self._chunk_fill += count
+            done += count
+            if self._chunk_fill == self._chunk.shape[0]:
+                self._flush()
+
+    def _flush(self):
+        if self._chunk_fill:
+            self._file.write(memoryview(self._chunk[:self._chunk_fill]))
+            self.samples_written += self._chunk_fill
+            self._chunk_fill = 0
+
+    def close(self):
+        """
+        Write out everything still queued and close the files.
+        """
+        if self._writer is None:
+            return
+        self._pending.put(None)
+        self._writer.join()
+        self._writer = None
+        self._file.close()
+        self._index.close()
+
+
+class RecordingReader:
+    """
+    Memory-maps a file written by Recorder.
+
+    `samples` is a read-only (n_samples, chans) view straight onto the file,
+    so any slice of a long recording is read lazily and without a copy.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a NIDAQ recording.")
+            (header_length,) = struct.unpack('<I', file.read(4))
+            self.header = json.loads(file.read(header_length).decode('utf-8'))
+        data_offset = len(MAGIC) + 4 + header_length
+
+        self.path = path
+        self.channel_names = self.header['channel_names']
+        self.sampling_freq = self.header['sampling_freq']
+        self.start_time = self.header['start_time']
+        chans = len(self.channel_names)
+        n_samples = (os.path.getsize(path) - data_offset) // (8 * chans)
+        if n_samples:
+            self.samples = np.memmap(path, dtype=self.header['dtype'], mode='r', offset=data_offset, shape=(n_samples, chans))
+        else:
+            self.samples = np.empty((0, chans))
+
+        index_path = path + '.idx'
+        if os.path.exists(index_path) and os.path.getsize(index_path):
+            self.blocks = np.memmap(index_path, dtype=INDEX_DTYPE, mode='r')
+        else:
+            self.blocks = np.empty(0, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return self.samples.shape[0]
+
+    def channel(self, key):
+        """
+        Return one channel, by name or index, as a strided view onto the file.
+        """
+        if isinstance(key, str):
+            key = self.channel_names.index(key)
+        return self.samples[:, key]
+
+    def sample_times(self, start=0, stop=None):
+        """
+        Host timestamps for samples [start, stop), derived from the block index.
+
+        A block's index time is taken when its last sample was handed to the
+        recorder; earlier samples in the block are spaced back from it at the
+        sample rate.
+        """
+        if stop is None:
+            stop = len(self)
+        indices = np.arange(start, stop)
+        if len(self.blocks) == 0:
+            return self.start_time + indices / self.sampling_freq
+        starts = self.blocks['sample'].astype(np.int64)
+        ends = np.append(starts[1:], max(len(self), starts[-1]))
+        block = np.clip(np.searchsorted(starts, indices, side='right') - 1, 0, None)
+        return self.blocks['time'][block] - (ends[block] - 1 - indices) / self.sampling_freq
@@ -0,0 +1,144 @@
+import numpy as np
+
+
+STATISTICS = ('raw', 'mean', 'rms', 'min', 'max', 'peak_to_peak', 'std', 'ac_rms', 'percentile')
+
+# The STATISTICS that follow from count, sum, sum of squares, min and max alone,
+# so they can also be taken from merged summaries of many blocks.
+MOMENT_STATISTICS = ('mean', 'rms', 'min', 'max', 'peak_to_peak', 'std', 'ac_rms')
+
+
+def from_moments(statistic, count, total, sumsq, low, high):
+    """
+    Compute one of MOMENT_STATISTICS from per-channel sums, e.g. of the intervals of filters.Aggregator.
+
+    Args:
+        statistic (str): Name from MOMENT_STATISTICS.
+        count (int or np.ndarray): Samples summed.
+        total, sumsq, low, high (np.ndarray): Sum, sum of squares, minimum and maximum of the samples.
+    """
+    if statistic == 'mean':
+        return total / count
+    if statistic == 'rms':
+        return np.sqrt(sumsq / count)
+    if statistic == 'min':
+        return low
+    if statistic == 'max':
+        return high
+    if statistic == 'peak_to_peak':
+        return high - low
+    if statistic in ('std', 'ac_rms'):
+        # As in Reducer, the DC-removed RMS is the population standard deviation.
+        mean = total / count
+        return np.sqrt(np.maximum(sumsq / count - mean * mean, 0))
+    raise ValueError(f"Unknown statistic {statistic}. Must be from {list(MOMENT_STATISTICS)}.")
+
+
+class Reducer:
+    """
+    Turns a (chans_in, n) block of samples into per-channel statistics.
+
+    Every requested statistic is computed from the same block, so one hardware
+    read can feed several of them. Intermediate results are shared (e.g.
+    peak_to_peak reuses min and max) and written with out= wherever NumPy allows.
+
+    Output names are the statistic names, except that 'percentile' expands to
+    one output per requested percentile named 'p<q>' (e.g. 'p5', 'p99.9').
+    'raw' is the block itself, not a copy.
+    """
+
+    def __init__(self, statistics=('rms',), decimals=None, percentiles=(5, 50, 95)):
+        """
+        Args:
+            statistics (iterable): Names from STATISTICS, in the order they should be returned.
+            decimals (int, optional): Round every statistic to this many decimals. Raw samples are never rounded.
+            percentiles (iterable): Percentiles (0-100) computed when 'percentile' is requested.
+        """
+        if isinstance(statistics, str):
+            statistics = (statistics,)
+        statistics = tuple(statistics)
+        if not statistics:
+            raise ValueError("At least one statistic is required.")
+        unknown = [name for name in statistics if name not in STATISTICS]
+        if unknown:
+            raise ValueError(f"Unknown statistics {unknown}. Must be from {list(STATISTICS)}.")
+
+        self.statistics = statistics
+        self.decimals = decimals
+        self.percentiles = tuple(percentiles)
+        self.outputs = []
+        for name in statistics:
+            if name == 'percentile':
+                self.outputs.extend(f"p{q:g}" for q in self.percentiles)
+            else:
+                self.outputs.append(name)
+
+    def __call__(self, block, out=None):
+        """
+        Reduce one block.
+
+        Args:
+            block (np.ndarray): Samples grouped by channel, shape (chans_in, n).
+            out (np.ndarray or dict, optional): Preallocated (chans_in,) array when
+                there is a single output, otherwise a dict of them keyed by output name.
+
+        Returns:
+            np.ndarray or dict: The single output, or a dict of all outputs keyed by name.
+        """
+        if len(self.outputs) == 1:
+            out = {self.outputs[0]: out}
+        elif out is None:
+            out = {}
+        chans, n = block.shape
+
+        def target(name):
+            array = out.get(name)
+            if array is None:
+                array = out[name] = np.empty(chans)
+            return array
+
+        results = {}
+        if 'min' in self.statistics or 'peak_to_peak' in self.statistics:
+            results['min'] = np.min(block, axis=1, out=target('min') if 'min' in self.statistics else None)
+        if 'max' in self.statistics or 'peak_to_peak' in self.statistics:
+            results['max'] = np.max(block, axis=1, out=target('max') if 'max' in self.statistics else None)
+
+        for name in self.statistics:
+            if name == 'raw':
+                results['raw'] = block
+            elif name == 'mean':
+                results['mean'] = np.mean(block, axis=1, out=target('mean'))
+            elif name == 'rms':
+                # einsum sums the squares without materialising block**2.
+                rms = np.einsum('ij,ij->i', block, block, out=target('rms'))
+                rms /= n
+                results['rms'] = np.sqrt(rms, out=rms)
+            elif name == 'peak_to_peak':
+                results['peak_to_peak'] = np.subtract(results['max'], results['min'], out=target('peak_to_peak'))
+            elif name in ('std', 'ac_rms'):
+                # The DC-removed RMS is the population standard deviation.
+                other = 'ac_rms' if name == 'std' else 'std'
+                if other in results:
+                    results[name] = target(name)
+                    results[name][:] = results[other]
+                else:
+                    # From the sum and sum of squares, as np.std would copy the block.
+                    std = np.sum(block, axis=1, out=target(name))
+                    sumsq = np.einsum('ij,ij->i', block, block)
+                    std[:] = from_moments(name, n, std, sumsq, None, None)
+                    results[name] = std
+            elif name == 'percentile':
+                values = np.percentile(block, self.percentiles, axis=1)
+                for q, row in zip(self.percentiles, values):
+                    key = f"p{q:g}"
+                    results[key] = target(key)
+                    results[key][:] = row
+
+        if self.decimals is not None:
+            for name in self.outputs:
+                if name != 'raw':
+                    np.round(results[name], self.decimals, out=results[name])
+
+        if len(self.outputs) == 1:
+            return results[self.outputs[0]]
+        return {name: results[name] for name in self.outputs}
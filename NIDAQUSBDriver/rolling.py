@@ -0,0 +1,320 @@
+import numpy as np
+
+
+# Block lengths EWMAStats keeps weights for, e.g. a full read and the last partial block of a FINITE acquisition.
+WEIGHT_WIDTHS = 4
+
+
+class _Summary:
+    """
+    Count, mean, sum of squared deviations (M2), min and max of every channel.
+
+    Queries are shared by RunningStats and WindowStats.
+    """
+
+    @property
+    def mean(self):
+        return self._query()[1].copy()
+
+    def var(self, ddof=0):
+        """
+        Variance of every channel. ddof=1 gives the sample variance.
+        """
+        count, _, m2, _, _ = self._query()
+        return m2 / np.maximum(count - ddof, 1)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.var(ddof))
+
+    @property
+    def rms(self):
+        count, mean, m2, _, _ = self._query()
+        return np.sqrt(mean * mean + m2 / max(count, 1))
+
+    @property
+    def min(self):
+        return self._query()[3].copy()
+
+    @property
+    def max(self):
+        return self._query()[4].copy()
+
+    @property
+    def count(self):
+        return self._query()[0]
+
+    def snapshot(self):
+        """
+        Return every statistic as a dict of per-channel arrays.
+        """
+        count, mean, m2, low, high = self._query()
+        return {
+            'count': count,
+            'mean': mean.copy(),
+            'rms': np.sqrt(mean * mean + m2 / max(count, 1)),
+            'var': m2 / max(count, 1),
+            'std': np.sqrt(m2 / max(count, 1)),
+            'min': low.copy(),
+            'max': high.copy(),
+        }
+
+
+def block_moments(block, scratch=None):
+    """
+    Count, mean, M2, min and max of each channel of a (chans, n) block.
+
+    Deviations are taken from each channel's first sample, which keeps M2
+    accurate for signals with a large offset. Pass a (chans, n) `scratch`
+    array to avoid allocating on every block.
+    """
+    n = block.shape[1]
+    if scratch is None:
+        scratch = np.empty(block.shape)
+    shift = block[:, 0].copy()
+    np.subtract(block, shift[:, None], out=scratch)
+    total = scratch.sum(axis=1)
+    m2 = np.einsum('ij,ij->i', scratch, scratch)
+    m2 -= total * total / n
+    np.maximum(m2, 0, out=m2)
+    return n, shift + total / n, m2, block.min(axis=1), block.max(axis=1)
+
+
+class RunningStats(_Summary):
+    """
+    Per-channel statistics of everything seen since the last reset, in O(chans) state.
+
+    Each block is summarised once and folded in with Chan et al.'s parallel
+    form of Welford's update. Two RunningStats over the same channels can be
+    merged, e.g. partial results from different threads or runs.
+    """
+
+    def __init__(self, chans):
+        self.chans = chans
+        self.reset()
+
+    def reset(self):
+        self._count = 0
+        self._mean = np.zeros(self.chans)
+        self._m2 = np.zeros(self.chans)
+        self._min = np.full(self.chans, np.inf)
+        self._max = np.full(self.chans, -np.inf)
+
+    def update(self, block, scratch=None):
+        """
+        Add a (chans, n) block of samples.
+        """
+        self.add(*block_moments(block, scratch))
+
+    def add(self, count, mean, m2, low, high):
+        """
+        Fold in a summary, as returned by block_moments().
+        """
+        if count == 0:
+            return
+        total = self._count + count
+        delta = mean - self._mean
+        self._mean += delta * (count / total)
+        self._m2 += m2 + delta * delta * (self._count * count / total)
+        np.minimum(self._min, low, out=self._min)
+        np.maximum(self._max, high, out=self._max)
+        self._count = total
+
+    def merge(self, other):
+        """
+        Fold in another RunningStats over the same channels. `other` is left unchanged.
+        """
+        if other.chans != self.chans:
+            raise ValueError(f"Cannot merge statistics of {other.chans} channels into {self.chans}.")
+        self.add(*other._query())
+        return self
+
+    def _query(self):
+        return self._count, self._mean, self._m2, self._min, self._max
+
+
+class WindowStats(_Summary):
+    """
+    Per-channel statistics over the most recent `blocks` blocks.
+
+    Keeps one summary per block in fixed arrays, so an update is O(chans)
+    whatever the window length, and a query combines at most `blocks`
+    summaries in one vectorized step. No samples are stored.
+    """
+
+    def __init__(self, chans, blocks):
+        if blocks < 1:
+            raise ValueError("Window must hold at least 1 block.")
+        self.chans = chans
+        self.blocks = blocks
+        self._counts = np.zeros(blocks)
+        self._means = np.zeros((blocks, chans))
+        self._m2s = np.zeros((blocks, chans))
+        self._mins = np.zeros((blocks, chans))
+        self._maxs = np.zeros((blocks, chans))
+        self.reset()
+
+    def reset(self):
+        self._written = 0
+        self._counts[:] = 0
+
+    def update(self, block, scratch=None):
+        """
+        Add a (chans, n) block of samples, dropping the oldest block once the window is full.
+        """
+        self.add(*block_moments(block, scratch))
+
+    def add(self, count, mean, m2, low, high):
+        """
+        Add a summary, as returned by block_moments().
+        """
+        slot = self._written % self.blocks
+        self._counts[slot] = count
+        self._means[slot] = mean
+        self._m2s[slot] = m2
+        self._mins[slot] = low
+        self._maxs[slot] = high
+        self._written += 1
+
+    def summary(self):
+        """
+        Return the current window as a RunningStats, e.g. to merge windows of several modules.
+        """
+        stats = RunningStats(self.chans)
+        stats.add(*self._query())
+        return stats
+
+    def _query(self):
+        filled = min(self._written, self.blocks)
+        if filled == 0:
+            return 0, np.zeros(self.chans), np.zeros(self.chans), np.full(self.chans, np.inf), np.full(self.chans, -np.inf)
+        counts = self._counts[:filled, None]
+        total = counts.sum()
+        means = self._means[:filled]
+        mean = (counts * means).sum(axis=0) / total
+        deviation = means - mean
+        m2 = self._m2s[:filled].sum(axis=0) + (counts * deviation * deviation).sum(axis=0)
+        return int(total), mean, m2, self._mins[:filled].min(axis=0), self._maxs[:filled].max(axis=0)
+
+
+class EWMAStats:
+    """
+    Exponentially weighted mean, mean square and variance of every channel.
+
+    Each block is folded in exactly as if it were applied sample by sample,
+    with one weighted sum per channel. Early values are bias corrected, so they
+    do not start out pulled towards zero.
+    """
+
+    def __init__(self, chans, time_constant, sampling_freq):
+        """
+        Args:
+            chans (int): Number of channels.
+            time_constant (float): Time for a sample's weight to fall to 1/e, in seconds.
+            sampling_freq (float): Sample rate in Hz.
+        """
+        self.chans = chans
+        self.time_constant = time_constant
+        self.sampling_freq = sampling_freq
+        # Per-sample decay of the old value.
+        self.decay = np.exp(-1.0 / (time_constant * sampling_freq))
+        self._weights = {}
+        self.reset()
+
+    def reset(self):
+        self._mean = np.zeros(self.chans)
+        self._square = np.zeros(self.chans)
+        self._weight = 0.0
+
+    def _block_weights(self, n):
+        weights = self._weights.get(n)
+        if weights is None:
+            if len(self._weights) >= WEIGHT_WIDTHS:
+                # Block lengths are dropped oldest first, so reads of varying size do not grow this without bound.
+                del self._weights[next(iter(self._weights))]
+            weights = self._weights[n] = (1 - self.decay) * self.decay ** np.arange(n - 1, -1, -1)
+        return weights
+
+    def update(self, block):
+        """
+        Add a (chans, n) block of samples.
+        """
+        n = block.shape[1]
+        weights = self._block_weights(n)
+        decay = self.decay ** n
+        self._mean *= decay
+        self._mean += block @ weights
+        self._square *= decay
+        self._square += np.einsum('ij,ij,j->i', block, block, weights)
+        self._weight = self._weight * decay + (1 - decay)
+
+    @property
+    def mean(self):
+        return self._mean / max(self._weight, 1e-300)
+
+    @property
+    def rms(self):
+        return np.sqrt(self._square / max(self._weight, 1e-300))
+
+    def var(self):
+        mean = self.mean
+        return np.maximum(self._square / max(self._weight, 1e-300) - mean * mean, 0)
+
+    def std(self):
+        return np.sqrt(self.var())
+
+    def snapshot(self):
+        mean = self.mean
+        return {'mean': mean, 'rms': self.rms, 'var': self.var(), 'std': self.std()}
+
+
+class RollingStats:
+    """
+    Running, sliding-window and exponentially weighted statistics of one stream.
+
+    Use write() as a block listener. Each block is summarised once and the
+    summary feeds both the running and the window statistics.
+    """
+
+    def __init__(self, chans, window_blocks=None, time_constant=None, sampling_freq=None):
+        """
+        Args:
+            chans (int): Number of channels.
+            window_blocks (int, optional): Length of the sliding window in blocks. No window when omitted.
+            time_constant (float, optional): EWMA time constant in seconds. No EWMA when omitted.
+            sampling_freq (float, optional): Sample rate in Hz, needed for the EWMA.
+        """
+        self.running = RunningStats(chans)
+        self.window = WindowStats(chans, window_blocks) if window_blocks else None
+        self.ewma = EWMAStats(chans, time_constant, sampling_freq) if time_constant else None
+        self._scratch = None
+
+    def write(self, block):
+        """
+        Add a (chans, n) block. Safe to use as a block listener.
+        """
+        if self._scratch is None or self._scratch.shape != block.shape:
+            self._scratch = np.empty(block.shape)
+        moments = block_moments(block, self._scratch)
+        self.running.add(*moments)
+        if self.window is not None:
+            self.window.add(*moments)
+        if self.ewma is not None:
+            self.ewma.update(block)
+
+    def reset(self):
+        self.running.reset()
+        if self.window is not None:
+            self.window.reset()
+        if self.ewma is not None:
+            self.ewma.reset()
+
+    def snapshot(self):
+        """
+        Return {'running': ..., 'window': ..., 'ewma': ...} dicts of per-channel arrays.
+        """
+        snapshot = {'running': self.running.snapshot()}
+        if self.window is not None:
+            snapshot['window'] = self.window.snapshot()
+        if self.ewma is not None:
+            snapshot['ewma'] = self.ewma.snapshot()
+        return snapshot
@@ -0,0 +1,314 @@
+import json
+import os
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+MAGIC = b'NIDAQSHM'
+VERSION = 2
+# Magic, control words, sample rate and the JSON metadata all fit in the first page.
+HEADER_BYTES = 4096
+# Control words after the magic: version, chans, samples_per_frame, slots,
+# frames published, samples published, closed flag, metadata length.
+_CONTROL_WORDS = 8
+_VERSION, _CHANS, _SAMPLES, _SLOTS, _PUBLISHED, _SAMPLE_COUNT, _CLOSED, _META_LENGTH = range(_CONTROL_WORDS)
+_RATE_OFFSET = len(MAGIC) + 8 * _CONTROL_WORDS
+_META_OFFSET = _RATE_OFFSET + 8
+# Per slot: sequence number of the frame it holds (0 while it is being written),
+# first sample number, samples per channel in the frame and host time.
+SLOT_DTYPE = np.dtype([('sequence', '<u8'), ('sample', '<u8'), ('samples', '<u8'), ('time', '<f8')])
+
+# One published block. `sequence` counts frames from 1, `sample` is the number
+# of the block's first sample since publishing started and `timestamp` is the
+# host time it was published. `data` is (chans, n), n at most samples_per_frame.
+SharedFrame = namedtuple('SharedFrame', ['sequence', 'sample', 'timestamp', 'data'])
+
+# Segments published from this process, which its resource tracker must keep tracking.
+_published_here = set()
+
+
+def _layout(chans, samples_per_frame, slots):
+    slot_offset = HEADER_BYTES
+    data_offset = -(-(slot_offset + slots * SLOT_DTYPE.itemsize) // HEADER_BYTES) * HEADER_BYTES
+    size = data_offset + 8 * slots * chans * samples_per_frame
+    return slot_offset, data_offset, size
+
+
+class _SharedRing:
+    # Views shared by the publisher and subscribers onto one segment.
+
+    def _map(self, chans, samples_per_frame, slots):
+        slot_offset, data_offset, _ = _layout(chans, samples_per_frame, slots)
+        buf = self._shm.buf
+        self._control = np.ndarray((_CONTROL_WORDS,), dtype='<u8', buffer=buf, offset=len(MAGIC))
+        self._slots = np.ndarray((slots,), dtype=SLOT_DTYPE, buffer=buf, offset=slot_offset)
+        self._data = np.ndarray((slots, chans, samples_per_frame), dtype='<f8', buffer=buf, offset=data_offset)
+
+    def _unmap(self):
+        self._control = self._slots = self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Frames handed out as views still reference the segment; it is
+            # released when the last of them is garbage collected.
+            pass
+
+    @property
+    def published(self):
+        """
+        Number of frames published so far.
+        """
+        return int(self._control[_PUBLISHED])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedMemoryPublisher(_SharedRing):
+    """
+    Publishes raw (chans, n) blocks to a multiprocessing.shared_memory ring.
+
+    The process that owns the task publishes; any number of local processes
+    attach a SharedMemorySubscriber by name. The segment holds a one-page
+    header (sizes, counters, channel names and sample rate as JSON), a record
+    per slot and then `slots` frames of float64 (chans, samples_per_frame)
+    data. A narrower block fills part of a slot, whose record holds its width;
+    a wider one is published as several consecutive frames. The publisher
+    never waits for subscribers: it overwrites the oldest slot, and each
+    slot's sequence number lets a subscriber tell a frame it was reading has
+    since been overwritten.
+    """
+
+    def __init__(self, channel_names, samples_per_frame, sampling_freq, slots=64, name=None, metadata=None):
+        """
+        Args:
+            channel_names (list): One name per channel.
+            samples_per_frame (int): Most samples per channel in one frame, i.e. the slot size.
+            sampling_freq (float): Sample rate in Hz, passed on to subscribers.
+            slots (int): Number of frames kept in the ring.
+            name (str, optional): Name of the segment. A unique name is chosen when omitted.
+            metadata (dict, optional): Extra JSON-serialisable fields for subscribers.
+        """
+        if slots < 2:
+            raise ValueError("Shared memory ring needs at least 2 slots.")
+        self.channel_names = list(channel_names)
+        self.chans = len(self.channel_names)
+        self.samples_per_frame = samples_per_frame
+        self.sampling_freq = sampling_freq
+        self.slots = slots
+
+        header = dict(metadata or {})
+        header.update({'channel_names': self.channel_names, 'start_time': time.time()})
+        encoded = json.dumps(header).encode('utf-8')
+        if _META_OFFSET + len(encoded) > HEADER_BYTES:
+            raise ValueError("Channel names and metadata do not fit in the shared memory header.")
+
+        _, _, size = _layout(self.chans, samples_per_frame, slots)
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self._shm.name
+        _published_here.add(self.name)
+        self._map(self.chans, samples_per_frame, slots)
+        buf = self._shm.buf
+        buf[_META_OFFSET:_META_OFFSET + len(encoded)] = encoded
+        np.ndarray((1,), dtype='<f8', buffer=buf, offset=_RATE_OFFSET)[0] = sampling_freq
+        self._control[:] = 0
+        self._control[_VERSION] = VERSION
+        self._control[_CHANS] = self.chans
+        self._control[_SAMPLES] = samples_per_frame
+        self._control[_SLOTS] = slots
+        self._control[_META_LENGTH] = len(encoded)
+        self._slots[:] = 0
+        # Subscribers check the magic last, so they never see a half-initialised header.
+        buf[:len(MAGIC)] = MAGIC
+        self._frames = 0
+        self._samples = 0
+
+    def write(self, block):
+        """
+        Publish a (chans, n) block of any width. Safe to use as a block listener.
+
+        A block wider than samples_per_frame is split into consecutive frames.
+        """
+        for start in range(0, block.shape[1], self.samples_per_frame):
+            self._publish(block[:, start:start + self.samples_per_frame])
+
+    def _publish(self, block):
+        n = block.shape[1]
+        sequence = self._frames + 1
+        slot = self._frames % self.slots
+        record = self._slots[slot:slot + 1]
+        # Sequence 0 marks the slot as being rewritten until the copy is complete.
+        record['sequence'] = 0
+        self._data[slot, :, :n] = block
+        record['sample'] = self._samples
+        record['samples'] = n
+        record['time'] = time.time()
+        record['sequence'] = sequence
+        self._frames = sequence
+        self._samples += n
+        self._control[_SAMPLE_COUNT] = self._samples
+        self._control[_PUBLISHED] = sequence
+
+    def close(self):
+        """
+        Mark the ring closed and remove the segment. Attached subscribers keep
+        their mapping until they close it themselves.
+        """
+        if self._control is None:
+            return
+        self._control[_CLOSED] = 1
+        self._unmap()
+        self._shm.unlink()
+        _published_here.discard(self.name)
+
+
+class SharedMemorySubscriber(_SharedRing):
+    """
+    Reads frames published by a SharedMemoryPublisher in another process.
+
+    Attaching and detaching never touches the publisher. By default read()
+    returns frames as zero-copy views onto the ring. A view stays valid until
+    the publisher wraps around to its slot; check with valid(frame) after using
+    it, or pass copy=True to get a private copy that is already verified.
+    Frames overwritten before they were read are skipped and counted in
+    `overruns`.
+    """
+
+    def __init__(self, name, start='latest', poll_interval=0.0005):
+        """
+        Args:
+            name (str): Name of the publisher's segment.
+            start (str): 'latest' to begin with the next frame published, 'oldest'
+                to begin with the oldest frame still in the ring.
+            poll_interval (float): Pause between checks for a new frame, in seconds.
+        """
+        if start not in ('latest', 'oldest'):
+            raise ValueError("Invalid start. Must be 'latest' or 'oldest'.")
+        self._shm = _attach(name)
+        self.name = name
+        buf = self._shm.buf
+        if bytes(buf[:len(MAGIC)]) != MAGIC:
+            self._shm.close()
+            raise ValueError(f"Shared memory segment {name} is not a NIDAQ frame ring.")
+        control = np.ndarray((_CONTROL_WORDS,), dtype='<u8', buffer=buf, offset=len(MAGIC))
+        if int(control[_VERSION]) != VERSION:
+            version = int(control[_VERSION])
+            del control
+            self._shm.close()
+            raise ValueError(f"Shared memory segment {name} has ring version {version}; this reader supports {VERSION}.")
+        self.chans, self.samples_per_frame, self.slots = (int(control[i]) for i in (_CHANS, _SAMPLES, _SLOTS))
+        meta_length = int(control[_META_LENGTH])
+        del control
+        self.sampling_freq = float(np.ndarray((1,), dtype='<f8', buffer=buf, offset=_RATE_OFFSET)[0])
+        self.header = json.loads(bytes(buf[_META_OFFSET:_META_OFFSET + meta_length]).decode('utf-8'))
+        self.channel_names = self.header['channel_names']
+        self._map(self.chans, self.samples_per_frame, self.slots)
+
+        self.poll_interval = poll_interval
+        self.overruns = 0
+        published = self.published
+        self._next = published + 1 if start == 'latest' else max(published - self.slots + 1, 1)
+
+    @property
+    def closed(self):
+        """
+        True once the publisher has closed the ring.
+        """
+        return self._control is None or bool(self._control[_CLOSED])
+
+    def _frame(self, sequence, copy):
+        slot = (sequence - 1) % self.slots
+        record = self._slots[slot]
+        data = self._data[slot, :, :int(record['samples'])]
+        if copy:
+            data = data.copy()
+        frame = SharedFrame(sequence, int(record['sample']), float(record['time']), data)
+        return frame if int(self._slots[slot]['sequence']) == sequence else None
+
+    def valid(self, frame):
+        """
+        True if the slot of `frame` still holds it, i.e. a view has not been overwritten.
+        """
+        return int(self._slots[(frame.sequence - 1) % self.slots]['sequence']) == frame.sequence
+
+    def read(self, timeout=None, copy=False):
+        """
+        Return the next frame, waiting for it to be published.
+
+        Args:
+            timeout (float, optional): Longest wait in seconds. None waits until
+                a frame arrives or the publisher closes.
+            copy (bool): Return a private copy instead of a view onto the ring.
+
+        Returns:
+            SharedFrame or None: None if the timeout expired or the ring was closed.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            published = self.published
+            if published >= self._next:
+                oldest = published - self.slots + 1
+                if self._next < oldest:
+                    self.overruns += oldest - self._next
+                    self._next = oldest
+                frame = self._frame(self._next, copy)
+                if frame is not None:
+                    self._next += 1
+                    return frame
+                # The publisher lapped us while we read the slot; try the next oldest frame.
+                self.overruns += 1
+                self._next += 1
+                continue
+            if self.closed or (deadline is not None and time.perf_counter() >= deadline):
+                return None
+            time.sleep(self.poll_interval)
+
+    def latest(self, copy=False):
+        """
+        Return the most recently published frame without waiting, or None if there is none yet.
+
+        Does not move the position read() continues from.
+        """
+        while True:
+            published = self.published
+            if published == 0:
+                return None
+            frame = self._frame(published, copy)
+            if frame is not None:
+                return frame
+
+    def frames(self, timeout=None, copy=False):
+        """
+        Iterate over frames as they are published, until the publisher closes or `timeout` passes without a frame.
+        """
+        while True:
+            frame = self.read(timeout=timeout, copy=copy)
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        """
+        Detach from the ring. The publisher and other subscribers are unaffected.
+        """
+        if self._control is None:
+            return
+        self._unmap()
+
+
+def _attach(name):
+    # Before Python 3.13 attaching registers the segment with this process's
+    # resource tracker, which would remove it when the subscriber exits.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix' and shm.name not in _published_here:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
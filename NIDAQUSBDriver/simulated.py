@@ -0,0 +1,386 @@
+import re
+import threading
+import time
+
+import numpy as np
+
+from ._lazy import nidaqmx
+
+
+# Error codes raised by the simulator, matching the ones NI-DAQmx uses.
+TIMEOUT_ERROR = -200284
+OVERWRITE_ERROR = -200279
+ABORTED_ERROR = -88709
+INJECTED_ERROR = -200000
+
+# Values of READ_ALL_AVAILABLE and WAIT_INFINITELY.
+READ_ALL_AVAILABLE = -1
+WAIT_INFINITELY = -1.0
+
+WAVEFORMS = ('sine', 'square', 'sawtooth', 'dc')
+
+
+def _count_channels(physical_channel):
+    count = 0
+    for part in physical_channel.split(','):
+        match = re.search(r'(\d+):(\d+)\s*$', part)
+        if match:
+            first, last = int(match.group(1)), int(match.group(2))
+            count += abs(last - first) + 1
+        elif part.strip():
+            count += 1
+    return count
+
+
+class SimulatedBackend:
+    """
+    Deterministic stand-in for NI-DAQmx, for tests and benchmarks without hardware.
+
+    Each channel plays a periodic waveform plus seeded Gaussian noise. To keep
+    reads cheap the signal is rendered once into a tape of tape_seconds and
+    then replayed, so reads cost a memory copy, as with the real driver.
+    """
+
+    def __init__(self, waveform='sine', amplitude=1.0, offset=0.0, frequency=10.0, noise=0.0, seed=0,
+                 realtime=False, tape_seconds=1.0, fail_reads=(), error_rate=0.0, clock_drift_ppm=0.0):
+        """
+        Args:
+            waveform (str or callable): One of WAVEFORMS, or f(t, chans) returning a (chans, len(t)) array.
+                'dc' holds every channel at `offset`.
+            amplitude (float): Peak amplitude of the waveform.
+            offset (float): DC offset added to every channel.
+            frequency (float): Waveform frequency in Hz. Channels are phase-shifted from each other.
+            noise (float): Standard deviation of the added Gaussian noise.
+            seed (int): Seed for the noise and for error_rate.
+            realtime (bool): Pace acquisition by the sample clock, so reads block
+                until their samples exist and overrun like real hardware. When
+                False, every read is satisfied immediately.
+            tape_seconds (float): Length of the rendered signal before it repeats.
+            fail_reads (iterable): Zero-based read numbers that raise DaqError.
+            error_rate (float): Probability that any read raises DaqError.
+            clock_drift_ppm (float): How much faster than its nominal rate the simulated
+                sample clock runs, in parts per million of host time. Only used when realtime.
+        """
+        if not callable(waveform) and waveform not in WAVEFORMS:
+            raise ValueError(f"Invalid waveform. Must be one of {list(WAVEFORMS)} or a callable.")
+        self.waveform = waveform
+        self.amplitude = amplitude
+        self.offset = offset
+        self.frequency = frequency
+        self.noise = noise
+        self.seed = seed
+        self.realtime = realtime
+        self.tape_seconds = tape_seconds
+        self.fail_reads = set(fail_reads)
+        self.error_rate = error_rate
+        self.clock_drift_ppm = clock_drift_ppm
+        self.tasks = []
+        self._pending_errors = []
+        self._rng = np.random.default_rng(seed)
+
+    def create_task(self):
+        task = SimulatedTask(self)
+        self.tasks.append(task)
+        return task
+
+    def create_reader(self, task):
+        return SimulatedReader(task)
+
+    def inject_error(self, error_code=INJECTED_ERROR, message="Simulated DAQ error.", count=1):
+        """
+        Make the next `count` reads on any task of this backend raise DaqError.
+        """
+        self._pending_errors.extend([(message, error_code)] * count)
+
+    def _next_error(self, read_number):
+        if self._pending_errors:
+            return self._pending_errors.pop(0)
+        if read_number in self.fail_reads:
+            return ("Simulated DAQ error.", INJECTED_ERROR)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return ("Simulated DAQ error.", INJECTED_ERROR)
+        return None
+
+    def render(self, chans, rate):
+        """
+        Render the (chans, tape length) signal tape for one task.
+        """
+        n = max(int(round(rate * self.tape_seconds)), 1)
+        t = np.arange(n) / rate
+        if callable(self.waveform):
+            tape = np.asarray(self.waveform(t, chans), dtype=np.float64).reshape(chans, n)
+        else:
+            phase = 2 * np.pi * (self.frequency * t[None, :] + np.arange(chans)[:, None] / max(chans, 1))
+            if self.waveform == 'sine':
+                tape = np.sin(phase)
+            elif self.waveform == 'square':
+                tape = np.sign(np.sin(phase))
+            elif self.waveform == 'sawtooth':
+                tape = 2 * ((phase / (2 * np.pi)) % 1.0) - 1
+            else:
+                tape = np.zeros((chans, n))
+            tape = self.offset + self.amplitude * tape
+        if self.noise:
+            tape = tape + np.random.default_rng(self.seed).normal(0.0, self.noise, tape.shape)
+        return np.ascontiguousarray(tape)
+
+
+class _ChannelProperties:
+    # Stands in for task.ai_channels.all; properties can only change while the task is stopped.
+    def __init__(self, task):
+        object.__setattr__(self, '_task', task)
+
+    def __setattr__(self, name, value):
+        self._task._check_not_running()
+        object.__setattr__(self, name, value)
+
+
+class _Channels:
+    def __init__(self, task):
+        self._task = task
+        self.all = _ChannelProperties(task)
+
+    def add_ai_voltage_chan(self, physical_channel, **kwargs):
+        self._task._add_channels(physical_channel, 'voltage', kwargs)
+
+    def add_ai_thrmcpl_chan(self, physical_channel, **kwargs):
+        self._task._add_channels(physical_channel, 'thermocouple', kwargs)
+
+    def add_ai_temp_built_in_sensor_chan(self, physical_channel, **kwargs):
+        self._task._add_channels(physical_channel, 'temperature', kwargs)
+
+    def add_ai_current_chan(self, physical_channel, **kwargs):
+        self._task._add_channels(physical_channel, 'current', kwargs)
+
+    def add_ai_rtd_chan(self, physical_channel, **kwargs):
+        self._task._add_channels(physical_channel, 'rtd', kwargs)
+
+    def add_ai_strain_gage_chan(self, physical_channel, **kwargs):
+        self._task._add_channels(physical_channel, 'strain', kwargs)
+
+
+class _Timing:
+    def __init__(self, task):
+        self._task = task
+        self.samp_clk_rate = 1000.0
+        self.samp_quant_samp_mode = None
+        self.samp_quant_samp_per_chan = 1000
+        self.samp_clk_src = ''
+
+    @property
+    def samp_clk_term(self):
+        return f"/{self._task.name}/ai/SampleClock"
+
+    def cfg_samp_clk_timing(self, rate, source='', active_edge=None, sample_mode=None, samps_per_chan=1000):
+        self._task._check_not_running()
+        if sample_mode is None:
+            sample_mode = nidaqmx.constants.AcquisitionType.FINITE
+        self.samp_clk_rate = float(rate)
+        self.samp_clk_src = source
+        self.samp_quant_samp_mode = sample_mode
+        self.samp_quant_samp_per_chan = samps_per_chan
+
+
+class _StartTrigger:
+    def __init__(self, task):
+        self._task = task
+        self.source = None
+
+    @property
+    def term(self):
+        return f"/{self._task.name}/ai/StartTrigger"
+
+    def cfg_dig_edge_start_trig(self, trigger_source, trigger_edge=None):
+        self.source = trigger_source
+
+
+class _Triggers:
+    def __init__(self, task):
+        self.start_trigger = _StartTrigger(task)
+
+
+class _InStream:
+    def __init__(self, task):
+        self._task = task
+        self.input_buf_size = 0
+
+    @property
+    def avail_samp_per_chan(self):
+        return self._task._available()
+
+    @property
+    def curr_read_pos(self):
+        return self._task.read_pos
+
+    @property
+    def total_samp_per_chan_acquired(self):
+        return self._task._acquired()
+
+
+class SimulatedTask:
+    """
+    The subset of nidaqmx.Task used by the client classes.
+    """
+
+    _count = 0
+
+    def __init__(self, backend):
+        SimulatedTask._count += 1
+        self.name = f"SimTask{SimulatedTask._count}"
+        self.backend = backend
+        self.ai_channels = _Channels(self)
+        self.timing = _Timing(self)
+        self.triggers = _Triggers(self)
+        self.in_stream = _InStream(self)
+        self.channels = []
+        self.channel_type = None
+        self.running = False
+        self.closed = False
+        self.reads = 0
+        self.read_pos = 0
+        self._start_time = None
+        self._tape = None
+        self._event = None
+        self._event_thread = None
+        # Set while the task is stopped, so a read waiting for samples wakes up and aborts.
+        self._stopped = threading.Event()
+        self._stopped.set()
+
+    def _check_open(self):
+        if self.closed:
+            raise nidaqmx.errors.DaqError("Task has been closed.", -200088, self.name)
+
+    def _check_not_running(self):
+        self._check_open()
+        if self.running:
+            raise nidaqmx.errors.DaqError("Property cannot be set while the task is running.", -200557, self.name)
+
+    def _add_channels(self, physical_channel, channel_type, settings):
+        self._check_not_running()
+        self.channels.extend([settings] * _count_channels(physical_channel))
+        self.channel_type = channel_type
+
+    @property
+    def number_of_channels(self):
+        return len(self.channels)
+
+    def _acquired(self):
+        if not self.running:
+            return self.read_pos
+        if not self.backend.realtime:
+            return self.read_pos + max(self.in_stream.input_buf_size, self.timing.samp_quant_samp_per_chan)
+        acquired = int((time.perf_counter() - self._start_time) * self.timing.samp_clk_rate * (1 + self.backend.clock_drift_ppm * 1e-6))
+        if self.timing.samp_quant_samp_mode == nidaqmx.constants.AcquisitionType.FINITE:
+            acquired = min(acquired, self.timing.samp_quant_samp_per_chan)
+        return acquired
+
+    def _available(self):
+        return self._acquired() - self.read_pos
+
+    def start(self):
+        self._check_open()
+        if self.running:
+            return
+        self._tape = self.backend.render(self.number_of_channels, self.timing.samp_clk_rate)
+        self.read_pos = 0
+        self._start_time = time.perf_counter()
+        self.running = True
+        self._stopped.clear()
+        if self._event is not None:
+            self._event_thread = threading.Thread(target=self._fire_events, daemon=True)
+            self._event_thread.start()
+
+    def stop(self):
+        self.running = False
+        self._stopped.set()
+        if self._event_thread is not None and self._event_thread is not threading.current_thread():
+            self._event_thread.join()
+        self._event_thread = None
+
+    def close(self):
+        self.stop()
+        self.closed = True
+
+    def control(self, action):
+        self._check_open()
+
+    def is_task_done(self):
+        return not self.running or (self.timing.samp_quant_samp_mode == nidaqmx.constants.AcquisitionType.FINITE
+                                    and self._acquired() >= self.timing.samp_quant_samp_per_chan)
+
+    def register_every_n_samples_acquired_into_buffer_event(self, sample_interval, callback_method):
+        self._check_not_running()
+        self._event = None if callback_method is None else (sample_interval, callback_method)
+
+    def _fire_events(self):
+        # Events follow the sample clock even when reads are not paced by it.
+        interval, callback = self._event
+        fired = 0
+        # Like the hardware, a finite acquisition raises no event for its last partial block or after it ends.
+        last = self.timing.samp_quant_samp_per_chan // interval \
+            if self.timing.samp_quant_samp_mode == nidaqmx.constants.AcquisitionType.FINITE else None
+        while self.running and fired != last:
+            if (time.perf_counter() - self._start_time) * self.timing.samp_clk_rate >= (fired + 1) * interval:
+                fired += 1
+                callback(0, 1, interval, None)
+            else:
+                time.sleep(interval / self.timing.samp_clk_rate / 4)
+
+    def _read(self, data, n, timeout):
+        self._check_open()
+        error = self.backend._next_error(self.reads)
+        self.reads += 1
+        if error is not None:
+            raise nidaqmx.errors.DaqReadError(error[0], error[1], self.name)
+        if not self.running:
+            self.start()
+
+        if self.backend.realtime:
+            deadline = None if timeout == WAIT_INFINITELY else time.perf_counter() + timeout
+            while self._available() < n:
+                if self.timing.samp_quant_samp_mode == nidaqmx.constants.AcquisitionType.FINITE and \
+                        self._acquired() >= self.timing.samp_quant_samp_per_chan:
+                    raise nidaqmx.errors.DaqReadError("Finite acquisition has no more samples.", TIMEOUT_ERROR, self.name)
+                wait = (n - self._available()) / self.timing.samp_clk_rate
+                if deadline is not None:
+                    left = deadline - time.perf_counter()
+                    if left <= 0:
+                        raise nidaqmx.errors.DaqReadError("Wait for samples timed out.", TIMEOUT_ERROR, self.name)
+                    wait = min(wait, left)
+                # Like the driver, stopping the task from another thread aborts a waiting read.
+                if self._stopped.wait(wait):
+                    raise nidaqmx.errors.DaqReadError("The task was stopped while the read waited for samples.",
+                                                      ABORTED_ERROR, self.name)
+            if self.in_stream.input_buf_size and self._available() > self.in_stream.input_buf_size:
+                raise nidaqmx.errors.DaqReadError(
+                    "Attempted to read samples that are no longer available. The buffer was overwritten.",
+                    OVERWRITE_ERROR, self.name)
+
+        tape = self._tape
+        length = tape.shape[1]
+        done = 0
+        while done < n:
+            start = (self.read_pos + done) % length
+            count = min(n - done, length - start)
+            data[:, done:done + count] = tape[:, start:start + count]
+            done += count
+        self.read_pos += n
+        return n
+
+
+class SimulatedReader:
+    """
+    Drop-in for AnalogMultiChannelReader on a SimulatedTask.
+    """
+
+    def __init__(self, task):
+        self._task = task
+
+    def read_many_sample(self, data, number_of_samples_per_channel=READ_ALL_AVAILABLE, timeout=10.0):
+        if number_of_samples_per_channel == READ_ALL_AVAILABLE:
+            number_of_samples_per_channel = self._task._available()
+        if data.shape != (self._task.number_of_channels, number_of_samples_per_channel):
+            raise nidaqmx.errors.DaqError(
+                f"Read buffer of shape {data.shape} does not match "
+                f"({self._task.number_of_channels}, {number_of_samples_per_channel}).", -200229, self._task.name)
+        return self._task._read(data, number_of_samples_per_channel, timeout)
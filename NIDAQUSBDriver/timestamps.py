@@ -0,0 +1,180 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+
+class BlockTime(namedtuple('BlockTime', ['first_sample', 'samples', 'start_time', 'sample_period', 'samples_lost', 'restarted'])):
+    """
+    When one block was sampled.
+
+    `first_sample` numbers the block's first sample since the clock was created,
+    counting lost samples, so it is continuous across the whole acquisition.
+    `start_time` is the time.time() at which that sample was taken and
+    `sample_period` the drift-corrected spacing of the block's samples, in
+    seconds. `samples_lost` is the gap between this block and the previous
+    one and `restarted` is True when the task was restarted in between.
+    """
+
+    __slots__ = ()
+
+    def times(self, out=None):
+        """
+        Return the time.time() of every sample in the block, computed in one vectorized step.
+
+        Args:
+            out (np.ndarray, optional): Float64 array of length `samples` that receives the times.
+        """
+        if out is None:
+            out = np.empty(self.samples)
+        np.multiply(np.arange(self.samples), self.sample_period, out=out)
+        out += self.start_time
+        return out
+
+
+class SampleClock:
+    """
+    Maps the sample numbers of one module onto host time, correcting for clock drift.
+
+    Every read gives an observation: the number of the newest sample acquired
+    and the host time.perf_counter() when the read returned. Of the reads in
+    each 1/window of `fit_seconds` the least delayed one is kept, and a
+    least-squares fit over the kept observations gives the sample period as
+    measured by the host. The fitted line is then lowered onto the least
+    delayed observation, because a read can only return after its samples
+    exist. Per block this costs a few scalar operations; the fit itself runs
+    `window` times per `fit_seconds`. Blocks are placed with the hardware read
+    position when the task reports one, so skipped and lost samples show up
+    as gaps. After a restart the sample counter starts again from zero, and
+    the new segment is placed by host time instead.
+    """
+
+    def __init__(self, sampling_freq, window=64, fit_seconds=60.0, max_drift_ppm=1000.0):
+        """
+        Args:
+            sampling_freq (float): Nominal sample rate in Hz.
+            window (int): Number of observations the drift fit uses.
+            fit_seconds (float): Acquisition time the drift fit spans.
+            max_drift_ppm (float): Largest deviation from the nominal period the fit may report.
+        """
+        if window < 3:
+            raise ValueError("The drift fit needs a window of at least 3 observations.")
+        self.window = window
+        self.fit_seconds = fit_seconds
+        self.max_drift_ppm = max_drift_ppm
+        self._x = np.zeros(window)
+        self._y = np.zeros(window)
+        self.set_rate(sampling_freq)
+
+    def set_rate(self, sampling_freq):
+        """
+        Change the nominal rate. Sample numbering and the drift estimate start over.
+        """
+        self.sampling_freq = sampling_freq
+        self.nominal_period = 1.0 / sampling_freq
+        self._spacing = max(self.fit_seconds * sampling_freq / self.window, 1)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all history and start numbering samples from zero again.
+        """
+        # time.time() - time.perf_counter(), so fitted host times can be reported as wall-clock times.
+        self.wall_offset = time.time() - time.perf_counter()
+        self.sample_period = self.nominal_period
+        self.next_sample = 0
+        self.samples_lost = 0
+        self.gaps = 0
+        self.restarts = 0
+        self.blocks = 0
+        self._offset = None
+        self._base = 0
+        self._segment_next = 0
+        self._count = 0
+        self._candidate = None
+        self._restart_pending = True
+
+    def restart(self):
+        """
+        Note that the task was restarted, so its sample counter begins again at zero.
+        """
+        self._restart_pending = True
+
+    @property
+    def drift_ppm(self):
+        """
+        Deviation of the measured sample period from the nominal one, in parts per million.
+        """
+        return (self.sample_period / self.nominal_period - 1.0) * 1e6
+
+    def stamp(self, samples, host_time=None, read_position=None, acquired=None):
+        """
+        Timestamp a block that has just been read.
+
+        Args:
+            samples (int): Samples per channel in the block.
+            host_time (float, optional): time.perf_counter() when the read returned. Defaults to now.
+            read_position (int, optional): Task's sample count read so far, after this block
+                (in_stream.curr_read_pos). Without it blocks are assumed to be contiguous.
+            acquired (int, optional): Task's sample count acquired so far
+                (in_stream.total_samp_per_chan_acquired). Ties the host time to the newest sample
+                rather than to the end of the block, which matters when reads lag behind.
+
+        Returns:
+            BlockTime: Start time, sample period and gap information for the block.
+        """
+        if host_time is None:
+            host_time = time.perf_counter()
+        segment_end = read_position if read_position is not None else self._segment_next + samples
+        segment_newest = acquired if acquired is not None and acquired >= segment_end else segment_end
+        restarted = self._restart_pending or segment_end - samples < self._segment_next
+
+        if restarted:
+            self._restart_pending = False
+            if self._offset is None:
+                # The first block numbers samples like the task does.
+                self._base = self.next_sample
+            else:
+                self.restarts += 1
+                # Place the new segment where host time says its newest sample lies.
+                estimate = int(round((host_time - self._offset) / self.sample_period)) - (segment_newest - 1)
+                self._base = max(estimate, self.next_sample - (segment_end - samples))
+            self._count = 0
+            self._candidate = None
+
+        first = self._base + segment_end - samples
+        lost = first - self.next_sample if self.blocks else 0
+        if lost > 0:
+            self.samples_lost += lost
+            self.gaps += 1
+        self.next_sample = first + samples
+        self._segment_next = segment_end
+        self.blocks += 1
+
+        self._observe(self._base + segment_newest - 1, host_time)
+        start = self._offset + self.sample_period * first + self.wall_offset
+        return BlockTime(first, samples, start, self.sample_period, lost, restarted and self.blocks > 1)
+
+    def _observe(self, sample, host_time):
+        residual = host_time - self.sample_period * sample
+        if self._candidate is None or residual < self._candidate[2]:
+            self._candidate = (sample, host_time, residual)
+        if self._count and sample - self._x[(self._count - 1) % self.window] < self._spacing:
+            # A read returns no earlier than its newest sample exists: keep the least delayed one.
+            self._offset = min(self._offset, residual)
+            return
+
+        slot = self._count % self.window
+        self._x[slot], self._y[slot], _ = self._candidate
+        self._candidate = None
+        self._count += 1
+        n = min(self._count, self.window)
+        x = self._x[:n]
+        y = self._y[:n]
+        # Until an eighth of the window is filled the nominal period is more reliable than the fit.
+        if n >= max(3, self.window // 8):
+            dx = x - x.mean()
+            period = np.dot(dx, y - y.mean()) / np.dot(dx, dx)
+            limit = self.nominal_period * self.max_drift_ppm * 1e-6
+            self.sample_period = min(max(period, self.nominal_period - limit), self.nominal_period + limit)
+        self._offset = float(np.min(y - self.sample_period * x))
@@ -0,0 +1,128 @@
+"""
+Read-path benchmarks for NIDAQVoltage and NIDAQThermo on the simulated backend.
+
+Measures per-read latency, throughput (samples/s per channel), allocations and
+jitter across sample rates and read sizes. No NI hardware is needed.
+Allocations are reported as the peak during the measured reads, and as the
+bytes still held afterwards per read, which is 0 when the read path
+allocates nothing that outlives a read.
+
+    python benchmarks/bench_read.py
+    python benchmarks/bench_read.py --json results.json
+    python benchmarks/bench_read.py --baseline results.json --tolerance 0.25
+
+With --baseline the run exits non-zero if any case's mean or p99 latency
+regressed by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from NIDAQUSBDriver.NIDAQClient import NIDAQThermo, NIDAQVoltage  # noqa: E402
+from NIDAQUSBDriver.simulated import SimulatedBackend  # noqa: E402
+
+
+CLIENTS = {'voltage': NIDAQVoltage, 'thermo': NIDAQThermo}
+
+
+def bench_case(cls, rate, size, reads, realtime):
+    backend = SimulatedBackend(noise=0.01, realtime=realtime)
+    daq = cls(position=1, sampling_freq_in=rate, buffer_in_size=max(size * 10, rate), samples_per_read=size, backend=backend)
+    buffer = daq.buffer_in
+    out = np.empty(daq.chans_in)
+    daq.start()
+    try:
+        for _ in range(min(reads, 20)):
+            daq.read_samples(buffer, out)
+
+        latencies = np.empty(reads)
+        for i in range(reads):
+            start = time.perf_counter()
+            daq.read_samples(buffer, out)
+            latencies[i] = time.perf_counter() - start
+
+        alloc_reads = min(reads, 200)
+        tracemalloc.start()
+        # One traced read first, so NumPy's one-off internal caches are not counted against the reads.
+        daq.read_samples(buffer, out)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(alloc_reads):
+            daq.read_samples(buffer, out)
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        daq.stop()
+        daq.close()
+
+    return {
+        'channels': daq.chans_in,
+        'latency_mean_us': float(latencies.mean() * 1e6),
+        'latency_p50_us': float(np.percentile(latencies, 50) * 1e6),
+        'latency_p99_us': float(np.percentile(latencies, 99) * 1e6),
+        'latency_max_us': float(latencies.max() * 1e6),
+        'jitter_us': float(latencies.std() * 1e6),
+        'throughput_samples_per_s_per_chan': float(reads * size / latencies.sum()),
+        'retained_bytes_per_read': (after - before) / alloc_reads,
+        'peak_alloc_bytes': peak - before,
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ('latency_mean_us', 'latency_p99_us'):
+            limit = baseline[key][metric] * (1 + tolerance)
+            if result[metric] > limit:
+                regressions.append(f"{key} {metric}: {result[metric]:.1f} > {limit:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', nargs='+', default=list(CLIENTS), choices=list(CLIENTS))
+    parser.add_argument('--rates', nargs='+', type=int, default=[500, 5000, 50000])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 500, 5000])
+    parser.add_argument('--reads', type=int, default=1000)
+    parser.add_argument('--realtime', action='store_true', help="Pace reads by the simulated sample clock.")
+    parser.add_argument('--json', help="Write the results to this file.")
+    parser.add_argument('--baseline', help="Results file from an earlier run to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<28}{'mean us':>10}{'p99 us':>10}{'jitter us':>11}{'Msamp/s/ch':>12}{'peak B':>10}{'retained B/read':>17}")
+    for name in args.clients:
+        for rate in args.rates:
+            for size in args.sizes:
+                key = f"{name}/{rate}Hz/{size}"
+                result = bench_case(CLIENTS[name], rate, size, args.reads, args.realtime)
+                results[key] = result
+                print(f"{key:<28}{result['latency_mean_us']:>10.1f}{result['latency_p99_us']:>10.1f}"
+                      f"{result['jitter_us']:>11.1f}{result['throughput_samples_per_s_per_chan'] / 1e6:>12.2f}"
+                      f"{result['peak_alloc_bytes']:>10}{result['retained_bytes_per_read']:>17.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
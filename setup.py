@@ -10,6 +10,8 @@ setup(
     author_email='brian.benchoff@span.io',
     url='https://github.com/spanio/NIDAQ-driver',
     packages=find_packages(),
+    # multiprocessing.shared_memory is new in 3.8.
+    python_requires='>=3.8',
     install_requires=[
         'numpy>=1.21.2',  
         'nidaqmx>=0.5.7',  
@@ -18,10 +20,10 @@ setup(
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License', 
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Topic :: Software Development :: Libraries :: Python Modules',
     ],
 )
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run against the checkout, and make the root NIDAQClient.py shim importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
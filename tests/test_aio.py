@@ -0,0 +1,135 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.faults import ErrorPolicy
+from NIDAQUSBDriver.NIDAQClient import NIDAQVoltage
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+def make_module(**kwargs):
+    return NIDAQVoltage(position=1, sampling_freq_in=5000, samples_per_read=250, buffer_in_size=2500,
+                        backend=SimulatedBackend(realtime=True, **kwargs.pop('backend', {})), **kwargs)
+
+
+async def ticks_during(awaitable, period=0.01):
+    # Counts how often the loop got to run something else while `awaitable` was pending.
+    ticks = 0
+    task = asyncio.ensure_future(awaitable)
+    while not task.done():
+        await asyncio.sleep(period)
+        ticks += 1
+    return await task, ticks
+
+
+def test_retry_backoff_does_not_block_the_loop():
+    daq = make_module(backend={'fail_reads': [0, 1]}, error_policy=ErrorPolicy('retry', backoff=0.1))
+
+    async def main():
+        result, ticks = await ticks_during(daq.aread_samples())
+        mode = daq.async_reader.mode
+        daq.async_reader.close()
+        return result, ticks, mode
+
+    result, ticks, mode = asyncio.run(main())
+    assert mode == 'event'
+    assert np.all(np.isfinite(result))
+    assert daq.error_stats.retries == 2
+    # 0.1 + 0.2 s of backoff, during which the loop kept running.
+    assert ticks >= 15
+
+
+def test_cancelled_read_closes_the_task():
+    daq = make_module()
+
+    async def main():
+        read = asyncio.ensure_future(daq.aread_samples())
+        await asyncio.sleep(0.01)
+        read.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await read
+
+    asyncio.run(main())
+    assert daq.task_in.closed
+    assert daq.async_reader.mode is None
+
+
+def test_cancelled_read_can_leave_the_task_open():
+    daq = make_module()
+
+    async def main():
+        reader = daq._get_async_reader()
+        read = asyncio.ensure_future(reader.read(close_on_cancel=False))
+        await asyncio.sleep(0.01)
+        read.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await read
+        result = await reader.read()
+        reader.close()
+        return result
+
+    assert asyncio.run(main()).shape == (32,)
+
+
+def test_leaving_a_stream_closes_the_task():
+    daq = make_module()
+
+    async def main():
+        results = []
+        async for data in daq.stream():
+            results.append(data)
+            if len(results) == 2:
+                break
+        return results
+
+    assert len(asyncio.run(main())) == 2
+    assert daq.task_in.closed
+    assert daq.async_reader.mode is None
+
+
+def test_stream_can_leave_the_task_open():
+    daq = make_module()
+
+    async def main():
+        stream = daq.stream(close_on_exit=False)
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(main())
+    assert not daq.task_in.closed
+    daq.close()
+
+
+def test_skipped_blocks_are_read_under_the_error_policy():
+    backend = SimulatedBackend(realtime=True)
+    daq = NIDAQVoltage(position=1, sampling_freq_in=5000, samples_per_read=250, buffer_in_size=2500, backend=backend)
+
+    async def main():
+        await daq.aread_samples()
+        await asyncio.sleep(0.2)
+        # The first of the stale blocks fails and is masked like any other read.
+        backend.inject_error()
+        result = await daq.aread_samples(skip_backlog=True)
+        daq.async_reader.close()
+        return result
+
+    result = asyncio.run(main())
+    assert np.all(np.isfinite(result))
+    assert daq.async_reader.skipped_blocks >= 2
+    assert daq.error_stats.errors == 1 and daq.error_stats.masked_reads == 1
+
+
+def test_closing_the_module_releases_the_async_reader():
+    daq = make_module(error_policy=ErrorPolicy('retry'))
+
+    async def main():
+        await daq.aread_samples()
+        return daq.async_reader._executor
+
+    executor = asyncio.run(main())
+    assert executor is not None
+    daq.close()
+    assert daq.task_in.closed
+    assert daq.async_reader.mode is None and daq.async_reader._executor is None
+    assert daq.samples_event is None
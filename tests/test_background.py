@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.background import RingBuffer
+from NIDAQUSBDriver.faults import ErrorPolicy
+from NIDAQUSBDriver.NIDAQClient import NIDAQVoltage
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+def test_ring_wraps_and_returns_oldest_first():
+    ring = RingBuffer(2, 10)
+    stream = np.arange(2 * 27, dtype=float).reshape(2, 27)
+    for start in range(0, 27, 4):
+        ring.write(stream[:, start:start + 4])
+    assert ring.count == 27
+    np.testing.assert_array_equal(ring.window(10), stream[:, -10:])
+    np.testing.assert_array_equal(ring.latest(), stream[:, -1])
+
+
+def test_ring_keeps_the_tail_of_an_oversized_block():
+    ring = RingBuffer(1, 5)
+    ring.write(np.arange(12, dtype=float)[None, :])
+    np.testing.assert_array_equal(ring.window(5), [[7, 8, 9, 10, 11]])
+
+
+def test_ring_window_limits():
+    ring = RingBuffer(1, 5)
+    ring.write(np.zeros((1, 3)))
+    with pytest.raises(ValueError):
+        ring.window(4)
+    with pytest.raises(ValueError):
+        ring.window(6)
+
+
+def make_module(**backend):
+    return NIDAQVoltage(position=1, sampling_freq_in=2000, samples_per_read=100, buffer_in_size=1000,
+                        backend=SimulatedBackend(realtime=True, **backend))
+
+
+@pytest.mark.parametrize('use_events', [True, False])
+def test_background_fills_ring(use_events):
+    daq = make_module()
+    background = daq.start_background(use_events=use_events)
+    time.sleep(0.3)
+    daq.stop_background()
+    assert background.mode is None
+    assert background.samples_acquired >= 300
+    assert background.error_count == 0
+    window = background.window(100)
+    assert window.shape == (daq.chans_in, 100)
+    assert np.all(np.abs(window) <= 1.0)
+
+
+def test_background_backs_off_on_persistent_errors():
+    daq = make_module(error_rate=1.0)
+    daq.error_policy = ErrorPolicy('mask', backoff=0.05, max_backoff=0.2)
+    background = daq.start_background(use_events=False)
+    time.sleep(0.5)
+    daq.stop_background()
+    # 0.05 + 0.1 + 0.2 + 0.2 ... is a handful of attempts, not thousands.
+    assert 1 <= background.error_count <= 6
+    assert background.samples_acquired == 0
+
+
+def test_background_stops_when_the_policy_raises():
+    daq = make_module(error_rate=1.0)
+    daq.error_policy = ErrorPolicy('raise')
+    background = daq.start_background(use_events=False)
+    time.sleep(0.2)
+    assert not background.running
+    assert background.last_error is not None
+    daq.stop_background()
+
+
+def test_background_restarts_finite_acquisitions():
+    daq = NIDAQVoltage(position=1, sampling_freq_in=2000, samples_per_read=300, buffer_in_size=1000,
+                       acquisition_type='FINITE', backend=SimulatedBackend(realtime=True))
+    background = daq.start_background()
+    time.sleep(1.2)
+    daq.stop_background()
+    assert background.mode is None
+    # 1000-sample acquisitions of three blocks each, every 0.5 s.
+    assert background.samples_acquired >= 1800
+    assert background.error_count == 0
+
+
+def test_reader_thread_waits_for_blocks_longer_than_a_second():
+    # 1.2 s blocks: a fixed 1 s read timeout would drop every one of them.
+    daq = NIDAQVoltage(position=1, sampling_freq_in=100, samples_per_read=120, buffer_in_size=1200,
+                       backend=SimulatedBackend(realtime=True))
+    background = daq.start_background(use_events=False)
+    assert background.read_timeout > 1.2
+    time.sleep(1.5)
+    started = time.perf_counter()
+    daq.stop_background()
+    # Stopping the task aborts the read waiting for the second block.
+    assert time.perf_counter() - started < 0.5
+    assert background.samples_acquired == 120
+    assert background.error_count == 0
+    assert daq.error_stats.errors == 0
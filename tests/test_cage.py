@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.cage import NIDAQCage
+from NIDAQUSBDriver.NIDAQClient import NIDAQThermo, NIDAQVoltage
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+def make_cage(**kwargs):
+    backend = SimulatedBackend(waveform='dc', offset=21.0)
+    modules = [
+        NIDAQThermo(position=3, backend=backend),
+        NIDAQVoltage(position=1, backend=backend),
+        NIDAQVoltage(position=2, backend=backend),
+    ]
+    return NIDAQCage(modules, **kwargs)
+
+
+def test_cage_slaves_modules_to_the_master():
+    cage = make_cage()
+    try:
+        assert [module.position for module in cage.modules] == [1, 2, 3]
+        assert cage.synchronize() == {1: True, 2: True, 3: True}
+        master = cage.master.task_in
+        for module in cage.modules[1:]:
+            assert module.task_in.triggers.start_trigger.source == master.triggers.start_trigger.term
+        for module in cage.modules[1:]:
+            assert module.task_in.timing.samp_clk_src == master.timing.samp_clk_term
+    finally:
+        cage.close()
+
+
+def test_cage_reads_every_module():
+    cage = make_cage()
+    try:
+        cage.start()
+        frame = cage.read()
+        assert frame.timestamp == cage.master.last_block_time.start_time
+        assert sorted(frame.data) == [1, 2, 3]
+        np.testing.assert_allclose(frame.data[1], 21.0)
+        assert frame.data[2].shape == (32,)
+        np.testing.assert_array_equal(frame.data[3], 21.0)
+        assert cage.get_channel_names()[3][0] == 'Thermo Channel 1'
+        cage.stop()
+        assert not any(module.running for module in cage.modules)
+    finally:
+        cage.close()
+
+
+def test_cage_rejects_modules_of_another_chassis():
+    backend = SimulatedBackend()
+    modules = [NIDAQVoltage(position=1, backend=backend), NIDAQVoltage(position=2, device='cDAQ2Mod2', backend=backend)]
+    with pytest.raises(ValueError, match='cDAQ2Mod2'):
+        NIDAQCage(modules)
+    NIDAQCage(modules, chassis=None, synchronize=False).close()
+
+
+def test_cage_rejects_duplicate_positions():
+    backend = SimulatedBackend()
+    with pytest.raises(ValueError):
+        NIDAQCage([NIDAQVoltage(position=1, backend=backend), NIDAQVoltage(position=1, backend=backend)])
+
+
+def test_cage_rejects_modules_of_different_timing():
+    backend = SimulatedBackend()
+    with pytest.raises(ValueError, match='sampling rate'):
+        NIDAQCage([NIDAQVoltage(position=1, backend=backend),
+                   NIDAQVoltage(position=2, sampling_freq_in=1000, buffer_in_size=10000, backend=backend)])
+    with pytest.raises(ValueError, match='read size'):
+        NIDAQCage([NIDAQVoltage(position=1, backend=backend),
+                   NIDAQVoltage(position=2, samples_per_read=250, backend=backend)])
+
+
+def test_cage_closes_every_module_when_one_fails(monkeypatch):
+    cage = make_cage()
+    first = cage.modules[0]
+
+    def fail():
+        raise RuntimeError("close failed")
+
+    monkeypatch.setattr(first, 'close', fail)
+    with pytest.raises(RuntimeError, match='close failed'):
+        cage.close()
+    assert all(module.task_in.closed for module in cage.modules[1:])
@@ -0,0 +1,95 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver._lazy import nidaqmx
+from NIDAQUSBDriver.channelmap import SCRATCH_WIDTHS, ChannelMap, MappedChannel, linear_scale
+from NIDAQUSBDriver.NIDAQClient import NIDAQVoltage
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+SCALES = {0: (0.1, 1.0, 0.01), 1: linear_scale(2.0, 1.0), 3: (3.0,), 5: linear_scale(-1.0), 6: (0.5, 0.5, 0.5, 0.5)}
+
+
+def scaled_map():
+    return ChannelMap([MappedChannel(i, scale=SCALES.get(i)) for i in range(8)])
+
+
+def test_convert_applies_each_channel_scale():
+    block = np.random.default_rng(5).normal(size=(8, 300))
+    expected = block.copy()
+    for row, scale in SCALES.items():
+        expected[row] = np.polynomial.polynomial.polyval(block[row], scale)
+    channel_map = scaled_map()
+    np.testing.assert_allclose(channel_map.convert(block), expected)
+    # Other block widths, and in place.
+    for n in (1, 300, 17):
+        converted = block[:, :n].copy()
+        channel_map.convert(converted, out=converted)
+        np.testing.assert_allclose(converted, expected[:, :n])
+
+
+def test_scratch_is_kept_for_a_few_widths_only():
+    channel_map = scaled_map()
+    block = np.random.default_rng(6).normal(size=(8, 50))
+    expected = channel_map.convert(block)
+    for n in range(1, 51):
+        np.testing.assert_allclose(channel_map.convert(block[:, :n]), expected[:, :n])
+        assert len(channel_map._scratch) <= SCRATCH_WIDTHS
+
+def test_convert_in_place_does_not_allocate():
+    channel_map = scaled_map()
+    block = np.ones((8, 500))
+    channel_map.convert(block, out=block)
+    tracemalloc.start()
+    for _ in range(20):
+        block.fill(1.0)
+        channel_map.convert(block, out=block)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # A block is 32 kB; copies of the scaled rows would show up here.
+    assert peak < 2048
+
+
+def test_indices_beyond_the_module_are_rejected():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend())
+    with pytest.raises(ValueError, match='40'):
+        daq.set_channel_map({0: 'a', 40: 'x'})
+    assert daq.channel_map is None and daq.chans_in == 32
+    with pytest.raises(ValueError, match='32'):
+        NIDAQVoltage(position=1, channel_map={32: 'x'}, backend=SimulatedBackend())
+    assert NIDAQVoltage(position=1, channel_map={31: 'x'}, backend=SimulatedBackend()).chans_in == 1
+
+
+def test_failed_rebuild_keeps_the_old_channel_map(monkeypatch):
+    backend = SimulatedBackend(waveform='dc', offset=1.0)
+    daq = NIDAQVoltage(position=1, channel_map={0: 'a', 1: 'b'}, backend=backend)
+    daq.start()
+    old_task = daq.task_in
+
+    def fail(task):
+        raise nidaqmx.errors.DaqError("Physical channel does not exist.", -200170)
+
+    monkeypatch.setattr(backend, 'create_reader', fail)
+    with pytest.raises(nidaqmx.errors.DaqError):
+        daq.set_channel_map({0: 'a', 1: 'b', 2: 'c', 3: 'd'})
+    assert daq.task_in is old_task
+    assert daq.chans_in == 2 and daq.get_channel_names() == ['a', 'b']
+    assert daq.buffer_in.shape[0] == 2
+    # The old task acquires again, as it did before the change.
+    assert daq.running and old_task.running
+    np.testing.assert_allclose(daq.read_samples(), [1.0, 1.0])
+
+
+def test_failed_rebuild_of_a_stopped_module_leaves_it_stopped(monkeypatch):
+    backend = SimulatedBackend()
+    daq = NIDAQVoltage(position=1, channel_map={0: 'a'}, backend=backend)
+
+    def fail(task):
+        raise nidaqmx.errors.DaqError("Physical channel does not exist.", -200170)
+
+    monkeypatch.setattr(backend, 'create_reader', fail)
+    with pytest.raises(nidaqmx.errors.DaqError):
+        daq.set_channel_map({0: 'a', 1: 'b'})
+    assert not daq.running and not daq.task_in.running
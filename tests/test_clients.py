@@ -0,0 +1,213 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import NIDAQClient as root_clients
+from NIDAQUSBDriver._lazy import LazyModule, nidaqmx
+from NIDAQUSBDriver.channelmap import MappedChannel, linear_scale
+from NIDAQUSBDriver.faults import ErrorPolicy
+from NIDAQUSBDriver.NIDAQClient import NIDAQThermo, NIDAQVoltage
+from NIDAQUSBDriver.simulated import SimulatedBackend
+from NIDAQUSBDriver.thermocouples import emf
+
+
+def test_voltage_reads_rms_of_every_channel():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend())
+    daq.start()
+    result = daq.read_samples()
+    assert result.shape == (32,)
+    # Ten whole periods of a unit sine.
+    np.testing.assert_allclose(result, np.sqrt(0.5), atol=1e-4)
+    assert daq.last_read_valid
+    assert daq.last_block_time.samples == 500
+
+
+def test_thermo_defaults():
+    daq = NIDAQThermo(position=2, backend=SimulatedBackend(waveform='dc', offset=21.5))
+    assert daq.get_channel_names() == [f"Thermo Channel {i + 1}" for i in range(8)]
+    np.testing.assert_array_equal(daq.read_samples(), 21.5)
+
+
+def test_read_into_caller_buffers_does_not_allocate():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend())
+    daq.start()
+    buffer = np.zeros((daq.chans_in, daq.samples_per_read))
+    out = np.empty(daq.chans_in)
+    daq.read_samples(buffer, out=out)
+    tracemalloc.start()
+    for _ in range(50):
+        daq.read_samples(buffer, out=out)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Retained bytes do not grow with the number of reads.
+    assert retained < 50 * 1024
+
+
+def test_mask_policy_returns_nan():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend(fail_reads=[0]))
+    assert np.all(np.isnan(daq.read_samples()))
+    assert not daq.last_read_valid
+    assert daq.error_stats.masked_reads == 1
+    assert np.all(np.isfinite(daq.read_samples()))
+
+
+def test_read_errors_reach_stderr_without_logging_configuration():
+    code = ("from NIDAQUSBDriver.NIDAQClient import NIDAQVoltage; "
+            "from NIDAQUSBDriver.simulated import SimulatedBackend; "
+            "NIDAQVoltage(position=1, backend=SimulatedBackend(fail_reads=[0])).read_samples()")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    stderr = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True).stderr
+    assert 'Error occurred on cDAQ1Mod1' in stderr
+
+def test_retry_policy_recovers():
+    policy = ErrorPolicy('retry', retries=3, backoff=0.001)
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend(fail_reads=[0, 1]), error_policy=policy)
+    assert np.all(np.isfinite(daq.read_samples()))
+    assert daq.error_stats.retries == 2
+    assert daq.error_stats.recoveries == 1
+    assert daq.error_stats.last_recovery_seconds is not None
+
+
+def test_raise_policy_propagates():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend(fail_reads=[0]), error_policy=ErrorPolicy('raise'))
+    with pytest.raises(nidaqmx.errors.DaqError):
+        daq.read_samples()
+
+
+def test_channel_map_acquires_and_scales_only_mapped_channels():
+    channel_map = [MappedChannel(2, 'Pressure', 'bar', scale=linear_scale(2.0, 1.0)), MappedChannel(5, 'Flow')]
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend(waveform='dc', offset=0.5), channel_map=channel_map)
+    assert daq.task_in.number_of_channels == 2
+    assert daq.get_channel_names() == ['Pressure', 'Flow']
+    np.testing.assert_allclose(daq.read_samples(), [2.0, 0.5])
+    daq.set_channel_map(None)
+    assert daq.chans_in == 32 and daq.read_samples().shape == (32,)
+
+
+def test_channel_map_is_refused_while_features_run():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend())
+    daq.start_rolling_stats()
+    with pytest.raises(RuntimeError, match='rolling statistics'):
+        daq.set_channel_map({0: 'a'})
+    with pytest.raises(RuntimeError, match='rolling statistics'):
+        daq.set_sampling_rate(1000)
+
+
+def test_raw_thermocouples_with_built_in_cold_junction():
+    def signal(t, chans):
+        rows = np.full((chans, t.size), emf('K', 100.0) - emf('K', 23.0))
+        rows[-1] = 23.0
+        return rows
+
+    daq = NIDAQThermo(position=2, thermocouple_type='K', raw_voltage=True, cjc_source='BUILT_IN',
+                      backend=SimulatedBackend(waveform=signal))
+    assert daq.chans_in == 9 and daq.get_channel_names()[-1] == 'CJC'
+    np.testing.assert_allclose(daq.read_samples(), [100.0] * 8 + [23.0], atol=0.01)
+    with pytest.raises(ValueError):
+        daq.set_thermocouple_type(['K', 'J'])
+
+
+def test_raw_type_b_thermocouples_at_room_temperature():
+    daq = NIDAQThermo(position=2, thermocouple_type='B', raw_voltage=True, cjc_temperature=25.0,
+                      backend=SimulatedBackend(waveform='dc', offset=emf('B', 800.0) - emf('B', 25.0)))
+    np.testing.assert_allclose(daq.read_samples(), 800.0, atol=0.01)
+
+
+def test_finite_acquisition_restarts_when_exhausted():
+    daq = NIDAQVoltage(position=1, sampling_freq_in=5000, buffer_in_size=1000, samples_per_read=300,
+                       acquisition_type='FINITE', backend=SimulatedBackend(realtime=True))
+    daq.start()
+    for _ in range(5):
+        daq.read_samples()
+    assert daq.last_reconfigure_kind == 'warm_restart'
+    assert daq.error_stats.errors == 0
+
+
+def test_root_client_reads_any_size_without_resizing_the_task():
+    daq = root_clients.NIDAQVoltage(1, 'cDAQ1Mod1', sampling_freq_in=100000,
+                                    backend=SimulatedBackend(realtime=True))
+    daq.start()
+    positions = []
+    for _ in range(8):
+        assert daq.read_samples(3000).shape == (32,)
+        positions.append(daq.task_in.in_stream.curr_read_pos)
+    assert daq.buffer_in_size_cfg == 20000
+    # The last partial block of the 20000-sample acquisition is read before it restarts.
+    assert positions == [3000, 6000, 9000, 12000, 15000, 18000, 20000, 3000]
+
+
+def test_root_client_keeps_short_finite_acquisitions(recwarn):
+    daq = root_clients.NIDAQVoltage(1, 'cDAQ1Mod1', buffer_in_size=500, backend=SimulatedBackend())
+    assert daq.buffer_in_size == 500
+    daq.start()
+    for _ in range(3):
+        assert np.all(np.isfinite(daq.read_samples()))
+    # A FINITE buffer is the acquisition length, not a ring that can overrun.
+    root_clients.NIDAQVoltage(1, 'cDAQ1Mod1', sampling_freq_in=10000, buffer_in_size=1200, backend=SimulatedBackend())
+    assert not [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
+    with pytest.raises(ValueError, match='two reads'):
+        daq.set_acquisition_type('CONTINUOUS')
+    assert not daq.continuous
+
+def test_async_reads_in_event_mode():
+    daq = NIDAQVoltage(position=1, sampling_freq_in=5000, samples_per_read=250, buffer_in_size=2500,
+                       backend=SimulatedBackend(realtime=True))
+
+    async def read_three():
+        results = [await asyncio.wait_for(daq.aread_samples(), 2.0) for _ in range(3)]
+        assert daq.async_reader.mode == 'event'
+        with pytest.raises(RuntimeError, match='asynchronous reads'):
+            daq.set_channel_map({0: 'a'})
+        daq.async_reader.close()
+        return results
+
+    results = asyncio.run(read_three())
+    assert all(result.shape == (32,) for result in results)
+
+
+def test_read_policy_resizes_and_recommits_a_running_task():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend())
+    daq.start()
+    modes = []
+    daq.task_in.control = modes.append
+    sizes = daq.set_read_policy(latency_budget=0.02)
+    assert modes == [nidaqmx.constants.TaskMode.TASK_COMMIT]
+    assert daq.running and daq.last_reconfigure_kind == 'buffer_sizes'
+    assert daq.samples_per_read == sizes.samples_per_read == 10
+    assert daq.task_in.timing.samp_quant_samp_per_chan == daq.task_in.in_stream.input_buf_size == sizes.input_buf_size
+    assert daq.read_samples().shape == (32,)
+    assert daq.last_block_time.samples == 10
+
+
+def test_read_policy_is_refused_under_rolling_statistics():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend())
+    daq.start_rolling_stats(60)
+    with pytest.raises(RuntimeError, match='rolling statistics'):
+        daq.set_read_policy(latency_budget=0.02)
+    assert daq.samples_per_read == 500
+
+
+def test_importing_the_clients_skips_nidaqmx_and_feature_modules():
+    code = ("import sys, NIDAQUSBDriver.NIDAQClient; "
+            "print(' '.join(m for m in ('nidaqmx', 'asyncio', 'multiprocessing.shared_memory', 'logging.handlers', "
+            "'NIDAQUSBDriver.aio', 'NIDAQUSBDriver.background', 'NIDAQUSBDriver.recorder', 'NIDAQUSBDriver.sharedmem', "
+            "'NIDAQUSBDriver.metrics', 'NIDAQUSBDriver.filters', 'NIDAQUSBDriver.rolling') if m in sys.modules))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    loaded = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert loaded.strip() == ''
+
+
+def test_lazy_module_raises_attribute_error_for_missing_names():
+    missing = LazyModule('no_such_driver_module')
+    assert not hasattr(missing, 'errors')
+    assert getattr(missing, 'errors', None) is None
+    with pytest.raises(AttributeError) as info:
+        missing.errors
+    assert isinstance(info.value.__cause__, ModuleNotFoundError)
+    assert not hasattr(nidaqmx, 'no_such_submodule')
+    assert nidaqmx.errors.DaqError is not None
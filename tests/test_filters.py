@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.filters import (Aggregator, Chain, Decimator, FIRFilter, IIRFilter, MultiResolution, biquad,
+                                    design_lowpass, summarise)
+
+
+def stream(chans=3, n=4000, seed=2):
+    return np.random.default_rng(seed).normal(size=(chans, n))
+
+
+def blocks(data, sizes=(1, 7, 100, 333, 50)):
+    start, i = 0, 0
+    while start < data.shape[1]:
+        size = sizes[i % len(sizes)]
+        yield data[:, start:start + size]
+        start += size
+        i += 1
+
+
+def test_fir_blockwise_matches_whole_stream():
+    data = stream()
+    taps = design_lowpass(0.1, 31)
+    fir = FIRFilter(taps)
+    filtered = np.concatenate([fir.process(block) for block in blocks(data)], axis=1)
+    expected = np.array([np.convolve(row, taps)[:data.shape[1]] for row in data])
+    np.testing.assert_allclose(filtered, expected, atol=1e-12)
+
+
+def test_lowpass_has_unity_dc_gain():
+    assert design_lowpass(0.2).sum() == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        design_lowpass(0.5)
+
+
+def test_decimator_keeps_every_factor_th_filtered_sample():
+    data = stream()
+    decimator = Decimator(5)
+    decimated = np.concatenate([decimator.process(block) for block in blocks(data)], axis=1)
+    full = FIRFilter(decimator.taps)
+    np.testing.assert_allclose(decimated, full.process(data)[:, ::5], atol=1e-12)
+
+
+def test_chained_decimators_compose():
+    chain = Chain(Decimator(4), Decimator(5))
+    out = np.concatenate([chain.process(block) for block in blocks(stream())], axis=1)
+    assert out.shape == (3, 4000 // 20)
+
+
+def test_iir_lowpass_passes_dc_and_keeps_state():
+    sos = [biquad('lowpass', 5.0, 1000.0)]
+    data = np.ones((2, 3000))
+    iir = IIRFilter(sos)
+    out = np.concatenate([iir.process(block) for block in blocks(data)], axis=1)
+    np.testing.assert_allclose(out[:, -1], 1.0, atol=1e-6)
+    whole = IIRFilter(sos).process(data)
+    np.testing.assert_allclose(out, whole, atol=1e-12)
+
+
+def test_aggregator_matches_reshaped_statistics():
+    data = stream(n=3000)
+    aggregator = Aggregator(100)
+    moments = [m for m in (aggregator.process(block) for block in blocks(data)) if m is not None]
+    intervals = data.reshape(3, 30, 100)
+    for statistic, expected in (('mean', intervals.mean(axis=2)), ('rms', np.sqrt((intervals ** 2).mean(axis=2))),
+                                ('min', intervals.min(axis=2)), ('max', intervals.max(axis=2)),
+                                ('peak_to_peak', np.ptp(intervals, axis=2)), ('std', intervals.std(axis=2))):
+        values = np.concatenate([summarise(m, statistic) for m in moments], axis=1)
+        np.testing.assert_allclose(values, expected, atol=1e-12, err_msg=statistic)
+
+
+def test_multi_resolution_builds_coarse_from_fine():
+    data = stream(n=6000)
+    multi = MultiResolution(3, 100.0, periods={'1s': 1.0, '5s': 5.0, '10s': 10.0}, statistics=('mean', 'max'),
+                            capacity=100)
+    for block in blocks(data):
+        multi.write(block)
+    assert multi.count('1s', 'mean') == 60
+    assert multi.count('10s', 'max') == 6
+    np.testing.assert_allclose(multi.window('5s', 'mean'), data.reshape(3, 12, 500).mean(axis=2), atol=1e-12)
+    np.testing.assert_allclose(multi.window('10s', 'max'), data.reshape(3, 6, 1000).max(axis=2))
+
+
+def test_multi_resolution_rejects_unknown_statistics():
+    with pytest.raises(ValueError):
+        MultiResolution(1, 100.0, statistics=('median',))
@@ -0,0 +1,150 @@
+import re
+import time
+import urllib.request
+
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.metrics import PHASES, PROMETHEUS_CONTENT_TYPE, Histogram, MetricsServer, prometheus_text
+from NIDAQUSBDriver.NIDAQClient import NIDAQThermo, NIDAQVoltage
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+METRIC_NAME = r'[a-zA-Z_:][a-zA-Z0-9_:]*'
+LABEL = r'[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*"'
+SAMPLE = re.compile(rf'^({METRIC_NAME})(?:\{{((?:{LABEL})(?:,{LABEL})*)?\}})? (\S+)$')
+
+
+def parse_exposition(text):
+    """
+    Check `text` against the Prometheus text format and return {name: [(labels, value)]}.
+    """
+    assert text.endswith('\n')
+    types = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            assert re.match(rf'^# HELP {METRIC_NAME} \S', line), line
+        elif line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            assert kind in ('counter', 'gauge', 'histogram', 'summary', 'untyped')
+            assert name not in types, f"{name} typed twice"
+            types[name] = kind
+        else:
+            match = SAMPLE.match(line)
+            assert match, line
+            name, labels, value = match.groups()
+            family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in types else name
+            assert family in types, f"{name} has no TYPE"
+            labels = {key: re.sub(r'\\(.)', lambda escape: {'n': '\n'}.get(escape.group(1), escape.group(1)), value)
+                      for key, value in re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\.)*)"', labels or '')}
+            samples.setdefault(name, []).append((labels, float(value)))
+    return types, samples
+
+
+def read_module(**kwargs):
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend(**kwargs))
+    daq.start_metrics()
+    daq.start()
+    return daq
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    assert np.isnan(histogram.quantile(0.5))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.25) == pytest.approx(1.0)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == pytest.approx(4.0)
+    histogram.observe(10.0)
+    # Above the last bound the maximum is the best estimate.
+    assert histogram.quantile(1.0) == 10.0
+    assert histogram.cumulative() == [(1.0, 1), (2.0, 3), (4.0, 4), (float('inf'), 5)]
+
+
+def test_snapshot_counts_reads_and_failures():
+    daq = read_module(fail_reads=[1])
+    for _ in range(3):
+        daq.read_samples()
+    snapshot = daq.metrics.snapshot()
+    assert snapshot['device'] == 'cDAQ1Mod1'
+    assert snapshot['reads'] == 3
+    assert snapshot['masked_reads'] == 1
+    assert snapshot['samples_read'] == 1500
+    assert snapshot['errors'] == 1
+    assert snapshot['errors_by_code'] == {-200000: 1}
+    assert snapshot['input_buf_size'] == 5000
+    assert snapshot['backlog'] is not None and snapshot['max_backlog'] >= snapshot['backlog']
+    assert set(snapshot['phases']) == set(PHASES)
+    for phase in PHASES:
+        assert snapshot['phases'][phase]['count'] == 3
+        assert snapshot['phases'][phase]['buckets'][-1] == (float('inf'), 3)
+
+
+def test_background_reads_are_recorded_including_masked_ones():
+    daq = NIDAQVoltage(position=1, sampling_freq_in=2000, samples_per_read=100, buffer_in_size=1000,
+                       backend=SimulatedBackend(realtime=True, fail_reads=[0, 1]))
+    daq.error_policy.backoff = 0.001
+    daq.start_metrics()
+    background = daq.start_background(use_events=False)
+    time.sleep(0.3)
+    daq.stop_background()
+    snapshot = daq.metrics.snapshot()
+    assert snapshot['masked_reads'] == background.error_count == 2
+    assert snapshot['reads'] == 2 + background.samples_acquired // 100
+
+
+def test_prometheus_text_is_valid_exposition_format():
+    volts = read_module()
+    thermo = NIDAQThermo(position=2, backend=SimulatedBackend())
+    thermo.start_metrics()
+    for _ in range(2):
+        volts.read_samples()
+        thermo.read_samples()
+    types, samples = parse_exposition(prometheus_text(volts.metrics, thermo.metrics))
+    assert types['nidaq_reads_total'] == 'counter'
+    assert types['nidaq_read_phase_seconds'] == 'histogram'
+    assert sorted(labels['device'] for labels, _ in samples['nidaq_reads_total']) == ['cDAQ1Mod1', 'cDAQ1Mod2']
+    assert all(value == 2 for _, value in samples['nidaq_reads_total'])
+    # Histogram buckets are cumulative, end at +Inf and agree with _count.
+    for labels, count in samples['nidaq_read_phase_seconds_count']:
+        buckets = [(entry['le'], value) for entry, value in samples['nidaq_read_phase_seconds_bucket']
+                   if entry['device'] == labels['device'] and entry['phase'] == labels['phase']]
+        values = [value for _, value in buckets]
+        assert values == sorted(values)
+        assert buckets[-1] == ('+Inf', count)
+
+
+def test_prometheus_text_parses_with_the_reference_parser():
+    parser = pytest.importorskip('prometheus_client.parser')
+    daq = read_module()
+    daq.read_samples()
+    families = {family.name: family for family in parser.text_string_to_metric_families(prometheus_text(daq.metrics))}
+    assert families['nidaq_read_phase_seconds'].type == 'histogram'
+
+
+def test_prometheus_text_escapes_label_values():
+    device = 'Rack "A"\\Mod1\nspare'
+    daq = NIDAQVoltage(position=1, device=device, backend=SimulatedBackend())
+    daq.start_metrics()
+    daq.read_samples()
+    text = prometheus_text(daq.metrics)
+    assert 'device="Rack \\"A\\"\\\\Mod1\\nspare"' in text
+    _, samples = parse_exposition(text)
+    assert samples['nidaq_reads_total'] == [({'device': device}, 1.0)]
+
+def test_metrics_server_serves_the_exposition():
+    daq = read_module()
+    daq.read_samples()
+    server = MetricsServer([daq.metrics], port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            assert response.headers['Content-Type'] == PROMETHEUS_CONTENT_TYPE
+            body = response.read().decode('utf-8')
+        types, samples = parse_exposition(body)
+        assert samples['nidaq_reads_total'] == [({'device': 'cDAQ1Mod1'}, 1.0)]
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/other", timeout=5)
+    finally:
+        server.close()
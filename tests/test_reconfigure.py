@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver._lazy import nidaqmx
+from NIDAQUSBDriver.NIDAQClient import NIDAQThermo, NIDAQVoltage
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+def running_module():
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend(waveform='dc', offset=0.5))
+    daq.start()
+    return daq
+
+
+def test_channel_settings_change_on_the_running_task():
+    daq = running_module()
+    task = daq.task_in
+    daq.set_terminal_config('DIFF')
+    assert daq.task_in is task and task.running
+    assert task.ai_channels.all.ai_term_cfg == nidaqmx.constants.TerminalConfiguration.DIFF
+    assert daq.last_reconfigure_kind == 'channel_settings'
+    assert daq.last_reconfigure_latency >= 0
+    daq.set_channel_settings(min_val=-5.0, max_val=5.0)
+    assert task.ai_channels.all.ai_min == -5.0
+    np.testing.assert_allclose(daq.read_samples(), 0.5)
+
+
+def test_unsupported_setting_leaves_the_task_running():
+    daq = running_module()
+    with pytest.raises(ValueError):
+        daq.set_channel_settings(units='VOLTS')
+    assert daq.task_in.running
+    np.testing.assert_allclose(daq.read_samples(), 0.5)
+
+
+def test_thermocouple_type_changes_on_the_existing_task():
+    daq = NIDAQThermo(position=2, backend=SimulatedBackend())
+    task = daq.task_in
+    daq.set_thermocouple_type('K')
+    assert daq.task_in is task
+    assert daq.thermocouple_type == task.ai_channels.all.ai_thrmcpl_type == nidaqmx.constants.ThermocoupleType.K
+
+
+def test_timing_changes_on_the_existing_task():
+    daq = running_module()
+    task = daq.task_in
+    daq.set_sampling_rate(2000)
+    assert daq.task_in is task and task.running
+    assert task.timing.samp_clk_rate == 2000 and daq.sampling_freq_in == 2000
+    assert daq.last_reconfigure_kind == 'sampling_rate'
+    daq.set_acquisition_type('FINITE')
+    assert task.timing.samp_quant_samp_mode == nidaqmx.constants.AcquisitionType.FINITE
+    assert not daq.continuous and daq.last_reconfigure_kind == 'acquisition_type'
+    np.testing.assert_allclose(daq.read_samples(), 0.5)
+
+
+def test_reinitialize_restarts_the_existing_task():
+    daq = running_module()
+    task = daq.task_in
+    daq.reinitialize()
+    assert daq.task_in is task and task.running
+    assert daq.last_reconfigure_kind == 'warm_restart'
+
+
+def test_reinitialize_rebuilds_when_the_task_cannot_restart(monkeypatch):
+    daq = running_module()
+    daq.set_terminal_config('DIFF')
+    task = daq.task_in
+
+    def fail():
+        raise nidaqmx.errors.DaqError("Device not present.", -201003)
+
+    monkeypatch.setattr(task, 'start', fail)
+    daq.reinitialize()
+    assert daq.task_in is not task and task.closed
+    assert daq.task_in.running and daq.running
+    # The new task gets the module's current settings.
+    assert daq.task_in.channels[0]['terminal_config'] == nidaqmx.constants.TerminalConfiguration.DIFF
+    assert daq.last_reconfigure_kind == 'rebuild' and daq.last_reconfigure_latency >= 0
+    np.testing.assert_allclose(daq.read_samples(), 0.5)
+
+
+def test_reconfiguration_is_refused_during_background_acquisition():
+    daq = NIDAQVoltage(position=1, sampling_freq_in=2000, samples_per_read=100, buffer_in_size=1000,
+                       backend=SimulatedBackend(realtime=True))
+    daq.start_background()
+    try:
+        with pytest.raises(RuntimeError, match='background acquisition'):
+            daq.set_sampling_rate(4000)
+        with pytest.raises(RuntimeError, match='background acquisition'):
+            daq.set_acquisition_type('FINITE')
+        with pytest.raises(RuntimeError, match='background acquisition'):
+            daq.set_terminal_config('DIFF')
+        assert daq.sampling_freq_in == 2000 and daq.background.error_count == 0
+    finally:
+        daq.stop_background()
+    daq.set_sampling_rate(4000)
+    assert daq.task_in.timing.samp_clk_rate == 4000
@@ -0,0 +1,110 @@
+import threading
+
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.NIDAQClient import NIDAQVoltage
+from NIDAQUSBDriver.recorder import DATA_ALIGNMENT, Recorder, RecordingReader
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+NAMES = ['a', 'b', 'c']
+
+
+def blocks(sizes=(100, 37, 250, 1, 100), seed=4):
+    data = np.random.default_rng(seed).normal(size=(len(NAMES), sum(sizes)))
+    start = 0
+    for size in sizes:
+        yield data[:, start:start + size]
+        start += size
+
+
+def test_round_trip_through_the_memory_map(tmp_path):
+    path = str(tmp_path / 'run.nidaq')
+    # A chunk smaller than a block, so blocks are split across writes.
+    recorder = Recorder(path, NAMES, 1000.0, chunk_bytes=8 * len(NAMES) * 64, metadata={'operator': 'test'})
+    written = list(blocks())
+    for block in written:
+        recorder.write(block)
+    recorder.close()
+    assert recorder.samples_written == 488
+    assert recorder.blocks_dropped == 0
+
+    reader = RecordingReader(path)
+    expected = np.concatenate(written, axis=1)
+    assert len(reader) == 488
+    assert isinstance(reader.samples, np.memmap)
+    np.testing.assert_array_equal(reader.samples, expected.T)
+    np.testing.assert_array_equal(reader.channel('b'), expected[1])
+    np.testing.assert_array_equal(reader.channel(2), expected[2])
+    assert reader.blocks['sample'].tolist() == [0, 100, 137, 387, 388]
+
+
+def test_header_contents(tmp_path):
+    path = str(tmp_path / 'run.nidaq')
+    Recorder(path, NAMES, 250.0, metadata={'operator': 'test'}).close()
+    reader = RecordingReader(path)
+    header = reader.header
+    assert header['version'] == 1
+    assert header['channel_names'] == NAMES
+    assert header['sampling_freq'] == 250.0
+    assert header['dtype'] == '<f8'
+    assert header['layout'] == 'samples x channels'
+    assert header['operator'] == 'test'
+    assert len(reader) == 0
+    # The data section starts on a page boundary.
+    with open(path, 'rb') as file:
+        assert len(file.read()) % DATA_ALIGNMENT == 0
+
+
+def test_sample_times_follow_the_block_index(tmp_path):
+    path = str(tmp_path / 'run.nidaq')
+    recorder = Recorder(path, NAMES, 100.0)
+    for block in blocks():
+        recorder.write(block)
+    recorder.close()
+    reader = RecordingReader(path)
+    times = reader.sample_times()
+    assert times.shape == (488,)
+    # The last sample of every block carries its block's index time.
+    ends = np.append(reader.blocks['sample'][1:].astype(np.int64), len(reader)) - 1
+    np.testing.assert_allclose(times[ends], reader.blocks['time'])
+    # Within a block, samples are spaced at the sample rate.
+    np.testing.assert_allclose(np.diff(times[137:387]), 0.01, atol=1e-6)
+    np.testing.assert_allclose(reader.sample_times(137, 140), times[137:140])
+
+
+def test_blocks_are_dropped_when_the_writer_falls_behind(tmp_path):
+    path = str(tmp_path / 'run.nidaq')
+    recorder = Recorder(path, NAMES, 1000.0, queue_blocks=2)
+    gate = threading.Event()
+    append = recorder._append
+    recorder._append = lambda block: gate.wait() and append(block)
+    block = np.ones((len(NAMES), 10))
+    for _ in range(5):
+        recorder.write(block)
+    # Both slots are held until the writer catches up, so the last three blocks are dropped.
+    assert recorder.blocks_dropped == 3
+    gate.set()
+    recorder.close()
+    assert len(RecordingReader(path)) == 20
+
+
+def test_rejects_files_that_are_not_recordings(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        RecordingReader(str(path))
+
+
+def test_closing_the_module_finishes_its_recording(tmp_path):
+    path = str(tmp_path / 'run.nidaq')
+    daq = NIDAQVoltage(position=1, backend=SimulatedBackend())
+    daq.start_recording(path, chunk_bytes=1024 * 1024)
+    for _ in range(3):
+        daq.read_samples()
+    daq.close()
+    assert daq.recorder is None
+    reader = RecordingReader(path)
+    assert len(reader) == 1500
+    assert reader.header['channel_names'] == daq.get_channel_names()
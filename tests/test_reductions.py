@@ -0,0 +1,74 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.reductions import STATISTICS, Reducer
+
+
+@pytest.fixture
+def block():
+    return np.random.default_rng(1).normal(0.5, 2.0, (4, 1000))
+
+
+def test_statistics_match_numpy(block):
+    reducer = Reducer([name for name in STATISTICS if name != 'raw'], percentiles=(5, 50, 99.9))
+    result = reducer(block)
+    expected = {
+        'mean': block.mean(axis=1),
+        'rms': np.sqrt((block ** 2).mean(axis=1)),
+        'min': block.min(axis=1),
+        'max': block.max(axis=1),
+        'peak_to_peak': np.ptp(block, axis=1),
+        'std': block.std(axis=1),
+        'ac_rms': block.std(axis=1),
+        'p5': np.percentile(block, 5, axis=1),
+        'p50': np.percentile(block, 50, axis=1),
+        'p99.9': np.percentile(block, 99.9, axis=1),
+    }
+    assert list(result) == list(expected)
+    for name, values in expected.items():
+        np.testing.assert_allclose(result[name], values, err_msg=name)
+
+
+def test_single_statistic_returns_array(block):
+    np.testing.assert_allclose(Reducer('rms')(block), np.sqrt((block ** 2).mean(axis=1)))
+
+
+def test_raw_is_the_block(block):
+    assert Reducer(('raw', 'mean'))(block)['raw'] is block
+
+
+def test_decimals_round_statistics(block):
+    result = Reducer('mean', decimals=2)(block)
+    np.testing.assert_array_equal(result, np.round(block.mean(axis=1), 2))
+
+
+def test_preallocated_output_is_filled_in_place(block):
+    out = np.empty(block.shape[0])
+    assert Reducer('rms')(block, out=out) is out
+    outs = {'mean': np.empty(4), 'peak_to_peak': np.empty(4)}
+    result = Reducer(('mean', 'peak_to_peak'))(block, out=outs)
+    assert result['mean'] is outs['mean'] and result['peak_to_peak'] is outs['peak_to_peak']
+
+
+def test_std_does_not_copy_the_block():
+    block = np.random.default_rng(2).normal(0.5, 2.0, (32, 500))
+    reducer = Reducer(('std', 'ac_rms'))
+    out = {'std': np.empty(32), 'ac_rms': np.empty(32)}
+    reducer(block, out=out)
+    tracemalloc.start()
+    for _ in range(20):
+        reducer(block, out=out)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The block is 128 kB; a (chans, n) temporary would show up here.
+    assert peak < 8192
+    np.testing.assert_allclose(out['std'], block.std(axis=1))
+
+
+def test_unknown_statistic_is_rejected():
+    with pytest.raises(ValueError):
+        Reducer(('mean', 'median'))
+    with pytest.raises(ValueError):
+        Reducer(())
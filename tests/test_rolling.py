@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.rolling import WEIGHT_WIDTHS, EWMAStats, RollingStats, RunningStats, WindowStats
+
+
+def stream(n=5000, offset=1e6, seed=3):
+    # A large offset is where the naive sum-of-squares variance loses its digits.
+    return offset + np.random.default_rng(seed).normal(size=(3, n))
+
+
+def test_running_stats_match_numpy_across_blocks():
+    data = stream()
+    stats = RunningStats(3)
+    for start in range(0, data.shape[1], 123):
+        stats.update(data[:, start:start + 123])
+    assert stats.count == data.shape[1]
+    np.testing.assert_allclose(stats.mean, data.mean(axis=1))
+    np.testing.assert_allclose(stats.var(), data.var(axis=1), rtol=1e-9)
+    np.testing.assert_allclose(stats.std(ddof=1), data.std(axis=1, ddof=1), rtol=1e-9)
+    np.testing.assert_array_equal(stats.min, data.min(axis=1))
+    np.testing.assert_array_equal(stats.max, data.max(axis=1))
+
+
+def test_merged_stats_equal_stats_of_everything():
+    data = stream()
+    first, second = RunningStats(3), RunningStats(3)
+    first.update(data[:, :2000])
+    second.update(data[:, 2000:])
+    first.merge(second)
+    np.testing.assert_allclose(first.var(), data.var(axis=1), rtol=1e-9)
+    with pytest.raises(ValueError):
+        first.merge(RunningStats(2))
+
+
+def test_window_stats_cover_the_last_blocks():
+    data = stream(offset=0.0)
+    window = WindowStats(3, blocks=4)
+    for start in range(0, 5000, 500):
+        window.update(data[:, start:start + 500])
+    recent = data[:, -2000:]
+    assert window.count == 2000
+    np.testing.assert_allclose(window.mean, recent.mean(axis=1))
+    np.testing.assert_allclose(window.var(), recent.var(axis=1))
+    np.testing.assert_allclose(window.summary().rms, np.sqrt((recent ** 2).mean(axis=1)))
+
+
+def test_ewma_blockwise_matches_per_sample_recursion():
+    data = stream(n=600, offset=0.0)
+    ewma = EWMAStats(3, time_constant=0.05, sampling_freq=1000.0)
+    for start in range(0, 600, 64):
+        ewma.update(data[:, start:start + 64])
+    mean, weight = np.zeros(3), 0.0
+    for sample in data.T:
+        mean = ewma.decay * mean + (1 - ewma.decay) * sample
+        weight = ewma.decay * weight + (1 - ewma.decay)
+    np.testing.assert_allclose(ewma.mean, mean / weight)
+
+
+def test_ewma_keeps_weights_for_a_few_block_lengths_only():
+    data = stream(n=600, offset=0.0)
+    blockwise = EWMAStats(3, time_constant=0.05, sampling_freq=1000.0)
+    whole = EWMAStats(3, time_constant=0.05, sampling_freq=1000.0)
+    start = 0
+    for n in range(1, 34):
+        blockwise.update(data[:, start:start + n])
+        start += n
+        assert len(blockwise._weights) <= WEIGHT_WIDTHS
+    whole.update(data[:, :start])
+    np.testing.assert_allclose(blockwise.mean, whole.mean)
+    np.testing.assert_allclose(blockwise.rms, whole.rms)
+
+def test_rolling_stats_snapshot():
+    rolling = RollingStats(3, window_blocks=2, time_constant=0.1, sampling_freq=1000.0)
+    rolling.write(np.ones((3, 100)))
+    snapshot = rolling.snapshot()
+    assert set(snapshot) == {'running', 'window', 'ewma'}
+    np.testing.assert_allclose(snapshot['ewma']['mean'], 1.0)
+    np.testing.assert_allclose(snapshot['running']['std'], 0.0)
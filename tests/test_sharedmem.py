@@ -0,0 +1,127 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import NIDAQClient as root_clients
+from NIDAQUSBDriver.sharedmem import SharedMemoryPublisher, SharedMemorySubscriber
+from NIDAQUSBDriver.simulated import SimulatedBackend
+
+
+NAMES = ['a', 'b']
+
+
+def frame(value, n=4):
+    return np.full((len(NAMES), n), float(value))
+
+
+@pytest.fixture
+def publisher():
+    publisher = SharedMemoryPublisher(NAMES, 4, 100.0, slots=4, metadata={'device': 'Dev1'})
+    yield publisher
+    publisher.close()
+
+
+def test_header_reaches_the_subscriber(publisher):
+    with SharedMemorySubscriber(publisher.name) as sub:
+        assert (sub.chans, sub.samples_per_frame, sub.slots) == (2, 4, 4)
+        assert sub.sampling_freq == 100.0
+        assert sub.channel_names == NAMES
+        assert sub.header['device'] == 'Dev1'
+
+
+def test_latest_start_skips_frames_already_published(publisher):
+    publisher.write(frame(1))
+    with SharedMemorySubscriber(publisher.name, start='latest') as sub:
+        assert sub.read(timeout=0) is None
+        publisher.write(frame(2))
+        received = sub.read(timeout=0)
+        assert received.sequence == 2 and received.sample == 4
+        np.testing.assert_array_equal(received.data, frame(2))
+
+
+def test_oldest_start_replays_the_ring(publisher):
+    for value in range(1, 7):
+        publisher.write(frame(value))
+    with SharedMemorySubscriber(publisher.name, start='oldest') as sub:
+        sequences = [received.sequence for received in sub.frames(timeout=0)]
+        assert sequences == [3, 4, 5, 6]
+        assert sub.overruns == 0
+        assert sub.latest().sequence == 6
+
+
+def test_overruns_are_counted(publisher):
+    with SharedMemorySubscriber(publisher.name) as sub:
+        publisher.write(frame(1))
+        assert sub.read(timeout=0).sequence == 1
+        for value in range(2, 9):
+            publisher.write(frame(value))
+        # Frames 2-4 were overwritten before they were read.
+        assert sub.read(timeout=0).sequence == 5
+        assert sub.overruns == 3
+
+
+def test_views_are_invalidated_by_the_publisher(publisher):
+    with SharedMemorySubscriber(publisher.name) as sub:
+        publisher.write(frame(1))
+        view = sub.read(timeout=0)
+        copy = sub.latest(copy=True)
+        assert sub.valid(view)
+        for value in range(2, 6):
+            publisher.write(frame(value))
+        assert not sub.valid(view)
+        np.testing.assert_array_equal(copy.data, frame(1))
+
+
+def test_blocks_of_any_width_are_published(publisher):
+    with SharedMemorySubscriber(publisher.name) as sub:
+        publisher.write(frame(1, n=3))
+        publisher.write(np.arange(2 * 10, dtype=float).reshape(2, 10))
+        received = list(sub.frames(timeout=0, copy=True))
+    assert [f.data.shape[1] for f in received] == [3, 4, 4, 2]
+    assert [f.sample for f in received] == [0, 3, 7, 11]
+    np.testing.assert_array_equal(np.concatenate([f.data for f in received[1:]], axis=1),
+                                  np.arange(20.0).reshape(2, 10))
+
+
+def test_closed_publisher_ends_iteration():
+    publisher = SharedMemoryPublisher(NAMES, 4, 100.0, slots=4)
+    sub = SharedMemorySubscriber(publisher.name)
+    assert not sub.closed
+    publisher.close()
+    assert sub.closed
+    assert sub.read() is None
+    sub.close()
+    assert sub.closed
+
+
+def test_subscriber_in_a_child_process(publisher):
+    for value in range(1, 4):
+        publisher.write(frame(value))
+    code = (
+        "import json, sys\n"
+        "from NIDAQUSBDriver.sharedmem import SharedMemorySubscriber\n"
+        "with SharedMemorySubscriber(sys.argv[1], start='oldest') as sub:\n"
+        "    frames = list(sub.frames(timeout=0, copy=True))\n"
+        "    print(json.dumps([[f.sequence, f.data.sum()] for f in frames]))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code, publisher.name], cwd=root, capture_output=True, text=True,
+                            check=True)
+    assert json.loads(result.stdout) == [[1, 8.0], [2, 16.0], [3, 24.0]]
+    # The child detaching leaves the segment in place for others.
+    with SharedMemorySubscriber(publisher.name, start='oldest') as sub:
+        assert sub.read(timeout=0).sequence == 1
+
+
+def test_root_client_publishes_reads_of_any_size():
+    daq = root_clients.NIDAQVoltage(1, 'cDAQ1Mod1', acquisition_type='CONTINUOUS', backend=SimulatedBackend())
+    publisher = daq.start_publishing()
+    with SharedMemorySubscriber(publisher.name) as sub:
+        assert daq.read_samples(3000).shape == (32,)
+        assert [f.data.shape[1] for f in sub.frames(timeout=0)] == [500] * 6
+    daq.close()
+    assert daq.publisher is None
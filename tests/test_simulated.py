@@ -0,0 +1,44 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver._lazy import nidaqmx
+from NIDAQUSBDriver.simulated import ABORTED_ERROR, TIMEOUT_ERROR, SimulatedBackend
+
+
+def make_task(rate, chans=2):
+    backend = SimulatedBackend(realtime=True)
+    task = backend.create_task()
+    task.ai_channels.add_ai_voltage_chan(f"Dev1/ai0:{chans - 1}")
+    task.timing.cfg_samp_clk_timing(rate, sample_mode=nidaqmx.constants.AcquisitionType.CONTINUOUS, samps_per_chan=10000)
+    return task, backend.create_reader(task)
+
+
+def test_realtime_read_times_out_at_the_deadline():
+    task, reader = make_task(100)
+    task.start()
+    started = time.perf_counter()
+    with pytest.raises(nidaqmx.errors.DaqError) as error:
+        reader.read_many_sample(np.empty((2, 200)), 200, timeout=0.2)
+    assert error.value.error_code == TIMEOUT_ERROR
+    assert time.perf_counter() - started < 0.5
+
+
+def test_realtime_read_returns_once_its_samples_exist():
+    task, reader = make_task(1000)
+    task.start()
+    assert reader.read_many_sample(np.empty((2, 100)), 100, timeout=1.0) == 100
+    assert task.read_pos == 100
+
+
+def test_stopping_the_task_aborts_a_waiting_read():
+    task, reader = make_task(100)
+    task.start()
+    threading.Timer(0.1, task.stop).start()
+    started = time.perf_counter()
+    with pytest.raises(nidaqmx.errors.DaqError) as error:
+        reader.read_many_sample(np.empty((2, 500)), 500, timeout=10.0)
+    assert error.value.error_code == ABORTED_ERROR
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.channels import RawThermocoupleChannels
+from NIDAQUSBDriver.thermocouples import THERMOCOUPLE_TYPES, TEMPERATURE_RANGES, Linearizer, emf, table
+
+
+# Thermoelectric voltages in mV from the NIST ITS-90 tables.
+NIST_VALUES = [
+    ('K', 100.0, 4.096), ('K', 500.0, 20.644), ('K', -100.0, -3.554),
+    ('J', 100.0, 5.269), ('J', 500.0, 27.393),
+    ('T', 100.0, 4.279), ('T', -100.0, -3.379),
+    ('E', 100.0, 6.319),
+    ('N', 100.0, 2.774),
+    ('R', 1000.0, 10.506),
+    ('S', 1000.0, 9.587),
+    ('B', 1000.0, 4.834),
+]
+
+
+@pytest.mark.parametrize('thermocouple_type, temperature, millivolts', NIST_VALUES)
+def test_emf_matches_nist_tables(thermocouple_type, temperature, millivolts):
+    assert emf(thermocouple_type, temperature) * 1000 == pytest.approx(millivolts, abs=1e-3)
+
+
+@pytest.mark.parametrize('thermocouple_type', THERMOCOUPLE_TYPES)
+def test_table_inverts_emf(thermocouple_type):
+    low, high = TEMPERATURE_RANGES[thermocouple_type]
+    temperatures = np.linspace(low + 1, high - 1, 500)
+    recovered = table(thermocouple_type).temperature(emf(thermocouple_type, temperatures))
+    np.testing.assert_allclose(recovered, temperatures, atol=1e-3)
+    exact = table(thermocouple_type).temperature(emf(thermocouple_type, temperatures), exact=True)
+    np.testing.assert_allclose(exact, temperatures, atol=1e-6)
+
+
+def test_out_of_range_voltage_is_nan():
+    assert np.isnan(table('T').temperature(1.0))
+
+
+def test_linearizer_compensates_each_type():
+    linearizer = Linearizer(['K', 'J'], cjc_temperature=22.0)
+    voltage = np.array([[emf('K', 150.0) - emf('K', 22.0)] * 4, [emf('J', 60.0) - emf('J', 22.0)] * 4])
+    np.testing.assert_allclose(linearizer.convert(voltage), [[150.0] * 4, [60.0] * 4], atol=1e-3)
+    # Recorded layout: samples along the first axis.
+    np.testing.assert_allclose(linearizer.convert(voltage.T, channel_axis=1), [[150.0, 60.0]] * 4, atol=1e-3)
+
+
+def test_linearizer_takes_a_cold_junction_per_sample():
+    linearizer = Linearizer('K')
+    cjc = np.array([[20.0, 25.0, 30.0]])
+    voltage = np.array([emf('K', 200.0) - emf('K', cjc[0])] * 2)
+    np.testing.assert_allclose(linearizer.convert(voltage, cjc_temperature=cjc), 200.0, atol=1e-3)
+
+
+def test_linearizer_compensates_type_b_at_room_temperature():
+    linearizer = Linearizer('B', cjc_temperature=25.0)
+    voltage = np.full((2, 3), emf('B', 1000.0) - emf('B', 25.0))
+    np.testing.assert_allclose(linearizer.convert(voltage), 1000.0, atol=1e-3)
+    cjc = np.array([[0.0, 25.0, 40.0]])
+    voltage = np.array([emf('B', 600.0) - emf('B', cjc[0])] * 2)
+    np.testing.assert_allclose(linearizer.convert(voltage, cjc_temperature=cjc), 600.0, atol=1e-3)
+
+
+def test_linearizer_checks_channel_counts():
+    with pytest.raises(ValueError):
+        Linearizer(['K', 'J', 'T']).check(8)
+    with pytest.raises(ValueError):
+        Linearizer('K', cjc_temperature=[20.0, 21.0]).check(8)
+    Linearizer('K', cjc_temperature=[20.0] * 8).check(8)
+
+
+def test_raw_channels_validate_types_against_the_module():
+    channels = RawThermocoupleChannels(['K'] * 8)
+    channels.validate(8)
+    with pytest.raises(ValueError):
+        channels.set_thermocouple_types(['K'] * 4)
+    assert channels.thermocouple_types == ['K'] * 8
+    with pytest.raises(ValueError):
+        RawThermocoupleChannels(cjc_source='SCANNABLE_CHANNEL')
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from NIDAQUSBDriver.timestamps import SampleClock
+
+
+def test_contiguous_blocks_are_numbered_without_gaps():
+    clock = SampleClock(1000.0)
+    stamps = [clock.stamp(100, host_time=0.1 * (i + 1)) for i in range(5)]
+    assert [stamp.first_sample for stamp in stamps] == [0, 100, 200, 300, 400]
+    assert clock.samples_lost == 0
+    assert not any(stamp.restarted for stamp in stamps)
+    times = stamps[1].times()
+    np.testing.assert_allclose(np.diff(times), 0.001, atol=1e-6)
+    assert times[0] == pytest.approx(stamps[0].start_time + 0.1)
+
+
+def test_read_position_reveals_lost_samples():
+    clock = SampleClock(1000.0)
+    clock.stamp(100, host_time=0.1, read_position=100)
+    stamp = clock.stamp(100, host_time=0.35, read_position=350)
+    assert stamp.first_sample == 250
+    assert stamp.samples_lost == 150
+    assert clock.gaps == 1
+
+
+def test_restart_continues_numbering_by_host_time():
+    clock = SampleClock(1000.0)
+    clock.stamp(100, host_time=0.1, read_position=100)
+    clock.restart()
+    stamp = clock.stamp(100, host_time=1.1, read_position=100)
+    assert stamp.restarted
+    assert clock.restarts == 1
+    assert stamp.first_sample == pytest.approx(1000, abs=1)
+
+
+def test_drift_is_estimated_from_host_time():
+    clock = SampleClock(1000.0, window=8, fit_seconds=1.0)
+    fast = 1 + 200e-6
+    for i in range(1, 200):
+        clock.stamp(100, host_time=0.1 * i / fast, read_position=100 * i)
+    assert clock.drift_ppm == pytest.approx(-200, abs=5)
+
+
+def test_window_must_allow_a_fit():
+    with pytest.raises(ValueError):
+        SampleClock(1000.0, window=2)